@@ -1,28 +1,18 @@
 import streamlit as st
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import time
+import os
 import re
-from urllib.parse import urljoin, urlparse
-import json
-import hashlib
-import threading
-from concurrent.futures import ThreadPoolExecutor
+import bisect
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from collections import Counter, defaultdict
-import difflib
 import html
 
+from crawler import (
+    DIFF_ENGINES, VIEWER_PAGE_ROWS, CrawlPipeline, CrawlStore, HTMLBlobStore, HTMLDiffAnalyzer, HTMLTreeDiff,
+    HTTPSessionPool, LinkFrontier, RawHTMLCache, RenderCache, SitemapEntry, TECHNOLOGY_SIGNATURES, URLSourceError,
+    WebDriverPool, compile_query, content_hash, export_results, open_exporter, httpx, iter_sitemap,
+)
+
 # Page configuration
 st.set_page_config(
     page_title="HTML vs JS Crawler Pro - Screaming Frog Style",
@@ -140,6 +130,15 @@ st.markdown("""
         opacity: 0.7;
     }
     
+    .line-collapsed {
+        color: #666;
+        background: #eef0f8;
+        font-style: italic;
+        text-align: center;
+        margin: 4px 0;
+        padding: 2px 0;
+    }
+    
     .highlight-js-addition {
         background: #e8f5e8;
         padding: 2px 4px;
@@ -228,236 +227,118 @@ if 'crawl_results' not in st.session_state:
     st.session_state.crawl_results = []
 if 'crawl_running' not in st.session_state:
     st.session_state.crawl_running = False
-if 'driver_pool' not in st.session_state:
-    st.session_state.driver_manager = None # Changed from driver_pool
+if 'driver_manager' not in st.session_state:
+    st.session_state.driver_manager = None
+if 'http_sessions' not in st.session_state:
+    st.session_state.http_sessions = None
 if 'selected_url_for_diff' not in st.session_state:
     st.session_state.selected_url_for_diff = None
+if 'diff_page' not in st.session_state:
+    st.session_state.diff_page = 1
+if 'store_page' not in st.session_state:
+    st.session_state.store_page = 1
 
-class WebDriverManager:
-    """Manages a single, reusable WebDriver instance for stability in cloud environments."""
-    def __init__(self):
-        self.driver = None
-        self._lock = threading.Lock()
+# Export formats: file extension and MIME type
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "JSON": (".json", "application/json"),
+    "JSON Lines": (".jsonl", "application/x-ndjson"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
 
-    def get_driver(self):
-        with self._lock:
-            if self.driver is None:
-                self.driver = self._create_driver()
-            return self.driver
+# Rows of the crawl store shown per page, and their columns
+STORE_PAGE_ROWS = 100
+STORE_DISPLAY_COLUMNS = ['url', 'timestamp', 'status_code', 'response_time', 'size_bytes', 'js_percentage',
+                         'speed_score', 'seo_score', 'is_spa', 'technologies']
 
-    def _create_driver(self):
-        try:
-            st.info("Initializing WebDriver... This may take a moment.")
-            options = Options()
-            options.add_argument("--headless=new")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-renderer-backgrounding")
-            options.add_argument("--disable-backgrounding-occluded-windows")
-            options.add_argument("--window-size=1920,1080")
-            # Use a consistent, modern User-Agent for both requests and Selenium
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
-            options.add_argument(f"user-agent={user_agent}")
-            
-            # Performance settings
-            prefs = {
-                "profile.managed_default_content_settings.images": 2,
-                "profile.default_content_settings.popups": 0,
-                "profile.default_content_setting_values.notifications": 2
-            }
-            options.add_experimental_option("prefs", prefs)
+@st.cache_resource
+def open_crawl_store(path):
+    """One shared SQLite crawl store per database path"""
+    return CrawlStore(path)
 
-            # Use webdriver-manager to handle driver installation
-            service = ChromeService(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=options)
-            st.success("WebDriver initialized successfully.")
-            return driver
-        except Exception as e:
-            st.error(f"Fatal Error: Failed to create WebDriver. The service may not be able to run. Error: {e}")
-            st.stop()
-            return None
+@st.cache_resource
+def open_blob_store(path):
+    """Page HTML is kept on disk and referenced from results to keep session state small"""
+    return HTMLBlobStore(path)
 
-    def cleanup(self):
-        with self._lock:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception as e:
-                    st.warning(f"Error while quitting WebDriver: {e}")
-                finally:
-                    self.driver = None
+# Diffs kept across reruns and sessions; the least recently used one is dropped first
+DIFF_CACHE_ENTRIES = 16
 
-class HTMLDiffAnalyzer:
-    def __init__(self, original_html, rendered_html):
-        self.original_html = original_html
-        self.rendered_html = rendered_html
-        self.original_lines = self._clean_html(original_html).splitlines()
-        self.rendered_lines = self._clean_html(rendered_html).splitlines()
-        
-    def _clean_html(self, html_content):
-        """Clean and format HTML for better diff comparison"""
-        if not html_content:
-            return ""
-        
-        # Parse with BeautifulSoup for consistent formatting
-        soup = BeautifulSoup(html_content, 'html.parser')
-        return soup.prettify()
-    
-    def generate_diff(self, context_lines=3):
-        """Generate unified diff between original and rendered HTML"""
-        differ = difflib.unified_diff(
-            self.original_lines,
-            self.rendered_lines,
-            fromfile='Original HTML',
-            tofile='Rendered HTML',
-            lineterm='',
-            n=context_lines
-        )
-        return list(differ)
-    
-    def get_change_statistics(self):
-        """Get statistics about changes between HTML versions"""
-        matcher = difflib.SequenceMatcher(None, self.original_lines, self.rendered_lines)
-        
-        stats = {
-            'total_lines_original': len(self.original_lines),
-            'total_lines_rendered': len(self.rendered_lines),
-            'lines_added': 0,
-            'lines_removed': 0,
-            'lines_modified': 0,
-            'similarity_ratio': matcher.ratio(),
-            'js_injections': 0,
-            'meta_changes': 0,
-            'structural_changes': 0
-        }
-        
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'insert':
-                stats['lines_added'] += (j2 - j1)
-                # Check for JS injections
-                for line in self.rendered_lines[j1:j2]:
-                    if '<script' in line.lower() or 'javascript:' in line.lower():
-                        stats['js_injections'] += 1
-                    elif '<meta' in line.lower() or 'content=' in line.lower():
-                        stats['meta_changes'] += 1
-            elif tag == 'delete':
-                stats['lines_removed'] += (i2 - i1)
-            elif tag == 'replace':
-                stats['lines_modified'] += max(i2 - i1, j2 - j1)
-                stats['structural_changes'] += 1
-        
-        return stats
-    
-    def get_detailed_changes(self):
-        """Get detailed line-by-line changes with categories"""
-        matcher = difflib.SequenceMatcher(None, self.original_lines, self.rendered_lines)
-        changes = []
-        
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                continue
-                
-            change = {
-                'type': tag,
-                'original_lines': self.original_lines[i1:i2] if tag != 'insert' else [],
-                'rendered_lines': self.rendered_lines[j1:j2] if tag != 'delete' else [],
-                'original_range': (i1, i2),
-                'rendered_range': (j1, j2),
-                'category': self._categorize_change(
-                    self.original_lines[i1:i2] if tag != 'insert' else [],
-                    self.rendered_lines[j1:j2] if tag != 'delete' else []
-                )
-            }
-            changes.append(change)
-        
-        return changes
-    
-    def _categorize_change(self, original_lines, rendered_lines):
-        """Categorize the type of change"""
-        all_lines = original_lines + rendered_lines
-        content = '\n'.join(all_lines).lower()
-        
-        if '<script' in content or 'javascript:' in content:
-            return 'javascript'
-        elif '<meta' in content or 'og:' in content or 'twitter:' in content:
-            return 'metadata'
-        elif '<link' in content and ('css' in content or 'stylesheet' in content):
-            return 'stylesheet'
-        elif any(tag in content for tag in ['<div', '<span', '<p', '<h1', '<h2', '<h3']):
-            return 'content'
-        elif 'data-' in content or 'id=' in content or 'class=' in content:
-            return 'attributes'
-        else:
-            return 'other'
+@st.cache_resource(max_entries=DIFF_CACHE_ENTRIES)
+def load_line_diff(url, raw_hash, rendered_hash, engine, _raw_html, _rendered_html):
+    """Line diff of a page, keyed by the hashes of its HTML (underscored arguments are not hashed)"""
+    return HTMLDiffAnalyzer(_raw_html, _rendered_html, engine=engine)
+
+@st.cache_resource(max_entries=DIFF_CACHE_ENTRIES)
+def load_tree_diff(url, raw_hash, rendered_hash, _raw_html, _rendered_html):
+    """DOM tree diff of a page, keyed by the hashes of its HTML (underscored arguments are not hashed)"""
+    return HTMLTreeDiff(_raw_html, _rendered_html)
+
+# CSS class and line prefix of each diff viewer row kind
+VIEWER_ROW_STYLES = {
+    'unchanged': ('line-unchanged', ''),
+    'removed': ('line-removed', '- '),
+    'added': ('line-added', '+ '),
+    'modified': ('line-modified', '~ '),
+    'collapsed': ('line-collapsed', '⋯ '),
+}
+
+def format_viewer_row(kind, line_number, line, search_pattern=None, highlight_additions=False):
+    """HTML for one side-by-side diff viewer row"""
+    css_class, prefix = VIEWER_ROW_STYLES[kind]
+    if kind == 'collapsed':
+        # line is the number of unchanged or filtered-out lines left out
+        if not line:
+            return ''
+        return f'<div class="{css_class}">{prefix}{line} lines hidden ({line_number}–{line_number + line - 1})</div>'
+    # Search matches are found in the raw line and escaped piece by piece
+    content = []
+    end = 0
+    for match in (search_pattern.finditer(line) if search_pattern else ()):
+        if match.end() > match.start():
+            content.append(html.escape(line[end:match.start()]))
+            content.append(f'<span class="search-highlight">{html.escape(match.group())}</span>')
+            end = match.end()
+    content.append(html.escape(line[end:]))
+    content = ''.join(content)
+    if highlight_additions and kind != 'unchanged':
+        # Highlight JavaScript additions
+        lowered = line.lower()
+        if '<script' in lowered or 'javascript:' in lowered:
+            content = f'<span class="highlight-js-addition">{content}</span>'
+        elif '<meta' in lowered:
+            content = f'<span class="highlight-meta-addition">{content}</span>'
+    return f'<div class="{css_class}"><span class="line-number">{line_number}</span><span class="line-content">{prefix}{content}</span></div>'
 
-def create_diff_viewer_html(diff_analyzer, search_term="", show_only_changes=False):
-    """Create HTML for the diff viewer"""
-    changes = diff_analyzer.get_detailed_changes()
+def step_diff_page(step, page_count):
+    """Previous/next button callback for the diff viewer page"""
+    st.session_state.diff_page = min(max(1, st.session_state.diff_page + step), page_count)
+
+def step_match_page(match_pages, step):
+    """Previous/next match button callback: move to the nearest page with a search match, wrapping around"""
+    current = st.session_state.diff_page - 1
+    if step > 0:
+        position = bisect.bisect_right(match_pages, current)
+        st.session_state.diff_page = match_pages[position % len(match_pages)] + 1
+    else:
+        st.session_state.diff_page = match_pages[bisect.bisect_left(match_pages, current) - 1] + 1
+
+def reset_diff_page():
+    """Start the diff viewer at its first page when another URL is selected"""
+    st.session_state.diff_page = 1
+
+def create_diff_viewer_html(diff_analyzer, page, search_pattern=None):
+    """Create HTML for the diff viewer, showing one page of the diff"""
     stats = diff_analyzer.get_change_statistics()
     
-    # Create side-by-side view
+    # Only the rows of this page are rendered, so the markup size does not grow with the document
     original_lines = diff_analyzer.original_lines
     rendered_lines = diff_analyzer.rendered_lines
+    original_rows, rendered_rows = diff_analyzer.get_page_rows(page)
     
-    matcher = difflib.SequenceMatcher(None, original_lines, rendered_lines)
-    
-    original_html = []
-    rendered_html = []
-    
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        if tag == 'equal':
-            if not show_only_changes:
-                for i in range(i1, i2):
-                    line = html.escape(original_lines[i])
-                    if search_term and search_term.lower() in line.lower():
-                        line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                    original_html.append(f'<div class="line-unchanged"><span class="line-number">{i+1}</span><span class="line-content">{line}</span></div>')
-                
-                for j in range(j1, j2):
-                    line = html.escape(rendered_lines[j])
-                    if search_term and search_term.lower() in line.lower():
-                        line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                    rendered_html.append(f'<div class="line-unchanged"><span class="line-number">{j+1}</span><span class="line-content">{line}</span></div>')
-        
-        elif tag == 'delete':
-            for i in range(i1, i2):
-                line = html.escape(original_lines[i])
-                if search_term and search_term.lower() in line.lower():
-                    line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                original_html.append(f'<div class="line-removed"><span class="line-number">{i+1}</span><span class="line-content">- {line}</span></div>')
-        
-        elif tag == 'insert':
-            for j in range(j1, j2):
-                line = html.escape(rendered_lines[j])
-                # Highlight JavaScript additions
-                if '<script' in line.lower() or 'javascript:' in line.lower():
-                    line = f'<span class="highlight-js-addition">{line}</span>'
-                elif '<meta' in line.lower():
-                    line = f'<span class="highlight-meta-addition">{line}</span>'
-                
-                if search_term and search_term.lower() in line.lower():
-                    line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                rendered_html.append(f'<div class="line-added"><span class="line-number">{j+1}</span><span class="line-content">+ {line}</span></div>')
-        
-        elif tag == 'replace':
-            for i in range(i1, i2):
-                line = html.escape(original_lines[i])
-                if search_term and search_term.lower() in line.lower():
-                    line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                original_html.append(f'<div class="line-modified"><span class="line-number">{i+1}</span><span class="line-content">~ {line}</span></div>')
-            
-            for j in range(j1, j2):
-                line = html.escape(rendered_lines[j])
-                if '<script' in line.lower() or 'javascript:' in line.lower():
-                    line = f'<span class="highlight-js-addition">{line}</span>'
-                elif '<meta' in line.lower():
-                    line = f'<span class="highlight-meta-addition">{line}</span>'
-                
-                if search_term and search_term.lower() in line.lower():
-                    line = line.replace(search_term, f'<span class="search-highlight">{search_term}</span>')
-                rendered_html.append(f'<div class="line-modified"><span class="line-number">{j+1}</span><span class="line-content">~ {line}</span></div>')
+    original_html = [format_viewer_row(*row, search_pattern=search_pattern) for row in original_rows]
+    rendered_html = [format_viewer_row(*row, search_pattern=search_pattern, highlight_additions=True) for row in rendered_rows]
     
     # Stats HTML
     stats_html = f"""
@@ -509,28 +390,66 @@ with st.sidebar:
     st.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
     st.header("🔧 Crawler Configuration")
 
-    st.info("Concurrency is limited to 1 on this hosted version for stability. Run locally for more power.")
-    concurrent_requests = 1 # Hardcoded for stability on Render
+    st.info("Keep concurrency at 1 on the hosted version for stability. Run locally for more power.")
+    concurrent_requests = st.slider("Concurrent Browsers", 1, 8, 1, help="Number of pages crawled in parallel. Each worker renders in its own headless browser from the WebDriver pool.")
+    fetch_workers = st.slider("Fetch Workers", 1, 64, 16, help="Parallel raw HTML downloads. Fetching runs ahead of rendering and feeds a bounded render queue.")
+    connections_per_host = st.slider("Connections per Host", 1, 32, 10, help="Size of the keep-alive connection pool kept open to each host.")
+    enable_http2 = st.checkbox("Enable HTTP/2", False, disabled=httpx is None, help="Fetch raw HTML over HTTP/2. Requires the optional httpx[http2] package.")
+    max_per_host = st.slider("Requests per Host", 1, 16, 4, help="Concurrent raw fetches allowed against any one host. URLs are interleaved across hosts so a mixed list still uses every fetch worker.")
+    host_delay = st.slider("Min Delay per Host (seconds)", 0.0, 10.0, 0.0, 0.5, help="Minimum time between requests to the same host. A larger robots.txt Crawl-delay takes precedence.")
+    respect_robots = st.checkbox("Respect robots.txt", True, help="Skip disallowed URLs and honor Crawl-delay. Hosts answering 429/503 are backed off automatically.")
+    analysis_workers = st.slider("Analysis Workers", 1, 8, 2, help="Parallel HTML analysis workers.")
+    analysis_processes = st.slider("Analysis Processes", 0, 8, 0, help="Parse and analyze HTML in separate processes so it scales across CPU cores. 0 analyzes on threads.")
+    driver_recycle_pages = st.slider("Recycle Browser After (pages)", 10, 500, 100, help="Restart each pooled browser after this many pages to keep memory usage in check.")
 
     # Basic settings
     st.subheader("Basic Settings")
     page_timeout = st.slider("Page Timeout (seconds)", 5, 30, 10)
     enable_js_rendering = st.checkbox("Enable JavaScript Rendering", True, help="Enable to render JavaScript using a headless browser. Disabling this will only fetch the initial HTML and will be much faster.")
-    js_wait_time = st.slider("JS Wait Time (seconds)", 1, 10, 3)
+    adaptive_rendering = st.checkbox("Adaptive Rendering", False, disabled=not enable_js_rendering, help="Only render pages whose raw HTML looks JavaScript-dependent (framework bundles, #root/#app shell, little text). A small sample of skipped pages is still rendered to measure mispredictions.")
+    extract_in_browser = st.checkbox("Extract in Browser", False, disabled=not enable_js_rendering, help="Read SEO fields, links, DOM size and framework globals with one script in the browser instead of transferring and parsing the rendered HTML. Much faster on large pages, but the diff viewer has no rendered HTML for them.")
+    wait_strategy = st.selectbox("JS Wait Strategy", ["Adaptive (network & DOM idle)", "Fixed"], help="Adaptive returns as soon as the page has no pending requests or DOM changes for the quiet window; Fixed always waits the full JS wait time.")
+    js_wait_time = st.slider("JS Wait Time (seconds)", 1, 10, 3, help="Fixed wait, or the maximum wait in adaptive mode.")
+    quiet_window_ms = st.slider("Quiet Window (ms)", 100, 3000, 500, step=100, disabled=wait_strategy == "Fixed")
     
     # Advanced settings
     st.subheader("Advanced Options")
     follow_redirects = st.checkbox("Follow Redirects", True)
     check_images = st.checkbox("Analyze Images", False)
-    check_links = st.checkbox("Check Internal Links", False)
+    check_links = st.checkbox("Check Internal Links", False, help="Crawl the site breadth-first: links found on each page are followed to other pages of the same site.")
+    max_link_depth = st.number_input("Max Link Depth", 0, 20, 3, disabled=not check_links, help="Link hops from the start URLs.")
+    max_link_pages = st.number_input("Max Pages", 1, 1000000, 500, disabled=not check_links)
     mobile_simulation = st.checkbox("Mobile Simulation", False)
     
+    # Caching
+    st.subheader("💽 Caching")
+    use_raw_cache = st.checkbox("Cache Raw HTML", False, help="Store raw responses on disk and revalidate them with If-None-Match / If-Modified-Since. Unchanged pages reuse their previous analysis.")
+    use_render_cache = st.checkbox("Cache Rendered DOM", False, help="Reuse the rendered page when the raw HTML and render settings match a previous render.")
+    render_cache_mb = st.slider("Render Cache Size (MB)", 64, 4096, 512, 64, disabled=not use_render_cache)
+    cache_dir = st.text_input("Cache Directory", ".crawl_cache", disabled=not (use_raw_cache or use_render_cache))
+    
+    # Persistent crawl store
+    st.subheader("🗄️ Crawl Store")
+    use_crawl_store = st.checkbox("Save Results to Crawl Store", False, help="Keep every result in a local SQLite database so results survive restarts. Stored results are browsed a page at a time below the crawl results.")
+    crawl_store_path = st.text_input("Crawl Database", ".crawl_cache/crawl.db", disabled=not use_crawl_store)
+    incremental_crawl = st.checkbox("Incremental Crawl", False, disabled=not use_crawl_store, help="Only crawl URLs that are new, failed last time or older than the recrawl interval; stored results are reused for the rest.")
+    recrawl_after_hours = st.number_input("Recrawl After (hours)", 1, 24 * 30, 24, disabled=not (use_crawl_store and incremental_crawl))
+    
+    # Request blocking while rendering
+    st.subheader("🚫 Request Blocking")
+    block_resource_types = st.multiselect("Block Resource Types", ["font", "media", "stylesheet"], [], help="Requests of these types are blocked in the headless browser. Images are always disabled.")
+    block_trackers = st.checkbox("Block Trackers & Widgets", False, help="Block analytics, advertising, tag manager and chat widget hosts.")
+    block_third_party = st.checkbox("Block Third-Party Hosts", False, help="Block resources from any host outside the crawled page's own site.")
+    
     # Diff Viewer Options
     st.subheader("🔍 Diff Viewer Options")
     preserve_formatting = st.checkbox("Preserve HTML Formatting", True)
     show_line_numbers = st.checkbox("Show Line Numbers", True)
     highlight_js_changes = st.checkbox("Highlight JS Changes", True)
-    context_lines = st.slider("Context Lines", 0, 10, 3)
+    context_lines = st.slider("Context Lines", 0, 10, 3, help="Unchanged lines shown around each change; longer unchanged runs are collapsed.")
+    diff_page_rows = st.slider("Diff Lines per Page", 100, 1000, VIEWER_PAGE_ROWS, step=50)
+    diff_mode = st.radio("Diff Mode", ["Lines", "DOM Tree"], horizontal=True, help="DOM Tree compares element trees: re-indented or reordered markup is not a change, unchanged subtrees are skipped and changes are listed with CSS paths.")
+    diff_engine = st.selectbox("Diff Engine", list(DIFF_ENGINES), help="patience stays fast on large rendered DOMs with many repeated lines; difflib is Python's SequenceMatcher.")
     
     # Filtering
     st.subheader("Content Filtering")
@@ -539,290 +458,13 @@ with st.sidebar:
     
     # Export options
     st.subheader("Export Options")
-    export_format = st.selectbox("Export Format", ["CSV", "Excel", "JSON"])
+    export_format = st.selectbox("Export Format", list(EXPORT_FORMATS))
+    export_while_crawling = st.checkbox("Export While Crawling", False, help="Stream each result to the export file in the cache directory as soon as it finishes.")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def analyze_page_speed(response_time, size_bytes):
-    """Analyze page speed metrics"""
-    speed_score = 100
-    
-    # Response time analysis
-    if response_time > 3:
-        speed_score -= 30
-    elif response_time > 1:
-        speed_score -= 15
-    
-    # Size analysis
-    if size_bytes > 1024 * 1024:  # > 1MB
-        speed_score -= 25
-    elif size_bytes > 512 * 1024:  # > 512KB
-        speed_score -= 10
-    
-    return max(0, speed_score)
-
-def extract_seo_data(soup):
-    """Extract SEO-relevant data from HTML"""
-    seo_data = {
-        'title': '',
-        'meta_description': '',
-        'h1_count': 0,
-        'h2_count': 0,
-        'images_without_alt': 0,
-        'internal_links': 0,
-        'external_links': 0,
-        'word_count': 0,
-        'canonical_url': '',
-        'meta_robots': '',
-        'og_title': '',
-        'og_description': '',
-        'schema_markup': False
-    }
-    
-    if not soup:
-        return seo_data
-    
-    # Title
-    title_tag = soup.find('title')
-    seo_data['title'] = title_tag.get_text().strip() if title_tag else ''
-    
-    # Meta description
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    seo_data['meta_description'] = meta_desc.get('content', '') if meta_desc else ''
-    
-    # Headings
-    seo_data['h1_count'] = len(soup.find_all('h1'))
-    seo_data['h2_count'] = len(soup.find_all('h2'))
-    
-    # Images without alt
-    images = soup.find_all('img')
-    seo_data['images_without_alt'] = sum(1 for img in images if not img.get('alt'))
-    
-    # Word count
-    text = soup.get_text()
-    seo_data['word_count'] = len(text.split())
-    
-    # Links analysis
-    links = soup.find_all('a', href=True)
-    for link in links:
-        href = link['href']
-        if href.startswith('http'):
-            seo_data['external_links'] += 1
-        else:
-            seo_data['internal_links'] += 1
-    
-    # Canonical URL
-    canonical = soup.find('link', rel='canonical')
-    seo_data['canonical_url'] = canonical.get('href', '') if canonical else ''
-    
-    # Meta robots
-    robots = soup.find('meta', attrs={'name': 'robots'})
-    seo_data['meta_robots'] = robots.get('content', '') if robots else ''
-    
-    # Open Graph
-    og_title = soup.find('meta', property='og:title')
-    seo_data['og_title'] = og_title.get('content', '') if og_title else ''
-    
-    og_desc = soup.find('meta', property='og:description')
-    seo_data['og_description'] = og_desc.get('content', '') if og_desc else ''
-    
-    # Schema markup
-    schema_scripts = soup.find_all('script', type='application/ld+json')
-    seo_data['schema_markup'] = len(schema_scripts) > 0
-    
-    return seo_data
-
-def detect_technologies(soup, response_headers):
-    """Detect web technologies used"""
-    technologies = []
-    
-    # JavaScript frameworks
-    scripts = soup.find_all('script', src=True)
-    for script in scripts:
-        src = script.get('src', '').lower()
-        if 'react' in src:
-            technologies.append('React')
-        elif 'vue' in src:
-            technologies.append('Vue.js')
-        elif 'angular' in src:
-            technologies.append('Angular')
-        elif 'jquery' in src:
-            technologies.append('jQuery')
-    
-    # Server detection from headers
-    server = response_headers.get('server', '').lower()
-    if 'nginx' in server:
-        technologies.append('Nginx')
-    elif 'apache' in server:
-        technologies.append('Apache')
-    elif 'cloudflare' in server:
-        technologies.append('Cloudflare')
-    
-    # CMS detection
-    html_text = str(soup).lower()
-    if 'wp-content' in html_text or 'wordpress' in html_text:
-        technologies.append('WordPress')
-    elif 'drupal' in html_text:
-        technologies.append('Drupal')
-    elif 'joomla' in html_text:
-        technologies.append('Joomla')
-    
-    return technologies
-
-def crawl_single_url(url, driver_manager, config):
-    """Crawl a single URL and return comprehensive analysis including raw HTML"""
-    start_time = time.time()
-    result = {
-        'url': url,
-        'status_code': 0,
-        'response_time': 0,
-        'size_bytes': 0,
-        'raw_html_size': 0,
-        'rendered_html_size': 0,
-        'js_additions': 0,
-        'js_percentage': 0,
-        'speed_score': 0,
-        'seo_score': 0,
-        'technologies': [],
-        'is_spa': False,
-        'spa_score': 0,
-        'errors': [],
-        'seo_data': {},
-        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'raw_html': '',  # Store raw HTML for diff
-        'rendered_html': ''  # Store rendered HTML for diff
-    }
-
-    raw_html = "" # Initialize raw_html outside try block
-    rendered_html = "" # Initialize rendered_html outside try block
-
-    # --- Step 1: Fetch Raw HTML ---
-    try:
-        headers = {
-            'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-        }
-        
-        raw_response = requests.get(url, headers=headers, timeout=config['timeout'])
-        result['status_code'] = raw_response.status_code
-        # This will raise an HTTPError for 4xx or 5xx status codes, ensuring we stop processing failed URLs.
-        raw_response.raise_for_status()
-
-        raw_html = raw_response.text
-        result['raw_html'] = raw_html  # Store raw HTML for diff if successful
-        result['raw_html_size'] = len(raw_html.encode('utf-8'))
-        result['size_bytes'] = result['raw_html_size'] # Initial size
-        result['response_time'] = time.time() - start_time # Time for initial request
-
-    except requests.exceptions.RequestException as e:
-        # If the initial request fails, record the error and stop processing this URL.
-        if hasattr(e, 'response') and e.response is not None:
-            result['status_code'] = e.response.status_code
-        result['errors'].append(f"Initial request failed: {str(e)}")
-        result['response_time'] = time.time() - start_time # Record time even for failure
-        return result
-
-    # --- Step 2: Get Rendered HTML using WebDriver (only if raw HTML fetch was successful) ---
-    if config.get('enable_js', True):
-        try:
-            # Get rendered HTML using WebDriver
-            driver = driver_manager.get_driver()
-            
-            if driver:
-                try:
-                    driver.set_page_load_timeout(config['timeout'])
-                    driver.get(url)
-                    
-                    # Wait for page load
-                    WebDriverWait(driver, config['timeout']).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "body"))
-                    )
-                    
-                    # Wait for JavaScript
-                    time.sleep(config['js_wait'])
-                    
-                    rendered_html = driver.page_source
-                    result['rendered_html_size'] = len(rendered_html.encode('utf-8'))
-                    result['rendered_html'] = rendered_html  # Store for diff
-                    
-                except Exception as e:
-                    result['errors'].append(f"Selenium error: {str(e)}")
-            
-        except Exception as e:
-            result['errors'].append(f"Selenium rendering error: {str(e)}")
-    else:
-        # If JS rendering is disabled, the rendered HTML is the same as the raw HTML
-        rendered_html = raw_html
-        result['rendered_html'] = raw_html
-
-    # --- Step 3: Analyze HTML (both raw and rendered) ---
-    try:
-        # Use rendered_html if available, otherwise fall back to raw_html for analysis
-        rendered_soup = BeautifulSoup(rendered_html, 'html.parser')
-        
-        # Calculate JavaScript impact
-        if rendered_html:
-            raw_lines = raw_html.count('\n')
-            rendered_lines = rendered_html.count('\n')
-            result['js_additions'] = max(0, rendered_lines - raw_lines)
-            result['js_percentage'] = (result['js_additions'] / max(rendered_lines, 1)) * 100
-        
-        # Extract SEO data
-        result['seo_data'] = extract_seo_data(rendered_soup)
-        
-        # Calculate SEO score
-        seo_score = 100
-        if not result['seo_data']['title']:
-            seo_score -= 20
-        if not result['seo_data']['meta_description']:
-            seo_score -= 15
-        if result['seo_data']['h1_count'] != 1:
-            seo_score -= 10
-        if result['seo_data']['images_without_alt'] > 0:
-            seo_score -= 10
-        
-        result['seo_score'] = max(0, seo_score)
-        
-        # Detect technologies
-        result['technologies'] = detect_technologies(rendered_soup, raw_response.headers)
-        
-        # SPA detection
-        spa_indicators = 0
-        if result['js_percentage'] > 30:
-            spa_indicators += 30
-        if any(tech in ['React', 'Vue.js', 'Angular'] for tech in result['technologies']):
-            spa_indicators += 40
-        if rendered_soup.find('div', {'id': ['root', 'app']}):
-            spa_indicators += 30
-        
-        result['spa_score'] = spa_indicators
-        result['is_spa'] = spa_indicators > 50
-        
-        # Speed score
-        result['speed_score'] = analyze_page_speed(result['response_time'], result['size_bytes'])
-        
-    except Exception as e:
-        result['errors'].append(f"Processing error during analysis: {str(e)}")
-    
-    result['response_time'] = time.time() - start_time
-    return result
-
-def parse_sitemap(sitemap_url):
-    """Fetches and parses a sitemap URL to extract all contained URLs."""
-    urls = []
-    try:
-        response = requests.get(sitemap_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'xml')
-        locs = soup.find_all('loc')
-        urls = [loc.text for loc in locs]
-        st.success(f"Found {len(urls)} URLs in sitemap.")
-    except Exception as e:
-        st.error(f"Failed to parse sitemap: {e}")
-    return urls
-
+crawl_store = open_crawl_store(crawl_store_path) if use_crawl_store else None
+html_blobs = crawl_store.blobs if crawl_store else open_blob_store(os.path.join(cache_dir, 'html'))
 
 # Main interface
 col1, col2 = st.columns([2, 1])
@@ -841,9 +483,9 @@ with col1:
     
     else:  # Sitemap
         sitemap_url = st.text_input("Sitemap URL:", "https://example.com/sitemap.xml")
-        urls_to_crawl = []
-        if sitemap_url and st.button("Fetch URLs from Sitemap"):
-            urls_to_crawl = parse_sitemap(sitemap_url)
+        # Read lazily: URLs stream into the crawl as the sitemap (and any sitemap index children) are parsed
+        urls_to_crawl = iter_sitemap(sitemap_url.strip()) if sitemap_url.strip() else []
+        st.caption("Sitemap indexes and .xml.gz sitemaps are followed; URLs are crawled as they are discovered.")
 
 with col2:
     st.subheader("📊 Quick Stats")
@@ -878,78 +520,168 @@ with col3:
         if st.session_state.driver_manager:
             st.session_state.driver_manager.cleanup()
             st.session_state.driver_manager = None
+        if st.session_state.http_sessions:
+            st.session_state.http_sessions.close()
+            st.session_state.http_sessions = None
         st.session_state.selected_url_for_diff = None
         st.rerun()
 
+export_extension, export_mime = EXPORT_FORMATS[export_format]
+export_path = os.path.join(cache_dir, f"crawl_results{export_extension}")
+
 with col4:
     if st.session_state.crawl_results:
-        # Prepare data for export
-        df = pd.DataFrame(st.session_state.crawl_results)
-        if export_format == "CSV":
-            csv = df.to_csv(index=False)
-            st.download_button("💾 Export CSV", csv, "crawl_results.csv", "text/csv")
-        elif export_format == "Excel":
-            from io import BytesIO
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Crawl Results')
-            excel_data = output.getvalue()
-            st.download_button("💾 Export Excel", excel_data, "crawl_results.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # Write the export to disk in chunks, only when asked; HTML stays in the blob store as references
+        if st.button(f"📦 Prepare {export_format}"):
+            export_results(st.session_state.crawl_results, export_path)
+        if os.path.exists(export_path):
+            with open(export_path, 'rb') as export_file:
+                st.download_button(f"💾 Export {export_format}", export_file, os.path.basename(export_path), export_mime)
 
 # Crawling logic
 if st.session_state.crawl_running and urls_to_crawl:
     if st.session_state.driver_manager is None:
-        st.session_state.driver_manager = WebDriverManager()
+        st.session_state.driver_manager = WebDriverPool(
+            size=concurrent_requests,
+            max_pages_per_driver=driver_recycle_pages
+        )
+    if st.session_state.http_sessions is None:
+        st.session_state.http_sessions = HTTPSessionPool(
+            pool_maxsize=connections_per_host,
+            http2=enable_http2
+        )
     
     config = {
         'timeout': page_timeout,
         'js_wait': js_wait_time,
         'enable_js': enable_js_rendering,
-        'concurrent': concurrent_requests
+        'render_mode': 'auto' if adaptive_rendering else 'always',
+        'extract_in_browser': extract_in_browser,
+        'concurrent': concurrent_requests,
+        'http2': enable_http2,
+        'wait_strategy': 'fixed' if wait_strategy == "Fixed" else 'adaptive',
+        'quiet_window': quiet_window_ms / 1000,
+        'block_resource_types': block_resource_types,
+        'block_trackers': block_trackers,
+        'block_third_party': block_third_party,
+        'max_per_host': max_per_host,
+        'host_delay': host_delay,
+        'respect_robots': respect_robots,
+        'follow_links': check_links
     }
     
+    url_entries = (entry if isinstance(entry, SitemapEntry) else SitemapEntry(entry, None) for entry in urls_to_crawl)
+    link_frontier = None
+    skipped_urls = []
+    if check_links:
+        # Follow internal links breadth-first from the input URLs
+        link_frontier = LinkFrontier(
+            (entry.url for entry in url_entries),
+            max_depth=max_link_depth,
+            max_pages=max_link_pages,
+            ignore_query=ignore_query_params,
+            exclude_patterns=exclude_patterns.splitlines()
+        )
+    elif crawl_store and incremental_crawl:
+        # Skip URLs whose stored result is still fresh and unchanged according to the sitemap's lastmod
+        def due_entries(entries):
+            for entry in entries:
+                if crawl_store.is_due(entry.url, recrawl_after_hours * 3600, entry.lastmod):
+                    yield entry
+                else:
+                    skipped_urls.append(entry.url)
+        url_entries = due_entries(url_entries)
+        st.info(f"Incremental crawl: URLs crawled in the last {recrawl_after_hours} hours are skipped.")
+    crawl_error = None
+    
+    live_exporter = open_exporter(export_path, chunk_size=100) if export_while_crawling else None
+    
     progress_container = st.container()
     with progress_container:
         st.subheader("🔄 Crawling in Progress")
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        # Process URLs
-        with ThreadPoolExecutor(max_workers=concurrent_requests) as executor:
-            futures = []
-            for i, url in enumerate(urls_to_crawl):
-                if not st.session_state.crawl_running:
-                    break
-                    
-                future = executor.submit(crawl_single_url, url, st.session_state.driver_manager, config)
-                futures.append((future, url, i))
-            
-            # Collect results
-            for future, url, index in futures:
+        # Process URLs through the fetch -> render -> analysis pipeline
+        pipeline = CrawlPipeline(
+            st.session_state.driver_manager,
+            st.session_state.http_sessions,
+            config,
+            fetch_workers=fetch_workers,
+            analysis_workers=analysis_workers,
+            analysis_processes=analysis_processes,
+            raw_cache=RawHTMLCache(os.path.join(cache_dir, 'raw')) if use_raw_cache else None,
+            render_cache=RenderCache(os.path.join(cache_dir, 'render'), render_cache_mb * 1024 * 1024) if use_render_cache and enable_js_rendering else None,
+            on_result=link_frontier.add_result if link_frontier else None
+        )
+        try:
+            for index, result in enumerate(pipeline.run(link_frontier or (entry.url for entry in url_entries))):
                 if not st.session_state.crawl_running:
+                    pipeline.stop()
                     break
-                    
-                try:
-                    # Get the result from the future
-                    result = future.result(timeout=page_timeout + 15) # Increased timeout for safety
-                    st.session_state.crawl_results.append(result)                    
-                    progress = (index + 1) / len(urls_to_crawl)
-                    progress_bar.progress(progress)
-                    status_text.text(f"Processed: {url}")
-                    
-                except Exception as e:
-                    # If the future failed, create a partial result to record the error
-                    error_result = {'url': url, 'status_code': 'Error', 'errors': [str(e)]}
-                    st.session_state.crawl_results.append(error_result)
-                    st.warning(f"Failed to process {url}: {e}") # Use warning for non-blocking errors
-    
-    # Cleanup
-    if st.session_state.driver_manager:
-        st.session_state.driver_manager.cleanup()
-        st.session_state.driver_manager = None
-    st.session_state.crawl_running = False
-    st.success("🎉 Crawling completed!")
-    st.rerun()
+
+                st.session_state.crawl_results.append(html_blobs.offload(result))
+                if crawl_store:
+                    crawl_store.save(result)
+                if live_exporter:
+                    live_exporter.write(result)
+                pipeline_stats = pipeline.stats()
+                # The total grows while a sitemap is still being read
+                progress = min(1.0, (index + 1) / max(pipeline_stats['submitted'], 1))
+                progress_bar.progress(progress)
+                pool_stats = st.session_state.driver_manager.stats()
+                queue_depth = pipeline_stats['queue_depth']
+                host_stats = st.session_state.http_sessions.stats().values()
+                total_requests = sum(h['requests'] for h in host_stats)
+                total_connections = sum(h['new_connections'] for h in host_stats)
+                status_message = (
+                    f"Processed: {result['url']} | Queued - fetch: {queue_depth['fetch']}, "
+                    f"render: {queue_depth['render']}, analysis: {queue_depth['analysis']} | "
+                    f"Connections: {total_connections} for {total_requests} requests | "
+                    f"Browsers: {pool_stats['live_drivers']}/{pool_stats['size']} | "
+                    f"Avg browser wait: {pool_stats['avg_wait_time']:.2f}s"
+                )
+                throttled = sum(host['throttled'] for host in pipeline_stats['hosts'].values())
+                if throttled:
+                    status_message += f" | Throttled (429/503): {throttled}"
+                if link_frontier:
+                    frontier_stats = link_frontier.stats()
+                    status_message += (
+                        f" | Frontier: {frontier_stats['queued']} queued, {frontier_stats['seen']} unique of "
+                        f"{frontier_stats['discovered_links']} links found"
+                    )
+                if config['render_mode'] == 'auto':
+                    auto_stats = pipeline_stats['auto_render']
+                    status_message += (
+                        f" | Skipped renders: {auto_stats['skipped']} (sampled {auto_stats['sampled']}, "
+                        f"misprediction rate {auto_stats['misprediction_rate']:.1%})"
+                    )
+                status_text.text(status_message)
+        except URLSourceError as e:
+            # The sitemap could not be read; keep the pages crawled so far
+            crawl_error = e
+        finally:
+            # Cleanup, also when the crawl failed with an unexpected error
+            if link_frontier:
+                link_frontier.close()
+            if live_exporter:
+                live_exporter.close()
+            if st.session_state.driver_manager:
+                st.session_state.driver_manager.cleanup()
+                st.session_state.driver_manager = None
+            if st.session_state.http_sessions:
+                st.session_state.http_sessions.close()
+                st.session_state.http_sessions = None
+            st.session_state.crawl_running = False
+    
+    if skipped_urls:
+        # Fresh results skipped by an incremental crawl are part of this run's results
+        st.session_state.crawl_results.extend(crawl_store.load(skipped_urls))
+    if crawl_error:
+        st.error(f"Failed to read URLs: {crawl_error}")
+    else:
+        st.success("🎉 Crawling completed!")
+        st.rerun()
 
 # Results Display
 if st.session_state.crawl_results:
@@ -989,11 +721,12 @@ if st.session_state.crawl_results:
         st.subheader("📋 Detailed Results")
         
         # Prepare display dataframe
-        display_cols = ['url', 'status_code', 'response_time', 'size_bytes', 'js_percentage', 
-                       'speed_score', 'seo_score', 'is_spa', 'technologies']
+        display_cols = ['url', 'status_code', 'response_time', 'settle_time', 'size_bytes', 'js_percentage', 
+                       'speed_score', 'seo_score', 'is_spa', 'technologies', 'blocked_requests']
         
         display_df = results_df[display_cols].copy()
         display_df['response_time'] = display_df['response_time'].round(2)
+        display_df['settle_time'] = display_df['settle_time'].round(2)
         display_df['js_percentage'] = display_df['js_percentage'].round(1)
         display_df['size_bytes'] = (display_df['size_bytes'] / 1024).round(1)  # Convert to KB
         
@@ -1014,23 +747,23 @@ if st.session_state.crawl_results:
         st.write("Compare original HTML with JavaScript-rendered HTML to see what changes after page load.")
         
         # URL selector
-        urls_with_data = [r['url'] for r in st.session_state.crawl_results if r.get('raw_html')] # Show if raw HTML is available
+        urls_with_data = [r['url'] for r in st.session_state.crawl_results if r.get('raw_html_ref')] # Show if raw HTML is available
         
         if urls_with_data:
             selected_url = st.selectbox(
                 "Select URL to analyze:",
                 urls_with_data,
-                key="diff_url_selector"
+                key="diff_url_selector",
+                on_change=reset_diff_page
             )
             
             if selected_url:
                 # Find the result for this URL
                 selected_result = next((r for r in st.session_state.crawl_results if r['url'] == selected_url), None)
                 
-                # Ensure raw_html is present. rendered_html might be empty if Selenium failed.
-                if selected_result and selected_result.get('raw_html'):
-                    # Provide an empty string for rendered_html if it's missing
-                    rendered_html_for_diff = selected_result.get('rendered_html', '')
+                # Load the HTML bodies for this page only. rendered_html might be empty if Selenium failed.
+                raw_html_for_diff, rendered_html_for_diff = html_blobs.load_html(selected_result) if selected_result else ('', '')
+                if raw_html_for_diff:
                     # Diff analysis controls
                     col1, col2, col3 = st.columns(3)
                     
@@ -1043,6 +776,15 @@ if st.session_state.crawl_results:
                     with col3:
                         auto_scroll_to_changes = st.checkbox("Auto-scroll to changes", True)
                     
+                    search_cols = st.columns(3)
+                    
+                    with search_cols[0]:
+                        search_regex = st.checkbox("Regular expression", False)
+                    with search_cols[1]:
+                        search_match_case = st.checkbox("Match case", False)
+                    with search_cols[2]:
+                        search_changed_only = st.checkbox("Search changed lines only", False)
+                    
                     # Category filters
                     st.write("**Filter by change type:**")
                     filter_cols = st.columns(6)
@@ -1060,112 +802,231 @@ if st.session_state.crawl_results:
                     with filter_cols[5]:
                         show_other = st.checkbox("Other", True)
                     
-                    # Create diff analyzer
-                    diff_analyzer = HTMLDiffAnalyzer(
-                        selected_result['raw_html'],
-                        rendered_html_for_diff # Use the potentially empty string
-                    )
-                    
-                    # Get statistics
-                    stats = diff_analyzer.get_change_statistics()
-                    
-                    # Display key metrics
-                    st.subheader("📊 Diff Statistics")
+                    selected_categories = {
+                        category for category, shown in (
+                            ('javascript', show_js), ('metadata', show_meta), ('content', show_content),
+                            ('stylesheet', show_styles), ('attributes', show_attributes), ('other', show_other),
+                        ) if shown
+                    }
                     
-                    metric_cols = st.columns(6)
-                    with metric_cols[0]:
-                        st.metric("Lines Added", stats['lines_added'])
-                    with metric_cols[1]:
-                        st.metric("Lines Removed", stats['lines_removed'])
-                    with metric_cols[2]:
-                        st.metric("Lines Modified", stats['lines_modified'])
-                    with metric_cols[3]:
-                        st.metric("JS Injections", stats['js_injections'])
-                    with metric_cols[4]:
-                        st.metric("Meta Changes", stats['meta_changes'])
-                    with metric_cols[5]:
-                        similarity_pct = stats['similarity_ratio'] * 100
-                        st.metric("Similarity", f"{similarity_pct:.1f}%")
+                    # Stored results reference their HTML by content hash; the diff itself is cached on it
+                    raw_hash = selected_result.get('raw_html_ref') or content_hash(raw_html_for_diff)
+                    rendered_hash = selected_result.get('rendered_html_ref') or content_hash(rendered_html_for_diff)
                     
-                    # Export diff options
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        if st.button("📥 Download Original HTML"):
-                            st.download_button(
-                                "Download",
-                                selected_result['raw_html'],
-                                f"original_{selected_url.replace('https://', '').replace('/', '_')}.html",
-                                mime="text/html"
-                            )
-                    
-                    with col2:
-                        if st.button("📥 Download Rendered HTML"):
-                            st.download_button(
-                                "Download",
-                                selected_result['rendered_html'],
-                                f"rendered_{selected_url.replace('https://', '').replace('/', '_')}.html",
-                                mime="text/html"
-                            )
+                    if diff_mode == "DOM Tree":
+                        # Structural diff: identical subtrees are skipped by their Merkle hash
+                        tree_diff = load_tree_diff(selected_url, raw_hash, rendered_hash, raw_html_for_diff,
+                                                   rendered_html_for_diff)
+                        tree_stats = tree_diff.get_change_statistics()
+                        
+                        st.subheader("📊 Structural Diff Statistics")
+                        
+                        metric_cols = st.columns(6)
+                        with metric_cols[0]:
+                            st.metric("Nodes Added", tree_stats['nodes_added'])
+                        with metric_cols[1]:
+                            st.metric("Nodes Removed", tree_stats['nodes_removed'])
+                        with metric_cols[2]:
+                            st.metric("Attribute Changes", tree_stats['attribute_changes'])
+                        with metric_cols[3]:
+                            st.metric("Text Changes", tree_stats['text_changes'])
+                        with metric_cols[4]:
+                            st.metric("JS Injections", tree_stats['js_injections'])
+                        with metric_cols[5]:
+                            st.metric("Similarity", f"{tree_stats['similarity_ratio'] * 100:.1f}%")
+                        
+                        st.subheader("🌳 Node Changes")
+                        tree_changes = tree_diff.get_detailed_changes(selected_categories)
+                        if tree_changes:
+                            st.dataframe(pd.DataFrame([
+                                {
+                                    'Type': change['type'],
+                                    'Category': change['category'],
+                                    'Path': change['path'],
+                                    'Nodes': change.get('nodes', 1),
+                                    'Original': change.get('original', ''),
+                                    'Rendered': change.get('rendered', ''),
+                                    'Attributes': ', '.join(
+                                        f"{name}: {old or ''} → {new or ''}" for name, (old, new) in change.get('attributes', {}).items()
+                                    ),
+                                }
+                                for change in tree_changes
+                            ]), use_container_width=True)
+                        elif tree_diff.get_detailed_changes():
+                            st.info("No changes of the selected types.")
+                        else:
+                            st.info("No structural changes detected between original and rendered HTML.")
                     
-                    with col3:
-                        if st.button("📥 Download Diff Report"):
-                            diff_lines = diff_analyzer.generate_diff()
-                            diff_text = '\n'.join(diff_lines)
-                            st.download_button(
-                                "Download",
-                                diff_text,
-                                f"diff_{selected_url.replace('https://', '').replace('/', '_')}.diff",
-                                mime="text/plain"
+                    else:
+                        # Diff analyzer shared across reruns: filters and paging reuse its opcodes
+                        diff_analyzer = load_line_diff(
+                            selected_url,
+                            raw_hash,
+                            rendered_hash,
+                            diff_engine,
+                            raw_html_for_diff,
+                            rendered_html_for_diff # Use the potentially empty string
+                        )
+                        
+                        # Get statistics
+                        stats = diff_analyzer.get_change_statistics()
+                        
+                        # Display key metrics
+                        st.subheader("📊 Diff Statistics")
+                        
+                        metric_cols = st.columns(6)
+                        with metric_cols[0]:
+                            st.metric("Lines Added", stats['lines_added'])
+                        with metric_cols[1]:
+                            st.metric("Lines Removed", stats['lines_removed'])
+                        with metric_cols[2]:
+                            st.metric("Lines Modified", stats['lines_modified'])
+                        with metric_cols[3]:
+                            st.metric("JS Injections", stats['js_injections'])
+                        with metric_cols[4]:
+                            st.metric("Meta Changes", stats['meta_changes'])
+                        with metric_cols[5]:
+                            similarity_pct = stats['similarity_ratio'] * 100
+                            st.metric("Similarity", f"{similarity_pct:.1f}%")
+                        
+                        # Export diff options
+                        col1, col2, col3 = st.columns(3)
+                        
+                        with col1:
+                            if st.button("📥 Download Original HTML"):
+                                st.download_button(
+                                    "Download",
+                                    raw_html_for_diff,
+                                    f"original_{selected_url.replace('https://', '').replace('/', '_')}.html",
+                                    mime="text/html"
+                                )
+                        
+                        with col2:
+                            if st.button("📥 Download Rendered HTML"):
+                                st.download_button(
+                                    "Download",
+                                    rendered_html_for_diff,
+                                    f"rendered_{selected_url.replace('https://', '').replace('/', '_')}.html",
+                                    mime="text/html"
+                                )
+                        
+                        with col3:
+                            if st.button("📥 Download Diff Report"):
+                                diff_lines = diff_analyzer.generate_diff(context_lines)
+                                diff_text = '\n'.join(diff_lines)
+                                st.download_button(
+                                    "Download",
+                                    diff_text,
+                                    f"diff_{selected_url.replace('https://', '').replace('/', '_')}.diff",
+                                    mime="text/plain"
+                                )
+                        
+                        # Create and display diff viewer
+                        st.subheader("🔄 Side-by-Side HTML Comparison")
+                        if not rendered_html_for_diff and selected_result.get('rendered_html_size'):
+                            st.warning("This URL was analyzed in the browser and its rendered HTML was not transferred. Displaying raw HTML vs. empty content.")
+                        elif not rendered_html_for_diff:
+                            st.warning("Rendered HTML is not available for this URL. Displaying raw HTML vs. empty content.")
+                        
+                        # Only one page of hunks is rendered; unchanged runs between them are collapsed
+                        viewer_pages = diff_analyzer.get_viewer_pages(
+                            0 if show_only_changes else context_lines,
+                            diff_page_rows,
+                            selected_categories
+                        )
+                        
+                        # Search runs on the cached analyzer's line indexes, not on the rendered rows
+                        search_pattern = None
+                        if search_term:
+                            try:
+                                search_pattern = compile_query(search_term, search_regex, search_match_case)
+                                original_matches, rendered_matches = diff_analyzer.search(
+                                    search_term, search_regex, search_match_case, search_changed_only
+                                )
+                            except re.error as e:
+                                st.error(f"Invalid regular expression: {e}")
+                                search_pattern = None
+                        
+                        if viewer_pages:
+                            page_count = len(viewer_pages)
+                            if st.session_state.diff_page > page_count:
+                                st.session_state.diff_page = page_count
+                        
+                            if search_pattern is not None:
+                                match_pages = diff_analyzer.find_pages(viewer_pages, original_matches, rendered_matches)
+                                match_cols = st.columns([1, 2, 1])
+                                with match_cols[0]:
+                                    st.button("⏮️ Previous Match", on_click=step_match_page, args=(match_pages, -1),
+                                              disabled=not match_pages)
+                                with match_cols[1]:
+                                    st.caption(
+                                        f"🔍 {len(original_matches)} matching lines in the original and "
+                                        f"{len(rendered_matches)} in the rendered HTML, on {len(match_pages)} pages "
+                                        "(matches in hidden lines are not shown)"
+                                    )
+                                with match_cols[2]:
+                                    st.button("Next Match ⏭️", on_click=step_match_page, args=(match_pages, 1),
+                                              disabled=not match_pages)
+                        
+                            nav_cols = st.columns([1, 2, 1])
+                            with nav_cols[0]:
+                                st.button("⬅️ Previous Changes", on_click=step_diff_page, args=(-1, page_count),
+                                          disabled=st.session_state.diff_page <= 1)
+                            with nav_cols[1]:
+                                st.number_input(f"Page (of {page_count})", 1, page_count, key="diff_page")
+                            with nav_cols[2]:
+                                st.button("Next Changes ➡️", on_click=step_diff_page, args=(1, page_count),
+                                          disabled=st.session_state.diff_page >= page_count)
+                        
+                            diff_html = create_diff_viewer_html(
+                                diff_analyzer,
+                                viewer_pages[st.session_state.diff_page - 1],
+                                search_pattern=search_pattern
                             )
-                    
-                    # Create and display diff viewer
-                    st.subheader("🔄 Side-by-Side HTML Comparison")
-                    if not rendered_html_for_diff:
-                        st.warning("Rendered HTML is not available for this URL. Displaying raw HTML vs. empty content.")
-                    
-                    diff_html = create_diff_viewer_html(
-                        diff_analyzer,
-                        search_term=search_term,
-                        show_only_changes=show_only_changes
-                    )
-                    
-                    # Display the diff viewer
-                    st.markdown(diff_html, unsafe_allow_html=True)
-                    
-                    # Additional insights
-                    st.subheader("💡 Change Insights")
-                    
-                    changes = diff_analyzer.get_detailed_changes()
-                    
-                    if changes:
-                        # Group changes by category
-                        change_categories = defaultdict(list)
-                        for change in changes:
-                            change_categories[change['category']].append(change)
                         
-                        # Display insights by category
-                        for category, category_changes in change_categories.items():
-                            if category_changes:
-                                with st.expander(f"📝 {category.title()} Changes ({len(category_changes)})"):
-                                    for i, change in enumerate(category_changes[:10]):  # Limit to first 10
-                                        st.write(f"**Change {i+1}:** {change['type'].title()}")
+                            # Display the diff viewer
+                            st.markdown(diff_html, unsafe_allow_html=True)
+                        elif diff_analyzer.get_detailed_changes():
+                            st.info("No changes of the selected types.")
+                        else:
+                            st.info("The rendered HTML is identical to the original HTML.")
+                        
+                        # Additional insights
+                        st.subheader("💡 Change Insights")
+                        
+                        changes = diff_analyzer.get_detailed_changes(selected_categories)
+                        
+                        if changes:
+                            # Group changes by category
+                            change_categories = defaultdict(list)
+                            for change in changes:
+                                change_categories[change['category']].append(change)
+                        
+                            # Display insights by category
+                            for category, category_changes in change_categories.items():
+                                if category_changes:
+                                    with st.expander(f"📝 {category.title()} Changes ({len(category_changes)})"):
+                                        for i, change in enumerate(category_changes[:10]):  # Limit to first 10
+                                            st.write(f"**Change {i+1}:** {change['type'].title()}")
                                         
-                                        if change['original_lines']:
-                                            st.write("**Original:**")
-                                            st.code('\n'.join(change['original_lines'][:3]), language='html')
+                                            if change['original_lines']:
+                                                st.write("**Original:**")
+                                                st.code('\n'.join(change['original_lines'][:3]), language='html')
                                         
-                                        if change['rendered_lines']:
-                                            st.write("**Rendered:**")
-                                            st.code('\n'.join(change['rendered_lines'][:3]), language='html')
+                                            if change['rendered_lines']:
+                                                st.write("**Rendered:**")
+                                                st.code('\n'.join(change['rendered_lines'][:3]), language='html')
                                         
-                                        st.markdown("---")
+                                            st.markdown("---")
                                     
-                                    if len(category_changes) > 10:
-                                        st.info(f"... and {len(category_changes) - 10} more {category} changes")
-                    
-                    else:
-                        st.info("No significant changes detected between original and rendered HTML.")
+                                        if len(category_changes) > 10:
+                                            st.info(f"... and {len(category_changes) - 10} more {category} changes")
+                        
+                        elif diff_analyzer.get_detailed_changes():
+                            st.info("No changes of the selected types.")
+                        else:
+                            st.info("No significant changes detected between original and rendered HTML.")
+                
                 
                 else:
                     st.warning("Raw HTML data not available for this URL. Please re-crawl to generate diff data.")
@@ -1249,6 +1110,23 @@ if st.session_state.crawl_results:
                         title='Technology Usage',
                         labels={'x': 'Technology', 'y': 'Usage Count'})
             st.plotly_chart(fig, width='stretch')
+            
+            # Versions seen per technology, most used first
+            versions = defaultdict(set)
+            for result in st.session_state.crawl_results:
+                for name, version in result.get('technology_versions', {}).items():
+                    versions[name].add(version)
+            tech_rows = [{
+                'Technology': name,
+                'Category': TECHNOLOGY_SIGNATURES.get(name, {}).get('category', ''),
+                'Pages': pages,
+                'Versions': ', '.join(sorted(versions[name])),
+            } for name, pages in tech_counts.most_common()]
+            st.dataframe(pd.DataFrame(tech_rows), use_container_width=True, hide_index=True)
+            
+            detection_times = [r.get('technology_time', 0) for r in st.session_state.crawl_results]
+            st.caption(f"Signature matching took {sum(detection_times) / len(detection_times) * 1000:.1f}ms per page "
+                       f"on average across {len(TECHNOLOGY_SIGNATURES)} technologies")
         else:
             st.info("No technologies detected in crawled pages")
     
@@ -1299,6 +1177,29 @@ if st.session_state.crawl_results:
     else:
         st.success("🎉 No major issues detected!")
 
+# Stored results of every crawl, read from the database a page at a time
+if crawl_store:
+    st.header("🗄️ Crawl Store")
+    store_summary = crawl_store.summary(ttl=recrawl_after_hours * 3600)
+    store_cols = st.columns(4)
+    with store_cols[0]:
+        st.metric("Stored URLs", store_summary['urls'])
+    with store_cols[1]:
+        st.metric("Due for Recrawl", store_summary['due'])
+    with store_cols[2]:
+        st.metric("SPA Pages", store_summary['spa_pages'])
+    with store_cols[3]:
+        top_technologies = list(crawl_store.technology_counts())[:3]
+        st.metric("Top Technologies", ", ".join(top_technologies) or "-")
+    
+    if store_summary['urls']:
+        store_pages = -(-store_summary['urls'] // STORE_PAGE_ROWS)
+        st.session_state.store_page = min(st.session_state.store_page, store_pages)
+        store_page = st.number_input(f"Page (of {store_pages})", 1, store_pages, key='store_page')
+        stored_results = crawl_store.load(limit=STORE_PAGE_ROWS, offset=(store_page - 1) * STORE_PAGE_ROWS)
+        stored_df = pd.DataFrame(stored_results).reindex(columns=STORE_DISPLAY_COLUMNS)
+        st.dataframe(stored_df, use_container_width=True, hide_index=True)
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1306,7 +1207,7 @@ st.markdown("""
 - **Advanced HTML Diff Viewer** with side-by-side comparison and change highlighting
 - **Concurrent crawling** with WebDriver pooling for maximum speed
 - **Comprehensive SEO analysis** including title tags, meta descriptions, headings
-- **Technology detection** for frameworks and server technologies  
+- **Technology detection** for frameworks, libraries, CMS, analytics, CDNs and servers, with versions  
 - **SPA identification** with confidence scoring
 - **Performance metrics** with speed scoring algorithm
 - **Issue detection** with severity levels
@@ -0,0 +1,87 @@
+"""Benchmark line diff engines on raw vs rendered HTML pairs of 5k, 50k and 200k lines.
+
+The pairs mimic prettified SPA pages: the raw HTML is a server-rendered
+shell with part of the catalog, the rendered DOM adds the client-rendered
+tiles, hydration attributes and injected scripts, so most lines are
+repeated closing tags. Run from the repository root::
+
+    python benchmarks/bench_diff.py [--difflib-max-lines N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.linediff import DIFF_ENGINES, similarity_ratio  # noqa: E402
+
+SIZES = (5000, 50000, 200000)
+
+
+def tile_lines(i, rendered):
+    """Prettified lines of one product tile; the rendered DOM carries hydration attributes"""
+    attrs = f' data-v-{i % 7:x}3f2a' if rendered else ''
+    hydrated = rendered and i % 5 == 0
+    return [
+        f'<div class="card"{attrs} data-sku="{i}">',
+        ' <div class="card-body">',
+        '  <h2>',
+        f'   Product {i}',
+        '  </h2>',
+        f'  <img alt="Product" src="/img/{i}.jpg"/>' if i % 3 else f'  <img src="/img/{i}.jpg"/>',
+        '  <p>',
+        '   In stock' if hydrated else '   Loading...',
+        '  </p>',
+        f'  <a href="/product/{i}">',
+        '   View',
+        '  </a>',
+        ' </div>',
+        '</div>',
+    ]
+
+
+def make_pair(lines):
+    """Raw and rendered line lists, the rendered one about ``lines`` long"""
+    head = ['<!DOCTYPE html>', '<html>', ' <head>', '  <title>', '   Catalog', '  </title>',
+            '  <meta content="width=device-width" name="viewport"/>',
+            '  <script src="/static/js/main.js">', '  </script>', ' </head>', ' <body>', '  <div id="root">']
+    tail = ['  </div>', ' </body>', '</html>']
+    tiles = max(1, (lines - len(head) - len(tail)) // 15)
+    raw, rendered = list(head), list(head)
+    rendered[7:7] = ['  <meta content="Catalog" property="og:title"/>', '  <style data-emotion="css">', '  </style>']
+    for i in range(tiles):
+        if i < tiles // 2:
+            # Server-rendered half of the catalog
+            raw.extend(tile_lines(i, rendered=False))
+        rendered.extend(tile_lines(i, rendered=True))
+        if i % 50 == 0:
+            rendered.extend(['<script async="" src="/chunk-%d.js">' % i, '</script>'])
+    return raw + tail, rendered + tail
+
+
+def time_engine(engine, raw, rendered):
+    start = time.perf_counter()
+    opcodes = DIFF_ENGINES[engine](raw, rendered)
+    return time.perf_counter() - start, similarity_ratio(opcodes, len(raw), len(rendered))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--difflib-max-lines', type=int, default=50000,
+                        help='Skip difflib above this many rendered lines (it is quadratic on repeated lines)')
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'raw':>8} {'engine':>10} {'time':>10} {'similarity':>11}")
+    for size in SIZES:
+        raw, rendered = make_pair(size)
+        for engine in DIFF_ENGINES:
+            if engine == 'difflib' and len(rendered) > args.difflib_max_lines:
+                print(f"{len(rendered):>8} {len(raw):>8} {engine:>10} {'skipped':>10}")
+                continue
+            elapsed, ratio = time_engine(engine, raw, rendered)
+            print(f"{len(rendered):>8} {len(raw):>8} {engine:>10} {elapsed * 1000:>8.0f}ms {ratio:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
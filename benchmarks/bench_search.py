@@ -0,0 +1,64 @@
+"""Benchmark diff viewer search on a 100k-line rendered DOM: per-line scan vs LineSearchIndex.
+
+The per-line scan is what the viewer did on every rerun: lower each line
+and test ``term in line``. The index joins the lines once and answers each
+query with one scan over the joined text. Run from the repository root::
+
+    python benchmarks/bench_search.py [--lines N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.search import LineSearchIndex  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_diff import make_pair  # noqa: E402
+
+# (label, query, regex, case_sensitive)
+QUERIES = (
+    ('rare term', 'product 4242', False, False),
+    ('common term', 'card-body', False, False),
+    ('match case', 'Loading', False, True),
+    ('regex', r'data-sku="\d+7"', True, False),
+    ('no match', 'checkout-button', False, False),
+)
+
+
+def per_line_scan(lines, query):
+    term = query.lower()
+    return [number for number, line in enumerate(lines) if term in line.lower()]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=100000, help='Approximate number of rendered lines')
+    args = parser.parse_args()
+
+    _, rendered = make_pair(args.lines)
+    build_ms, index = timed(LineSearchIndex, rendered)
+    print(f"{len(rendered)} lines, index built in {build_ms:.0f}ms")
+    print(f"{'query':>12} {'matches':>8} {'per line':>10} {'index':>10}")
+    for label, query, regex, case_sensitive in QUERIES:
+        index_ms, matches = timed(index.search, query, regex, case_sensitive)
+        if regex or case_sensitive:
+            scan = '-'
+        else:
+            scan_ms, expected = timed(per_line_scan, rendered, query)
+            assert matches == expected, label
+            scan = f'{scan_ms:.1f}ms'
+        print(f"{label:>12} {len(matches):>8} {scan:>10} {index_ms:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark SEO extraction: BeautifulSoup traversals vs the single-pass lxml scanner.
+
+Run from the repository root::
+
+    python benchmarks/bench_seo_extract.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from crawler.analysis import extract_seo_data  # noqa: E402
+from crawler.scanner import scan_html  # noqa: E402
+
+
+def make_rendered_page(cards):
+    """Build a rendered e-commerce style page with ``cards`` product tiles"""
+    head = (
+        '<!DOCTYPE html><html><head><title> Big Catalog Page </title>'
+        '<meta name="description" content="All the products">'
+        '<meta name="robots" content="index,follow">'
+        '<meta property="og:title" content="Catalog">'
+        '<link rel="canonical" href="https://shop.example.com/catalog">'
+        '<script src="/static/js/react.production.min.js"></script>'
+        '<script type="application/ld+json">{"@type": "ItemList"}</script>'
+        '</head><body><div id="root"><h1>Catalog</h1>'
+    )
+    tile = (
+        '<div class="card" data-sku="{i}"><h2>Product {i}</h2>'
+        '<img src="/img/{i}.jpg"{alt}><p>Short <b>bold</b>text for product {i} with a few words.</p>'
+        '<a href="/product/{i}">View</a> <a href="https://reviews.example.org/{i}">Reviews</a>'
+        '<!-- tracking {i} --></div>\n'
+    )
+    body = ''.join(tile.format(i=i, alt=' alt="Product"' if i % 3 else '') for i in range(cards))
+    return head + body + '</div><script>window.__STATE__ = {"ready": true};</script></body></html>'
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'cards':>8} {'size KB':>9} {'bs4 html.parser':>16} {'bs4 lxml':>10} {'scanner':>10} {'speedup':>8}")
+    for cards in (100, 1000, 5000, 20000):
+        html_content = make_rendered_page(cards)
+        repeat = 5 if cards <= 1000 else 1
+
+        expected = extract_seo_data(BeautifulSoup(html_content, 'html.parser'))
+        actual = scan_html(html_content).seo_data
+        if expected != actual:
+            raise SystemExit(f"Scanner output differs for {cards} cards:\n{expected}\n{actual}")
+
+        t_html_parser = best_of(lambda: extract_seo_data(BeautifulSoup(html_content, 'html.parser')), repeat)
+        t_bs4_lxml = best_of(lambda: extract_seo_data(BeautifulSoup(html_content, 'lxml')), repeat)
+        t_scanner = best_of(lambda: scan_html(html_content), repeat)
+        print(f"{cards:>8} {len(html_content) / 1024:>9.0f} {t_html_parser * 1000:>14.1f}ms "
+              f"{t_bs4_lxml * 1000:>8.1f}ms {t_scanner * 1000:>8.1f}ms {t_html_parser / t_scanner:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
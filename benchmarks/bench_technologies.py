@@ -0,0 +1,74 @@
+"""Benchmark technology detection: re-serializing the soup vs the compiled signature detector.
+
+The serializing version is what ``detect_technologies`` did with a
+BeautifulSoup tree: ``str(soup).lower()`` and a few substring checks.
+The detector matches the full signature database against the markup as
+fetched, running only the patterns whose keyword the page contains.
+Run from the repository root::
+
+    python benchmarks/bench_technologies.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from crawler.technologies import DEFAULT_DETECTOR, TECHNOLOGY_SIGNATURES  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_seo_extract import make_rendered_page  # noqa: E402
+
+HEADERS = {'server': 'nginx/1.25.3', 'x-powered-by': 'PHP/8.2.1', 'set-cookie': 'PHPSESSID=abc; path=/'}
+
+# Markers of a WordPress shop with a few common third-party scripts
+EXTRA_HEAD = (
+    '<meta name="generator" content="WordPress 6.4.2">'
+    '<link rel="stylesheet" href="/wp-content/plugins/woocommerce/assets/css/woocommerce.css">'
+    '<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script>'
+    '<script src="https://www.googletagmanager.com/gtm.js?id=GTM-X"></script>'
+)
+
+
+def serialize_and_scan(soup):
+    script_srcs = [script.get('src', '') for script in soup.find_all('script', src=True)]
+    technologies = [src for src in script_srcs if 'react' in src.lower() or 'jquery' in src.lower()]
+    html_text = str(soup).lower()
+    for marker in ('wp-content', 'wordpress', 'drupal', 'joomla'):
+        if marker in html_text:
+            technologies.append(marker)
+    return technologies
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print(f"{len(TECHNOLOGY_SIGNATURES)} signatures")
+    print(f"{'cards':>8} {'size KB':>9} {'str(soup)':>11} {'detector':>10} {'speedup':>8}  found")
+    for cards in (100, 1000, 5000, 20000):
+        html_content = make_rendered_page(cards).replace('</head>', EXTRA_HEAD + '</head>', 1)
+        soup = BeautifulSoup(html_content, 'html.parser')
+        script_srcs = [script.get('src', '') for script in soup.find_all('script', src=True)]
+        meta = {'generator': 'WordPress 6.4.2'}
+        repeat = 5 if cards <= 1000 else 2
+
+        t_serialize, _ = best_of(lambda: serialize_and_scan(soup), repeat)
+        t_detector, found = best_of(
+            lambda: DEFAULT_DETECTOR.detect(html_content, script_srcs, HEADERS, meta), repeat)
+        print(f"{cards:>8} {len(html_content) / 1024:>9.0f} {t_serialize * 1000:>9.1f}ms "
+              f"{t_detector * 1000:>8.1f}ms {t_serialize / t_detector:>7.1f}x  {len(found)}")
+    print(', '.join(f'{name} {version}'.strip() for name, version in found.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark the structural tree diff against the prettified line diff.
+
+Two page pairs per size: one where a single widget changed (the markup is
+also re-indented and its attributes reordered) and one where the client
+renders half of the catalog. The line diff time includes prettifying both
+documents, as in the diff viewer. Run from the repository root::
+
+    python benchmarks/bench_treediff.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler.diff import HTMLDiffAnalyzer  # noqa: E402
+from crawler.treediff import HTMLTreeDiff  # noqa: E402
+
+
+def make_page(cards, rendered_cards=None, changed_card=None, reorder=False):
+    """Catalog page with ``cards`` tiles, the first ``rendered_cards`` of them present"""
+    rendered_cards = cards if rendered_cards is None else rendered_cards
+    tiles = []
+    for i in range(rendered_cards):
+        attributes = f'data-sku="{i}" class="card"' if reorder else f'class="card" data-sku="{i}"'
+        price = 'Sold out' if i == changed_card else f'${i}.99'
+        separator = '\n    ' if reorder else ''
+        tiles.append(
+            f'<div {attributes}>{separator}<h2>Product {i}</h2>{separator}<img src="/img/{i}.jpg" alt="Product">'
+            f'{separator}<p class="price">{price}</p><a href="/product/{i}">View</a></div>'
+        )
+    return ('<!DOCTYPE html><html><head><title>Catalog</title></head><body><div id="root">'
+            + '\n'.join(tiles) + '</div></body></html>')
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    print(f"{'cards':>7} {'case':>14} {'line diff':>10} {'tree diff':>10} {'changed lines':>14} {'tree changes':>13}")
+    for cards in (1000, 5000, 20000):
+        cases = {
+            'one widget': (make_page(cards), make_page(cards, changed_card=cards // 2, reorder=True)),
+            'half rendered': (make_page(cards, rendered_cards=cards // 2), make_page(cards)),
+        }
+        for case, (raw, rendered) in cases.items():
+            line_time, line_stats = timed(lambda: HTMLDiffAnalyzer(raw, rendered).get_change_statistics())
+            tree_time, tree_changes = timed(lambda: HTMLTreeDiff(raw, rendered).get_detailed_changes())
+            changed_lines = line_stats['lines_added'] + line_stats['lines_removed'] + line_stats['lines_modified']
+            print(f"{cards:>7} {case:>14} {line_time * 1000:>8.0f}ms {tree_time * 1000:>8.0f}ms "
+                  f"{changed_lines:>14} {len(tree_changes):>13}")
+
+
+if __name__ == '__main__':
+    main()
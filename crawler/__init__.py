@@ -0,0 +1,110 @@
+"""Headless HTML vs JS crawler: fetch, render and analyze pages without the Streamlit UI."""
+from .analysis import (
+    analysis_args, analyze_html, analyze_page, analyze_page_speed, apply_analysis,
+    detect_technologies, extract_seo_data, match_technologies, meta_tags,
+)
+from .blobs import HTML_REFS, HTMLBlobStore
+from .blocking import RESOURCE_TYPE_PATTERNS, TRACKER_HOSTS, build_blocked_patterns, collect_network_stats
+from .cache import RawHTMLCache, RenderCache, analysis_signature, content_hash, render_signature
+from .crawl import (
+    crawl_single_url, fetch_raw_html, new_crawl_result, plan_render, remember_analysis, render_page,
+    reuse_cached_analysis, skip_render,
+)
+from .diff import VIEWER_PAGE_ROWS, HTMLDiffAnalyzer
+from .drivers import USER_AGENT, PooledDriver, WebDriverPool
+from .export import EXPORTERS, export_results, flatten_result, open_exporter
+from .frontier import LinkFrontier, URLSeenSet, compile_exclude_patterns
+from .linediff import DIFF_ENGINES, diff_opcodes, similarity_ratio, unified_diff
+from .pipeline import CrawlPipeline, URLSourceError
+from .politeness import HostScheduler, RobotsCache, parse_retry_after
+from .render_policy import RENDER_MODES, predict_render_need, render_mode, rendering_changed_page
+from .scanner import SEOScanTarget, scan_html
+from .search import LineSearchIndex, compile_query
+from .sessions import HTTP_ERRORS, HTTPSessionPool, httpx
+from .signals import PAGE_SIGNALS_JS, collect_page_signals
+from .sitemap import MAX_SITEMAP_DEPTH, SitemapEntry, iter_sitemap, parse_lastmod, parse_sitemap, stream_sitemap
+from .store import CrawlStore
+from .technologies import TECHNOLOGY_SIGNATURES, TechnologyDetector
+from .treediff import HTMLTreeDiff, categorize_node
+from .urls import normalize_url
+from .waits import WAIT_STRATEGIES, install_activity_tracker, wait_for_quiescence
+
+__all__ = [
+    'analysis_args',
+    'analysis_signature',
+    'analyze_html',
+    'analyze_page',
+    'analyze_page_speed',
+    'apply_analysis',
+    'build_blocked_patterns',
+    'categorize_node',
+    'collect_page_signals',
+    'collect_network_stats',
+    'compile_exclude_patterns',
+    'compile_query',
+    'content_hash',
+    'crawl_single_url',
+    'CrawlPipeline',
+    'CrawlStore',
+    'detect_technologies',
+    'DIFF_ENGINES',
+    'diff_opcodes',
+    'EXPORTERS',
+    'export_results',
+    'extract_seo_data',
+    'fetch_raw_html',
+    'flatten_result',
+    'HostScheduler',
+    'HTML_REFS',
+    'HTMLBlobStore',
+    'HTMLDiffAnalyzer',
+    'HTMLTreeDiff',
+    'HTTP_ERRORS',
+    'HTTPSessionPool',
+    'httpx',
+    'install_activity_tracker',
+    'iter_sitemap',
+    'LineSearchIndex',
+    'LinkFrontier',
+    'match_technologies',
+    'meta_tags',
+    'MAX_SITEMAP_DEPTH',
+    'new_crawl_result',
+    'normalize_url',
+    'open_exporter',
+    'PAGE_SIGNALS_JS',
+    'parse_lastmod',
+    'parse_retry_after',
+    'parse_sitemap',
+    'plan_render',
+    'predict_render_need',
+    'RawHTMLCache',
+    'remember_analysis',
+    'PooledDriver',
+    'render_mode',
+    'RENDER_MODES',
+    'RenderCache',
+    'render_page',
+    'render_signature',
+    'rendering_changed_page',
+    'RobotsCache',
+    'reuse_cached_analysis',
+    'RESOURCE_TYPE_PATTERNS',
+    'scan_html',
+    'SEOScanTarget',
+    'SitemapEntry',
+    'similarity_ratio',
+    'skip_render',
+    'stream_sitemap',
+    'TECHNOLOGY_SIGNATURES',
+    'TechnologyDetector',
+    'TRACKER_HOSTS',
+    'unified_diff',
+    'URLSeenSet',
+    'URLSourceError',
+    'USER_AGENT',
+    'VIEWER_PAGE_ROWS',
+    'wait_for_quiescence',
+    'WAIT_STRATEGIES',
+    'WebDriverPool',
+]
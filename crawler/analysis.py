@@ -0,0 +1,233 @@
+"""SEO, technology and SPA analysis of fetched pages."""
+import signal
+import time
+
+from bs4 import BeautifulSoup
+
+from .scanner import APP_ROOT_IDS, empty_seo_data, scan_html
+from .technologies import DEFAULT_DETECTOR, SPA_FRAMEWORKS
+
+# HTML parsers accepted by analyze_html; 'lxml' uses the single-pass scanner
+PARSERS = ('lxml', 'html.parser')
+
+
+def analyze_page_speed(response_time, size_bytes):
+    """Analyze page speed metrics"""
+    speed_score = 100
+    
+    # Response time analysis
+    if response_time > 3:
+        speed_score -= 30
+    elif response_time > 1:
+        speed_score -= 15
+    
+    # Size analysis
+    if size_bytes > 1024 * 1024:  # > 1MB
+        speed_score -= 25
+    elif size_bytes > 512 * 1024:  # > 512KB
+        speed_score -= 10
+    
+    return max(0, speed_score)
+
+def extract_seo_data(soup):
+    """Extract SEO-relevant data from HTML"""
+    seo_data = empty_seo_data()
+    
+    if not soup:
+        return seo_data
+    
+    # Title
+    title_tag = soup.find('title')
+    seo_data['title'] = title_tag.get_text().strip() if title_tag else ''
+    
+    # Meta description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    seo_data['meta_description'] = meta_desc.get('content', '') if meta_desc else ''
+    
+    # Headings
+    seo_data['h1_count'] = len(soup.find_all('h1'))
+    seo_data['h2_count'] = len(soup.find_all('h2'))
+    
+    # Images without alt
+    images = soup.find_all('img')
+    seo_data['images_without_alt'] = sum(1 for img in images if not img.get('alt'))
+    
+    # Word count
+    text = soup.get_text()
+    seo_data['word_count'] = len(text.split())
+    
+    # Links analysis
+    links = soup.find_all('a', href=True)
+    for link in links:
+        href = link['href']
+        if href.startswith('http'):
+            seo_data['external_links'] += 1
+        else:
+            seo_data['internal_links'] += 1
+    
+    # Canonical URL
+    canonical = soup.find('link', rel='canonical')
+    seo_data['canonical_url'] = canonical.get('href', '') if canonical else ''
+    
+    # Meta robots
+    robots = soup.find('meta', attrs={'name': 'robots'})
+    seo_data['meta_robots'] = robots.get('content', '') if robots else ''
+    
+    # Open Graph
+    og_title = soup.find('meta', property='og:title')
+    seo_data['og_title'] = og_title.get('content', '') if og_title else ''
+    
+    og_desc = soup.find('meta', property='og:description')
+    seo_data['og_description'] = og_desc.get('content', '') if og_desc else ''
+    
+    # Schema markup
+    schema_scripts = soup.find_all('script', type='application/ld+json')
+    seo_data['schema_markup'] = len(schema_scripts) > 0
+    
+    return seo_data
+
+def meta_tags(soup):
+    """Content of each meta tag by lowercased name or property, the first one winning"""
+    meta = {}
+    for tag in soup.find_all('meta'):
+        key = (tag.get('name') or tag.get('property') or '').lower()
+        if key and key not in meta:
+            meta[key] = tag.get('content', '')
+    return meta
+
+def detect_technologies(soup, response_headers):
+    """Detect web technologies used"""
+    script_srcs = [script.get('src', '') for script in soup.find_all('script', src=True)]
+    return match_technologies(script_srcs, str(soup), response_headers, meta_tags(soup))
+
+def match_technologies(script_srcs, html_text, response_headers, meta=None, js_globals=None):
+    """Detect web technologies from script URLs, page markup, meta tags, response headers and cookies"""
+    return list(DEFAULT_DETECTOR.detect(html_text, script_srcs, response_headers, meta, js_globals))
+
+def analyze_html(rendered_html, raw_line_count, response_headers, response_time, size_bytes, parser='lxml',
+                 collect_links=False, page_signals=None):
+    """Analyze rendered HTML and return the analysis fields of a crawl result.
+
+    Takes only plain, picklable values (the raw page is reduced to its line
+    count) so it can run in a worker process with a small IPC payload. With
+    ``collect_links`` the ``<a href>`` values are returned as ``links`` for
+    the link frontier. ``page_signals`` are the values read in the browser by
+    ``collect_page_signals``; when they include the page's ``seo_data`` nothing
+    is parsed and ``rendered_html`` is only matched for technology markup.
+    """
+    fields = {'errors': []}
+    page_signals = page_signals or {}
+    extracted = 'seo_data' in page_signals
+    try:
+        if extracted:
+            # Read in the browser, the rendered DOM never left it
+            seo_data = page_signals['seo_data']
+            script_srcs = page_signals['script_srcs']
+            has_app_root = page_signals['has_app_root']
+            links = page_signals['links']
+            meta = page_signals['meta']
+        elif parser == 'lxml':
+            # One streaming pass collects SEO fields, script URLs and SPA markers
+            scan = scan_html(rendered_html)
+            seo_data = scan.seo_data
+            script_srcs = scan.script_srcs
+            has_app_root = scan.has_app_root
+            links = scan.links
+            meta = scan.meta
+        else:
+            rendered_soup = BeautifulSoup(rendered_html, parser)
+            seo_data = extract_seo_data(rendered_soup)
+            script_srcs = [script.get('src', '') for script in rendered_soup.find_all('script', src=True)]
+            has_app_root = rendered_soup.find('div', {'id': list(APP_ROOT_IDS)}) is not None
+            links = [link['href'] for link in rendered_soup.find_all('a', href=True)]
+            meta = meta_tags(rendered_soup)
+        
+        # Calculate JavaScript impact
+        if extracted or rendered_html:
+            rendered_lines = page_signals['line_count'] if extracted else rendered_html.count('\n')
+            fields['js_additions'] = max(0, rendered_lines - raw_line_count)
+            fields['js_percentage'] = (fields['js_additions'] / max(rendered_lines, 1)) * 100
+        
+        # Extract SEO data
+        fields['seo_data'] = seo_data
+        if collect_links:
+            fields['links'] = links
+        fields['dom_nodes'] = page_signals.get('node_count', 0)
+        
+        # Calculate SEO score
+        seo_score = 100
+        if not seo_data['title']:
+            seo_score -= 20
+        if not seo_data['meta_description']:
+            seo_score -= 15
+        if seo_data['h1_count'] != 1:
+            seo_score -= 10
+        if seo_data['images_without_alt'] > 0:
+            seo_score -= 10
+        
+        fields['seo_score'] = max(0, seo_score)
+        
+        # Detect technologies from the markup as fetched, without re-serializing a tree
+        detection_start = time.perf_counter()
+        detected = DEFAULT_DETECTOR.detect(rendered_html, script_srcs, response_headers, meta,
+                                           page_signals.get('js_globals'))
+        fields['technology_time'] = time.perf_counter() - detection_start
+        fields['technologies'] = list(detected)
+        fields['technology_versions'] = {name: version for name, version in detected.items() if version}
+        
+        # SPA detection
+        spa_indicators = 0
+        if fields.get('js_percentage', 0) > 30:
+            spa_indicators += 30
+        if any(tech in SPA_FRAMEWORKS for tech in fields['technologies']):
+            spa_indicators += 40
+        if has_app_root:
+            spa_indicators += 30
+        
+        fields['spa_score'] = spa_indicators
+        fields['is_spa'] = spa_indicators > 50
+        
+        # Speed score
+        fields['speed_score'] = analyze_page_speed(response_time, size_bytes)
+        
+    except Exception as e:
+        fields['errors'].append(f"Processing error during analysis: {str(e)}")
+    return fields
+
+def analysis_args(result, response_headers, parser='lxml', collect_links=False):
+    """Build the compact argument tuple for analyze_html from a crawl result"""
+    page_signals = result.get('page_signals')
+    rendered_html = result['rendered_html']
+    if page_signals and 'seo_data' in page_signals:
+        # No rendered DOM was transferred: match technology markup on the raw HTML and the rendered shell
+        rendered_html = result['raw_html'] + '\n' + page_signals['shell']
+    return (
+        rendered_html,
+        result['raw_html'].count('\n'),
+        {key.lower(): value for key, value in (response_headers or {}).items()},
+        result['response_time'],
+        result['size_bytes'],
+        parser,
+        collect_links,
+        page_signals,
+    )
+
+def apply_analysis(result, fields):
+    """Merge analysis fields returned by analyze_html into a crawl result"""
+    errors = fields.pop('errors', [])
+    # The browser's signals are folded into the fields and not kept
+    result.pop('page_signals', None)
+    result.update(fields)
+    result['errors'].extend(errors)
+
+def init_analysis_worker():
+    """Process-pool initializer: import the parser stack once per worker, not per page"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    scan_html('<html></html>')
+    BeautifulSoup('<html></html>', 'html.parser')
+
+def analyze_page(result, response_headers, parser='lxml', collect_links=False):
+    """Step 3: analyze raw and rendered HTML and fill in the scores"""
+    start_time = time.time()
+    apply_analysis(result, analyze_html(*analysis_args(result, response_headers, parser, collect_links)))
+    result['analysis_time'] = time.time() - start_time
@@ -0,0 +1,70 @@
+"""Content-addressed, compressed storage for page HTML kept out of result records."""
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from .cache import _write_atomic, content_hash
+
+# Result fields holding page HTML, and the fields that reference them once offloaded
+HTML_REFS = {'raw_html': 'raw_html_ref', 'rendered_html': 'rendered_html_ref'}
+
+
+class HTMLBlobStore:
+    """Gzipped HTML bodies on disk, addressed by the SHA-256 of their text.
+
+    Identical bodies (unchanged pages, pages that were not rendered) are
+    stored once. A small in-memory LRU keeps the bodies the diff viewer is
+    currently looking at.
+    """
+    def __init__(self, directory, memory_items=8):
+        self.directory = directory
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ref):
+        return os.path.join(self.directory, ref[:2], f'{ref}.html.gz')
+
+    def put(self, html):
+        """Store an HTML body and return its reference"""
+        ref = content_hash(html)
+        path = self._path(ref)
+        if not os.path.exists(path):
+            _write_atomic(path, gzip.compress(html.encode('utf-8'), compresslevel=6))
+        return ref
+
+    def get(self, ref):
+        """The HTML body for a reference; empty for a missing reference"""
+        if not ref:
+            return ''
+        with self._lock:
+            if ref in self._recent:
+                self._recent.move_to_end(ref)
+                return self._recent[ref]
+        try:
+            with gzip.open(self._path(ref), 'rt', encoding='utf-8') as f:
+                html = f.read()
+        except OSError:
+            return ''
+        with self._lock:
+            self._recent[ref] = html
+            while len(self._recent) > self.memory_items:
+                self._recent.popitem(last=False)
+        return html
+
+    def offload(self, result):
+        """Move a result's HTML into the store, leaving references behind"""
+        for field, ref_field in HTML_REFS.items():
+            html = result.pop(field, None)
+            if html is not None:
+                result[ref_field] = self.put(html) if html else ''
+        return result
+
+    def load_html(self, result):
+        """``(raw_html, rendered_html)`` for a result, whether offloaded or not"""
+        return tuple(
+            result[field] if field in result else self.get(result.get(ref_field, ''))
+            for field, ref_field in HTML_REFS.items()
+        )
@@ -0,0 +1,128 @@
+"""CDP request blocking and per-page network accounting for the render stage."""
+import json
+import re
+from urllib.parse import urlparse
+
+# File extensions of the resource types that can be blocked
+RESOURCE_TYPE_EXTENSIONS = {
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'ogg', 'ogv', 'mp3', 'm4a', 'wav', 'mov', 'm3u8'),
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico'),
+    'stylesheet': ('css',),
+}
+
+# Network.setBlockedURLs wildcard patterns per resource type. They are anchored on the
+# extension at the end of the path, with or without a query string, so that hosts and
+# path segments that merely contain one (www.webmd.com, /movies/) are never blocked
+RESOURCE_TYPE_PATTERNS = {
+    resource_type: [pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*')]
+    for resource_type, extensions in RESOURCE_TYPE_EXTENSIONS.items()
+}
+
+# Analytics, advertising, tag manager and chat widget hosts that never affect the DOM we diff
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'googlesyndication.com', 'googleadservices.com',
+    'doubleclick.net', 'adservice.google.com', 'connect.facebook.net', 'facebook.net',
+    'analytics.tiktok.com', 'ads-twitter.com', 'static.ads-twitter.com', 'snap.licdn.com',
+    'bat.bing.com', 'clarity.ms', 'hotjar.com', 'fullstory.com', 'mixpanel.com',
+    'cdn.segment.com', 'api.segment.io', 'amplitude.com', 'heap.io', 'optimizely.com',
+    'quantserve.com', 'scorecardresearch.com', 'amazon-adsystem.com', 'taboola.com',
+    'outbrain.com', 'criteo.com', 'criteo.net', 'adnxs.com', 'hs-scripts.com',
+    'hs-analytics.net', 'js.hs-banner.com', 'intercom.io', 'intercomcdn.com', 'widget.intercom.io',
+    'js.driftt.com', 'drift.com', 'static.zdassets.com', 'embed.tawk.to', 'client.crisp.chat',
+    'cdn.livechatinc.com', 'js-agent.newrelic.com', 'bam.nr-data.net', 'cdn.mouseflow.com',
+)
+
+# Second-level labels under which sites register domains (example.co.uk)
+_SECOND_LEVEL_LABELS = {'co', 'com', 'org', 'net', 'ac', 'gov', 'edu', 'ne', 'or'}
+
+# Hosts of resources referenced from the raw markup
+_RESOURCE_HOST_RE = re.compile(r'''(?:src|href)\s*=\s*["']?(?:https?:)?//([a-z0-9.-]+)''', re.IGNORECASE)
+
+# Cap on per-page third-party patterns, to keep the CDP call small
+MAX_THIRD_PARTY_HOSTS = 200
+
+
+def site_domain(host):
+    """Approximate the registrable domain of a host (www.shop.example.co.uk -> example.co.uk)"""
+    labels = host.lower().strip('.').split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def third_party_hosts(page_url, raw_html):
+    """Hosts referenced by the raw HTML that belong to a different site than the page"""
+    page_site = site_domain(urlparse(page_url).hostname or '')
+    hosts = []
+    seen = set()
+    for match in _RESOURCE_HOST_RE.finditer(raw_html or ''):
+        host = match.group(1).lower().rstrip('.')
+        if host in seen or site_domain(host) == page_site:
+            continue
+        seen.add(host)
+        hosts.append(host)
+        if len(hosts) >= MAX_THIRD_PARTY_HOSTS:
+            break
+    return hosts
+
+
+def build_blocked_patterns(config, page_url, raw_html):
+    """Network.setBlockedURLs patterns for a page according to the blocking options in config"""
+    patterns = []
+    for resource_type in config.get('block_resource_types', ()):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, ()))
+    if config.get('block_trackers'):
+        patterns.extend(f'*//{host}/*' for host in TRACKER_HOSTS)
+        patterns.extend(f'*.{host}/*' for host in TRACKER_HOSTS)
+    if config.get('block_third_party'):
+        # Only hosts visible in the raw HTML can be listed up front; scripts those
+        # hosts would have injected are never requested once their loader is blocked
+        patterns.extend(f'*//{host}/*' for host in third_party_hosts(page_url, raw_html))
+    patterns.extend(config.get('block_patterns', ()))
+    return list(dict.fromkeys(patterns))
+
+
+def set_blocked_urls(driver, patterns):
+    """Apply blocking patterns to the browser's network domain"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def drain_network_log(driver):
+    """Discard buffered performance log entries so the next page starts from a clean slate"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def collect_network_stats(driver):
+    """Summarize the performance log since the last drain: requests made, blocked and bytes transferred"""
+    stats = {
+        'requests_made': 0,
+        'blocked_requests': 0,
+        'blocked_by_type': {},
+        'transferred_bytes': 0,
+    }
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return stats
+
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            stats['requests_made'] += 1
+        elif method == 'Network.loadingFinished':
+            stats['transferred_bytes'] += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            stats['blocked_requests'] += 1
+            resource_type = params.get('type', 'Other')
+            stats['blocked_by_type'][resource_type] = stats['blocked_by_type'].get(resource_type, 0) + 1
+    return stats
@@ -0,0 +1,278 @@
+"""On-disk caches: raw responses with conditional revalidation, and rendered DOMs."""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .urls import normalize_url
+
+# Config keys that change what the browser renders
+RENDER_CONFIG_KEYS = (
+    'js_wait', 'wait_strategy', 'quiet_window', 'timeout',
+    'block_resource_types', 'block_trackers', 'block_third_party', 'block_patterns', 'extract_in_browser',
+)
+
+# Config keys that change the analysis of a page, on top of the render settings
+ANALYSIS_CONFIG_KEYS = RENDER_CONFIG_KEYS + ('enable_js', 'render_mode', 'auto_render_threshold', 'parser', 'follow_links')
+
+# Render metadata stored next to a cached DOM
+RENDER_FIELDS = (
+    'settle_time', 'settled', 'requests_made', 'blocked_requests', 'blocked_by_type',
+    'transferred_bytes', 'page_signals',
+)
+
+# Result fields that depend only on the page content and the render configuration
+ANALYSIS_FIELDS = (
+    'rendered_html_size', 'js_additions', 'js_percentage', 'seo_score', 'technologies', 'is_spa',
+    'spa_score', 'seo_data', 'render_decision', 'render_score', 'settle_time', 'settled',
+    'requests_made', 'blocked_requests', 'blocked_by_type', 'transferred_bytes', 'links', 'technology_versions',
+    'dom_nodes',
+)
+
+# Response headers worth keeping for analysis of cached bodies
+CACHED_HEADERS = ('server', 'content-type', 'x-powered-by', 'x-generator', 'set-cookie')
+
+
+def content_hash(body):
+    """SHA-256 of a page body"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()
+
+
+def _signature(config, keys):
+    relevant = {key: config.get(key) for key in keys}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def render_signature(config):
+    """Stable hash of the configuration options that affect rendering"""
+    return _signature(config, RENDER_CONFIG_KEYS)
+
+
+def analysis_signature(config):
+    """Stable hash of the configuration options that affect rendering and analysis"""
+    return _signature(config, ANALYSIS_CONFIG_KEYS)
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class RawHTMLCache:
+    """Raw responses stored on disk, keyed by normalized URL.
+
+    Each entry keeps the gzipped body, its content hash and the ETag and
+    Last-Modified validators so the next crawl can issue a conditional
+    request. When the page comes back 304 or with an identical hash, the
+    analysis stored for the same render configuration can be reused.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.stats = {'miss': 0, 'revalidated': 0, 'unchanged': 0, 'changed': 0, 'analysis_reused': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f'{key}{suffix}')
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, url):
+        """Cached metadata for a URL, or None"""
+        try:
+            with open(self._path(url, '.json'), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for revalidating a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load_body(self, url, entry):
+        """The cached raw HTML for a URL, or None if the body is missing, damaged or does not match ``entry``"""
+        try:
+            with gzip.open(self._path(url, '.html.gz'), 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, EOFError, ValueError, zlib.error):
+            return None
+        if content_hash(body) != entry.get('content_hash'):
+            return None
+        return body
+
+    def discard(self, url):
+        """Drop the cached entry and body for a URL"""
+        for suffix in ('.json', '.html.gz'):
+            try:
+                os.unlink(self._path(url, suffix))
+            except OSError:
+                pass
+
+    def store(self, url, status_code, response_headers, body):
+        """Store a fresh response; keeps the stored analysis if the body did not change"""
+        entry = self.get(url) or {}
+        body_hash = content_hash(body)
+        if entry.get('content_hash') != body_hash:
+            _write_atomic(self._path(url, '.html.gz'), gzip.compress(body.encode('utf-8')))
+            entry.pop('analysis', None)
+        headers = {key.lower(): value for key, value in response_headers.items()}
+        entry.update({
+            'url': url,
+            'status_code': status_code,
+            'etag': headers.get('etag', ''),
+            'last_modified': headers.get('last-modified', ''),
+            'content_hash': body_hash,
+            'headers': {key: headers[key] for key in CACHED_HEADERS if key in headers},
+            'fetched_at': time.time(),
+        })
+        _write_atomic(self._path(url, '.json'), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def touch(self, url, entry):
+        """Record a successful revalidation of an unchanged entry"""
+        entry['fetched_at'] = time.time()
+        _write_atomic(self._path(url, '.json'), json.dumps(entry).encode('utf-8'))
+
+    def load_analysis(self, url, entry, signature):
+        """Analysis fields and rendered HTML stored for this content and render configuration, or None"""
+        analysis = entry.get('analysis')
+        if not analysis or analysis.get('signature') != signature or analysis.get('content_hash') != entry.get('content_hash'):
+            return None
+        try:
+            with gzip.open(self._path(url, '.rendered.gz'), 'rt', encoding='utf-8') as f:
+                rendered_html = f.read()
+        except OSError:
+            return None
+        return dict(analysis['fields'], rendered_html=rendered_html)
+
+    def store_analysis(self, url, signature, result):
+        """Remember the analysis of a successfully crawled page for later reuse"""
+        entry = self.get(url)
+        if not entry or entry.get('content_hash') != result.get('content_hash'):
+            return
+        _write_atomic(self._path(url, '.rendered.gz'), gzip.compress(result['rendered_html'].encode('utf-8')))
+        entry['analysis'] = {
+            'signature': signature,
+            'content_hash': entry['content_hash'],
+            'fields': {field: result[field] for field in ANALYSIS_FIELDS if field in result},
+        }
+        _write_atomic(self._path(url, '.json'), json.dumps(entry).encode('utf-8'))
+
+
+class RenderCache:
+    """Compressed rendered DOMs keyed by raw content, render configuration and device profile.
+
+    Entries are single gzipped JSON files holding ``page_source`` and the
+    render metadata. The cache is bounded by ``max_bytes`` on disk and evicts
+    the least recently used entries first; recency survives restarts through
+    the files' modification times.
+    """
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.render.gz'):
+                    stat = os.stat(os.path.join(root, name))
+                    found.append((stat.st_mtime, name[:-len('.render.gz')], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.render.gz')
+
+    def key(self, url, raw_hash, config, device_profile):
+        """Cache key for a render of ``raw_hash`` at ``url`` with these settings"""
+        # The URL is part of the key: SPA shells share one raw body but render differently per route
+        parts = [normalize_url(url), raw_hash, render_signature(config), device_profile]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @property
+    def size_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """Cached ``(page_source, metadata)`` for a key, or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._forget(key)
+                self.stats['misses'] += 1
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return entry['page_source'], entry['metadata']
+
+    def put(self, key, page_source, result):
+        """Store a rendered page and its render metadata"""
+        metadata = {field: result[field] for field in RENDER_FIELDS if field in result}
+        data = gzip.compress(json.dumps({'page_source': page_source, 'metadata': metadata}).encode('utf-8'))
+        if len(data) > self.max_bytes:
+            return
+        _write_atomic(self._path(key), data)
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self.stats['stored'] += 1
+            self._evict()
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.stats['evicted'] += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
@@ -0,0 +1,264 @@
+"""Command-line entry point for running crawls without Streamlit.
+
+Example::
+
+    python -m crawler --sitemap https://example.com/sitemap.xml --out results.parquet --workers 8
+"""
+import argparse
+import itertools
+import logging
+import os
+import sys
+import time
+
+from .analysis import PARSERS
+from .blocking import RESOURCE_TYPE_PATTERNS
+from .cache import RawHTMLCache, RenderCache
+from .drivers import WebDriverPool
+from .export import open_exporter
+from .frontier import LinkFrontier
+from .pipeline import CrawlPipeline, URLSourceError
+from .render_policy import RENDER_MODES
+from .sessions import HTTPSessionPool
+from .sitemap import SitemapEntry, iter_sitemap
+from .store import CrawlStore
+from .waits import WAIT_STRATEGIES
+
+
+def read_urls(args):
+    """Yield SitemapEntry records for the URLs to crawl; sitemap URLs stream in as they are parsed"""
+    for url in args.urls:
+        yield SitemapEntry(url, None)
+    if args.urls_file:
+        with open(args.urls_file, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield SitemapEntry(line.strip(), None)
+    if args.sitemap:
+        yield from iter_sitemap(args.sitemap, timeout=args.timeout)
+
+
+def due_urls(entries, store, ttl, fresh_urls):
+    """URLs of the entries the store says are due; the others are appended to ``fresh_urls``"""
+    for entry in entries:
+        if store.is_due(entry.url, ttl, entry.lastmod):
+            yield entry.url
+        else:
+            fresh_urls.append(entry.url)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m crawler',
+        description='Crawl pages, compare raw and JavaScript-rendered HTML and export the analysis.'
+    )
+    parser.add_argument('urls', nargs='*', help='URLs to crawl')
+    parser.add_argument('--sitemap', help='Sitemap URL to read URLs from')
+    parser.add_argument('--urls-file', help='File with one URL per line')
+    parser.add_argument('--follow-links', action='store_true',
+                        help='Crawl the site breadth-first, following links from the given URLs to pages on the same site')
+    parser.add_argument('--max-depth', type=int, default=3, help='With --follow-links, maximum link hops from a start URL')
+    parser.add_argument('--max-pages', type=int, help='With --follow-links, stop queueing new pages after this many URLs')
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help='With --follow-links, skip links containing PATTERN (* is a wildcard); repeatable')
+    parser.add_argument('--ignore-query', action='store_true',
+                        help='With --follow-links, drop query strings from discovered links')
+    parser.add_argument('--out', default='results.parquet',
+                        help='Output file (.parquet, .csv, .jsonl, .json or .xlsx)')
+    parser.add_argument('--workers', type=int, default=4, help='Number of pooled headless browsers')
+    parser.add_argument('--fetch-workers', type=int, default=16, help='Parallel raw HTML downloads')
+    parser.add_argument('--analysis-workers', type=int, default=2, help='Parallel HTML analysis workers')
+    parser.add_argument('--analysis-processes', type=int, default=0,
+                        help='Run analysis in this many worker processes (0 = analyze on threads)')
+    parser.add_argument('--timeout', type=int, default=10, help='Page timeout in seconds')
+    parser.add_argument('--js-wait', type=float, default=3,
+                        help='Seconds to wait for JavaScript after load (the cap for adaptive waits)')
+    parser.add_argument('--wait-strategy', choices=WAIT_STRATEGIES, default='adaptive',
+                        help='adaptive: stop once network and DOM are idle; fixed: always sleep --js-wait')
+    parser.add_argument('--quiet-window', type=float, default=0.5,
+                        help='Seconds of network and DOM inactivity that count as settled')
+    parser.add_argument('--parser', choices=PARSERS, default='lxml',
+                        help='HTML parser for analysis (lxml uses the single-pass scanner)')
+    parser.add_argument('--no-js', action='store_true', help='Skip headless rendering and only fetch raw HTML')
+    parser.add_argument('--render-mode', choices=RENDER_MODES, default='always',
+                        help='auto: only render pages whose raw HTML looks JavaScript-dependent')
+    parser.add_argument('--extract-in-browser', action='store_true',
+                        help='Read SEO fields, links and framework globals in the browser instead of transferring '
+                             'the rendered HTML (no rendered HTML is kept for these pages)')
+    parser.add_argument('--auto-threshold', type=int, default=40,
+                        help='Minimum raw-HTML score (0-100) for auto mode to render a page')
+    parser.add_argument('--auto-sample-rate', type=float, default=0.05,
+                        help='Fraction of pages skipped by auto mode that are rendered anyway to measure mispredictions')
+    parser.add_argument('--block', nargs='*', default=['font', 'media'], choices=sorted(RESOURCE_TYPE_PATTERNS),
+                        metavar='TYPE', help='Resource types to block while rendering (font, image, media, stylesheet)')
+    parser.add_argument('--block-trackers', action='store_true',
+                        help='Block analytics, ad and chat widget hosts while rendering')
+    parser.add_argument('--block-third-party', action='store_true',
+                        help='Block resources from hosts outside the page\'s own site')
+    parser.add_argument('--block-pattern', action='append', default=[],
+                        help='Extra URL pattern to block (Chrome wildcard syntax); repeatable')
+    parser.add_argument('--recycle-after', type=int, default=100, help='Restart each browser after this many pages')
+    parser.add_argument('--connections-per-host', type=int, default=16, help='Keep-alive connections per host')
+    parser.add_argument('--per-host', type=int, default=4, help='Maximum concurrent raw fetches per host')
+    parser.add_argument('--host-delay', type=float, default=0.0,
+                        help='Minimum seconds between requests to one host (robots.txt Crawl-delay wins if larger)')
+    parser.add_argument('--ignore-robots', action='store_true', help='Do not read or honor robots.txt')
+    parser.add_argument('--http2', action='store_true', help='Fetch raw HTML over HTTP/2 (requires httpx[http2])')
+    parser.add_argument('--cache-dir', help='Cache raw responses and rendered DOMs here across runs')
+    parser.add_argument('--render-cache-mb', type=int, default=512,
+                        help='Disk budget for cached rendered DOMs; least recently used entries are evicted first')
+    parser.add_argument('--store', help='SQLite crawl store that keeps every result across runs')
+    parser.add_argument('--recrawl-after', type=float, metavar='HOURS',
+                        help='Incremental crawl: skip URLs in --store crawled successfully within this many hours')
+    parser.add_argument('--keep-html', action='store_true', help='Include raw and rendered HTML in the output')
+    parser.add_argument('--export-chunk-size', type=int, default=1000,
+                        help='Rows buffered before each write to the output file (one Parquet row group per chunk)')
+    parser.add_argument('--progress-every', type=int, default=1, help='Print a progress line every N pages')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug logging')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.recrawl_after is not None and not args.store:
+        print("--recrawl-after requires --store.", file=sys.stderr)
+        return 1
+    if args.recrawl_after is not None and args.follow_links:
+        # Skipping fresh pages would also skip the links they lead to
+        print("--recrawl-after cannot be combined with --follow-links.", file=sys.stderr)
+        return 1
+    entries = read_urls(args)
+    try:
+        first = next(entries, None)
+    except Exception as e:
+        print(f"Could not read URLs: {e}", file=sys.stderr)
+        return 1
+    if first is None:
+        print("No URLs to crawl.", file=sys.stderr)
+        return 1
+    entries = itertools.chain([first], entries)
+
+    store = CrawlStore(args.store) if args.store else None
+    # URLs are fed to the pipeline as they are read, so crawling starts before a large sitemap is fully parsed
+    fresh_urls = []
+    frontier = None
+    if args.follow_links:
+        frontier = LinkFrontier((entry.url for entry in entries), max_depth=args.max_depth,
+                                max_pages=args.max_pages, ignore_query=args.ignore_query,
+                                exclude_patterns=args.exclude)
+        urls = frontier
+    elif store and args.recrawl_after is not None:
+        urls = due_urls(entries, store, args.recrawl_after * 3600, fresh_urls)
+    else:
+        urls = (entry.url for entry in entries)
+
+    config = {
+        'timeout': args.timeout,
+        'js_wait': args.js_wait,
+        'enable_js': not args.no_js,
+        'render_mode': args.render_mode,
+        'extract_in_browser': args.extract_in_browser,
+        'auto_render_threshold': args.auto_threshold,
+        'auto_sample_rate': args.auto_sample_rate,
+        'concurrent': args.workers,
+        'http2': args.http2,
+        'parser': args.parser,
+        'wait_strategy': args.wait_strategy,
+        'quiet_window': args.quiet_window,
+        'block_resource_types': args.block,
+        'block_trackers': args.block_trackers,
+        'block_third_party': args.block_third_party,
+        'block_patterns': args.block_pattern,
+        'max_per_host': args.per_host,
+        'host_delay': args.host_delay,
+        'respect_robots': not args.ignore_robots,
+        'follow_links': args.follow_links,
+    }
+    driver_pool = WebDriverPool(size=args.workers, max_pages_per_driver=args.recycle_after)
+    http_sessions = HTTPSessionPool(pool_maxsize=args.connections_per_host, http2=args.http2)
+    raw_cache = RawHTMLCache(os.path.join(args.cache_dir, 'raw')) if args.cache_dir else None
+    render_cache = None
+    if args.cache_dir and not args.no_js:
+        render_cache = RenderCache(os.path.join(args.cache_dir, 'render'), max_bytes=args.render_cache_mb * 1024 * 1024)
+    pipeline = CrawlPipeline(driver_pool, http_sessions, config,
+                             fetch_workers=args.fetch_workers,
+                             analysis_workers=args.analysis_workers,
+                             analysis_processes=args.analysis_processes,
+                             raw_cache=raw_cache,
+                             render_cache=render_cache,
+                             on_result=frontier.add_result if frontier else None)
+
+    # Rows are streamed to the output file as pages finish, so a long crawl never holds them all in memory
+    exporter = open_exporter(args.out, keep_html=args.keep_html, chunk_size=args.export_chunk_size)
+
+    start_time = time.time()
+    exit_code = 0
+    try:
+        for index, result in enumerate(pipeline.run(urls), start=1):
+            if store:
+                if not args.keep_html:
+                    # Export blob references instead of the HTML itself
+                    store.blobs.offload(result)
+                store.save(result)
+            exporter.write(result)
+            if index % args.progress_every == 0:
+                stats = pipeline.stats()
+                queue_depth = stats['queue_depth']
+                rate = index / max(time.time() - start_time, 1e-9)
+                print(f"[{index}/{stats['submitted']}] {result['status_code']} {result['url']} "
+                      f"({result['response_time']:.2f}s) | {rate:.1f} pages/s | "
+                      f"queued fetch={queue_depth['fetch']} render={queue_depth['render']} "
+                      f"analysis={queue_depth['analysis']}"
+                      + (f" | frontier={frontier.stats()['queued']}" if frontier else ''), flush=True)
+    except KeyboardInterrupt:
+        pipeline.stop()
+        print("Interrupted, writing partial results.", file=sys.stderr)
+    except URLSourceError as e:
+        # The URL source failed part-way (e.g. the sitemap could not be read); keep what was crawled
+        print(f"Could not read URLs: {e}. Writing partial results.", file=sys.stderr)
+        exit_code = 1
+    finally:
+        if frontier:
+            frontier.close()
+        driver_pool.cleanup()
+        http_sessions.close()
+
+    auto_stats = pipeline.stats()['auto_render']
+    if config['render_mode'] == 'auto' and config['enable_js']:
+        print(f"Auto render: {auto_stats['rendered']} rendered, {auto_stats['skipped']} skipped, "
+              f"{auto_stats['sampled']} sampled, misprediction rate {auto_stats['misprediction_rate']:.1%}",
+              flush=True)
+
+    if frontier:
+        frontier_stats = frontier.stats()
+        print(f"Link frontier: {frontier_stats['seen']} unique URLs queued from "
+              f"{frontier_stats['discovered_links']} links found", flush=True)
+
+    host_stats = pipeline.stats()['hosts'].values()
+    throttled = sum(host['throttled'] for host in host_stats)
+    if throttled:
+        print(f"Hosts answered 429/503 {throttled} times; fetches were backed off and retried", flush=True)
+
+    if raw_cache:
+        cache_stats = raw_cache.stats
+        print(f"Raw cache: {cache_stats['revalidated']} not modified (304), {cache_stats['unchanged']} unchanged, "
+              f"{cache_stats['changed']} changed, {cache_stats['miss']} new, "
+              f"{cache_stats['analysis_reused']} analyses reused", flush=True)
+    if render_cache:
+        cache_stats = render_cache.stats
+        print(f"Render cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['evicted']} evicted, {render_cache.size_bytes / 1024 / 1024:.1f} MB on disk", flush=True)
+
+    if fresh_urls:
+        print(f"Incremental crawl: {len(fresh_urls)} URLs still fresh in {args.store}", flush=True)
+        for result in store.load(fresh_urls, with_html=args.keep_html):
+            exporter.write(result)
+    if store:
+        store.close()
+
+    exporter.close()
+    print(f"Wrote {exporter.rows_written} results to {args.out} in {time.time() - start_time:.1f}s", flush=True)
+    return exit_code
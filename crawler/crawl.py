@@ -0,0 +1,297 @@
+"""Per-URL crawl steps: raw fetch, headless render and analysis."""
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from .analysis import analyze_page, analyze_page_speed
+from .blocking import build_blocked_patterns, collect_network_stats, drain_network_log, set_blocked_urls
+from .cache import analysis_signature, content_hash
+from .drivers import USER_AGENT
+from .politeness import parse_retry_after
+from .render_policy import predict_render_need, render_mode
+from .sessions import HTTP_ERRORS, HTTPSessionPool
+from .signals import collect_page_signals
+from .technologies import DEFAULT_DETECTOR
+from .waits import wait_for_quiescence
+
+
+def new_crawl_result(url):
+    """Create an empty result record for a URL"""
+    return {
+        'url': url,
+        'final_url': '',  # URL of the response after redirects
+        'status_code': 0,
+        'response_time': 0,
+        'size_bytes': 0,
+        'raw_html_size': 0,
+        'rendered_html_size': 0,
+        'js_additions': 0,
+        'js_percentage': 0,
+        'speed_score': 0,
+        'seo_score': 0,
+        'technologies': [],
+        'technology_versions': {},
+        'is_spa': False,
+        'spa_score': 0,
+        'errors': [],
+        'driver_wait_time': 0,
+        'fetch_time': 0,
+        'render_time': 0,
+        'analysis_time': 0,
+        'technology_time': 0,
+        'dom_nodes': 0,
+        'settle_time': 0,
+        'settled': False,
+        'content_hash': '',
+        'cache_status': '',
+        'analysis_reused': False,
+        'render_cached': False,
+        'render_decision': '',
+        'render_score': 0,
+        'render_mispredicted': False,
+        'requests_made': 0,
+        'blocked_requests': 0,
+        'blocked_by_type': {},
+        'transferred_bytes': 0,
+        'connection_reused': False,
+        'new_connections': 0,
+        'http_version': '',
+        'retry_after': 0,
+        'seo_data': {},
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'raw_html': '',  # Store raw HTML for diff
+        'rendered_html': ''  # Store rendered HTML for diff
+    }
+
+def fetch_raw_html(result, http_sessions, config, raw_cache=None):
+    """Step 1: fetch the raw HTML for a result. Returns the response headers, or None on failure.
+
+    With a ``raw_cache`` the request is made conditional on the cached ETag and
+    Last-Modified validators; a 304 reuses the cached body. If that body is
+    missing or damaged the entry is dropped and the page fetched again.
+    """
+    start_time = time.time()
+    url = result['url']
+    cached = raw_cache.get(url) if raw_cache else None
+    try:
+        headers = {
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+        }
+        conditional_headers = raw_cache.conditional_headers(cached) if cached else {}
+        
+        raw_response, connection_info = http_sessions.get(url, headers={**headers, **conditional_headers},
+                                                          timeout=config['timeout'])
+        raw_html = None
+        if raw_response.status_code == 304 and cached:
+            raw_html = raw_cache.load_body(url, cached)
+            if raw_html is None:
+                # The cached body is gone or damaged: treat it as a miss and fetch the page unconditionally
+                raw_cache.discard(url)
+                cached = None
+                raw_response, connection_info = http_sessions.get(url, headers=headers, timeout=config['timeout'])
+        result.update(connection_info)
+        result['status_code'] = raw_response.status_code
+        result['final_url'] = str(raw_response.url)
+        if raw_response.status_code != 304 or not cached:
+            # This will raise an HTTPError for 4xx or 5xx status codes (and httpx also for 3xx),
+            # ensuring we stop processing failed URLs.
+            raw_response.raise_for_status()
+
+        if raw_response.status_code == 304 and cached:
+            # Not modified: serve the body from the cache
+            response_headers = cached['headers']
+            result['status_code'] = cached['status_code']
+            result['content_hash'] = cached['content_hash']
+            result['cache_status'] = 'revalidated'
+            raw_cache.touch(url, cached)
+        else:
+            raw_html = raw_response.text
+            response_headers = raw_response.headers
+            if raw_cache:
+                entry = raw_cache.store(url, raw_response.status_code, response_headers, raw_html)
+                result['content_hash'] = entry['content_hash']
+                if not cached:
+                    result['cache_status'] = 'miss'
+                elif entry['content_hash'] == cached['content_hash']:
+                    result['cache_status'] = 'unchanged'
+                else:
+                    result['cache_status'] = 'changed'
+            else:
+                result['content_hash'] = content_hash(raw_html)
+        if raw_cache:
+            raw_cache.count(result['cache_status'])
+        result['raw_html'] = raw_html  # Store raw HTML for diff if successful
+        result['raw_html_size'] = len(raw_html.encode('utf-8'))
+        result['size_bytes'] = result['raw_html_size'] # Initial size
+        result['response_time'] = time.time() - start_time # Time for initial request
+        result['fetch_time'] = result['response_time']
+        return response_headers
+
+    except HTTP_ERRORS as e:
+        # If the initial request fails, record the error and stop processing this URL.
+        if hasattr(e, 'response') and e.response is not None:
+            result['status_code'] = e.response.status_code
+            result['retry_after'] = parse_retry_after(e.response.headers.get('Retry-After'))
+        result['errors'].append(f"Initial request failed: {str(e)}")
+        result['response_time'] = time.time() - start_time # Record time even for failure
+        result['fetch_time'] = result['response_time']
+        return None
+
+def render_page(result, driver_pool, config, render_cache=None):
+    """Step 2: render the page in a pooled headless browser and store the rendered HTML.
+
+    With a ``render_cache`` a page whose raw HTML was already rendered with the
+    same settings reuses the stored DOM instead of checking out a browser. With
+    ``config['extract_in_browser']`` the analysis fields are read in the browser
+    into ``page_signals`` and the rendered HTML is not transferred.
+    """
+    start_time = time.time()
+    url = result['url']
+    if render_mode(config) != 'never':
+        cache_key = None
+        if render_cache:
+            cache_key = render_cache.key(url, result['content_hash'], config, driver_pool.device_profile)
+            cached = render_cache.get(cache_key)
+            if cached:
+                rendered_html, metadata = cached
+                result.update(metadata)
+                signals = metadata.get('page_signals') or {}
+                result['rendered_html_size'] = signals.get('html_bytes') or len(rendered_html.encode('utf-8'))
+                result['rendered_html'] = rendered_html
+                result['render_cached'] = True
+                result['render_time'] = time.time() - start_time
+                return
+        try:
+            # Check out a dedicated browser from the pool for this page
+            with driver_pool.checkout() as pooled:
+                result['driver_wait_time'] = pooled.wait_time
+                driver = pooled.driver
+                try:
+                    # Block fonts, media, trackers or third-party hosts before navigating
+                    blocked_patterns = build_blocked_patterns(config, url, result['raw_html'])
+                    if blocked_patterns != pooled.blocked_patterns:
+                        set_blocked_urls(driver, blocked_patterns)
+                        pooled.blocked_patterns = blocked_patterns
+                    drain_network_log(driver)
+
+                    driver.set_page_load_timeout(config['timeout'])
+                    driver.get(url)
+                    
+                    # Wait for page load
+                    WebDriverWait(driver, config['timeout']).until(
+                        EC.presence_of_element_located((By.TAG_NAME, "body"))
+                    )
+                    
+                    # Wait for JavaScript: until network and DOM go quiet (capped at js_wait), or a fixed sleep
+                    if config.get('wait_strategy', 'fixed') == 'adaptive':
+                        settle_time, settled = wait_for_quiescence(
+                            driver,
+                            quiet_window=config.get('quiet_window', 0.5),
+                            max_wait=config['js_wait']
+                        )
+                        result['settle_time'] = settle_time
+                        result['settled'] = settled
+                    else:
+                        time.sleep(config['js_wait'])
+                        result['settle_time'] = config['js_wait']
+                    
+                    result.update(collect_network_stats(driver))
+                    extract = config.get('extract_in_browser', False)
+                    signals = collect_page_signals(driver, DEFAULT_DETECTOR.js_globals, extract)
+                    if signals:
+                        result['page_signals'] = signals
+                    if extract and signals:
+                        # Everything analysis needs came back with the signals: skip the page source
+                        rendered_html = ''
+                        result['rendered_html_size'] = signals['html_bytes']
+                    else:
+                        rendered_html = driver.page_source
+                        result['rendered_html_size'] = len(rendered_html.encode('utf-8'))
+                    result['rendered_html'] = rendered_html  # Store for diff
+                    if cache_key:
+                        render_cache.put(cache_key, rendered_html, result)
+                    
+                except TimeoutException as e:
+                    result['errors'].append(f"Selenium error: {str(e)}")
+                except Exception as e:
+                    # Anything other than a timeout may have left the browser unusable
+                    pooled.healthy = False
+                    result['errors'].append(f"Selenium error: {str(e)}")
+            
+        except Exception as e:
+            result['errors'].append(f"Selenium rendering error: {str(e)}")
+    else:
+        skip_render(result)
+    result['render_time'] = time.time() - start_time
+
+def skip_render(result):
+    """Use the raw HTML as the rendered HTML for pages that are not rendered"""
+    # If JS rendering is disabled, the rendered HTML is the same as the raw HTML
+    result['rendered_html'] = result['raw_html']
+
+def plan_render(result, response_headers, config):
+    """Decide whether to render a fetched page. Returns ``(should_render, prediction)``.
+
+    In 'auto' mode the raw HTML is scored with the SPA/framework signals and only
+    pages scoring at least ``auto_render_threshold`` are rendered; ``prediction``
+    is None in the other modes.
+    """
+    mode = render_mode(config)
+    if mode != 'auto':
+        result['render_decision'] = 'rendered' if mode == 'always' else 'disabled'
+        return mode == 'always', None
+
+    prediction = predict_render_need(result['raw_html'], response_headers)
+    result['render_score'] = prediction['score']
+    should_render = prediction['score'] >= config.get('auto_render_threshold', 40)
+    result['render_decision'] = 'rendered' if should_render else 'skipped'
+    return should_render, prediction
+
+def reuse_cached_analysis(result, raw_cache, config):
+    """Fill in the stored analysis when the page is unchanged since it was last analyzed. Returns True on reuse"""
+    if not raw_cache or result['cache_status'] not in ('revalidated', 'unchanged'):
+        return False
+    entry = raw_cache.get(result['url'])
+    fields = raw_cache.load_analysis(result['url'], entry, analysis_signature(config)) if entry else None
+    if fields is None:
+        return False
+    result.update(fields)
+    result['speed_score'] = analyze_page_speed(result['response_time'], result['size_bytes'])
+    result['analysis_reused'] = True
+    raw_cache.count('analysis_reused')
+    return True
+
+def remember_analysis(result, raw_cache, config):
+    """Store a completed analysis in the raw cache so unchanged pages can skip render and analysis next time"""
+    if raw_cache and result['content_hash'] and not result['errors']:
+        raw_cache.store_analysis(result['url'], analysis_signature(config), result)
+
+def crawl_single_url(url, driver_pool, config, http_sessions=None, raw_cache=None, render_cache=None):
+    """Crawl a single URL and return comprehensive analysis including raw HTML"""
+    start_time = time.time()
+    result = new_crawl_result(url)
+
+    if http_sessions is None:
+        http_sessions = HTTPSessionPool(http2=config.get('http2', False))
+    response_headers = fetch_raw_html(result, http_sessions, config, raw_cache)
+    if response_headers is None:
+        return result
+    if reuse_cached_analysis(result, raw_cache, config):
+        return result
+
+    should_render, _ = plan_render(result, response_headers, config)
+    if should_render:
+        render_page(result, driver_pool, config, render_cache)
+    else:
+        skip_render(result)
+    analyze_page(result, response_headers, config.get('parser', 'lxml'))
+    remember_analysis(result, raw_cache, config)
+
+    result['response_time'] = time.time() - start_time
+    return result
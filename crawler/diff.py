@@ -0,0 +1,310 @@
+"""Line-level diff between original and rendered HTML."""
+import bisect
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+from bs4 import BeautifulSoup
+
+from .linediff import diff_opcodes, group_opcodes, similarity_ratio, unified_diff
+from .search import LineSearchIndex
+
+
+# Viewer row kind for each diff opcode, on the original and the rendered side
+ROW_KINDS = {
+    'equal': ('unchanged', 'unchanged'),
+    'delete': ('removed', None),
+    'insert': (None, 'added'),
+    'replace': ('modified', 'modified'),
+    # Unchanged lines left off a viewer page, shown as one row
+    'collapsed': ('collapsed', 'collapsed'),
+}
+
+# Rows per panel on one viewer page
+VIEWER_PAGE_ROWS = 300
+
+# Paginations kept per analyzer, for the most recently used viewer settings
+VIEWER_PAGINATIONS = 8
+
+
+def _row_count(opcode):
+    _, i1, i2, j1, j2 = opcode
+    return max(i2 - i1, j2 - j1)
+
+
+class HTMLDiffAnalyzer:
+    """Diff of prettified original vs rendered HTML.
+
+    Cleaned lines, opcodes, statistics, categorized changes and viewer pages
+    are each computed on first use and then shared, so the diff tab parses
+    both documents once and runs the diff engine once per URL;
+    an analyzer kept across reruns makes filtering and paging cheap.
+    """
+    def __init__(self, original_html, rendered_html, engine='patience'):
+        self.original_html = original_html
+        self.rendered_html = rendered_html
+        # Name of the line diff engine in crawler.linediff.DIFF_ENGINES
+        self.engine = engine
+        self._pages = OrderedDict()
+        self._pages_lock = threading.Lock()
+    
+    @cached_property
+    def original_lines(self):
+        return self._clean_html(self.original_html).splitlines()
+    
+    @cached_property
+    def rendered_lines(self):
+        return self._clean_html(self.rendered_html).splitlines()
+    
+    @cached_property
+    def opcodes(self):
+        """difflib-style opcodes turning the original lines into the rendered lines"""
+        return diff_opcodes(self.original_lines, self.rendered_lines, self.engine)
+        
+    def _clean_html(self, html_content):
+        """Clean and format HTML for better diff comparison"""
+        if not html_content:
+            return ""
+        
+        # Parse with BeautifulSoup for consistent formatting
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return soup.prettify()
+    
+    @cached_property
+    def original_index(self):
+        """Search index over the original lines"""
+        return LineSearchIndex(self.original_lines)
+    
+    @cached_property
+    def rendered_index(self):
+        """Search index over the rendered lines"""
+        return LineSearchIndex(self.rendered_lines)
+    
+    def get_opcodes(self):
+        """difflib-style opcodes turning the original lines into the rendered lines"""
+        return self.opcodes
+    
+    def generate_diff(self, context_lines=3):
+        """Generate unified diff between original and rendered HTML"""
+        differ = unified_diff(
+            self.original_lines,
+            self.rendered_lines,
+            self.opcodes,
+            fromfile='Original HTML',
+            tofile='Rendered HTML',
+            lineterm='',
+            n=context_lines
+        )
+        return list(differ)
+    
+    def get_change_statistics(self):
+        """Get statistics about changes between HTML versions"""
+        return dict(self._change_statistics)
+    
+    @cached_property
+    def _change_statistics(self):
+        opcodes = self.opcodes
+        
+        stats = {
+            'total_lines_original': len(self.original_lines),
+            'total_lines_rendered': len(self.rendered_lines),
+            'lines_added': 0,
+            'lines_removed': 0,
+            'lines_modified': 0,
+            'similarity_ratio': similarity_ratio(opcodes, len(self.original_lines), len(self.rendered_lines)),
+            'js_injections': 0,
+            'meta_changes': 0,
+            'structural_changes': 0
+        }
+        
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == 'insert':
+                stats['lines_added'] += (j2 - j1)
+                # Check for JS injections
+                for line in self.rendered_lines[j1:j2]:
+                    if '<script' in line.lower() or 'javascript:' in line.lower():
+                        stats['js_injections'] += 1
+                    elif '<meta' in line.lower() or 'content=' in line.lower():
+                        stats['meta_changes'] += 1
+            elif tag == 'delete':
+                stats['lines_removed'] += (i2 - i1)
+            elif tag == 'replace':
+                stats['lines_modified'] += max(i2 - i1, j2 - j1)
+                stats['structural_changes'] += 1
+        
+        return stats
+    
+    def get_detailed_changes(self, categories=None):
+        """Get detailed line-by-line changes with categories, optionally only those in ``categories``"""
+        if categories is None:
+            return self._detailed_changes
+        return [change for change in self._detailed_changes if change['category'] in categories]
+    
+    @cached_property
+    def _detailed_changes(self):
+        changes = []
+        
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            if tag == 'equal':
+                continue
+                
+            change = {
+                'type': tag,
+                'original_lines': self.original_lines[i1:i2] if tag != 'insert' else [],
+                'rendered_lines': self.rendered_lines[j1:j2] if tag != 'delete' else [],
+                'original_range': (i1, i2),
+                'rendered_range': (j1, j2),
+                'category': self._categorize_change(
+                    self.original_lines[i1:i2] if tag != 'insert' else [],
+                    self.rendered_lines[j1:j2] if tag != 'delete' else []
+                )
+            }
+            changes.append(change)
+        
+        return changes
+    
+    @cached_property
+    def _opcode_categories(self):
+        return {
+            (change['type'], *change['original_range'], *change['rendered_range']): change['category']
+            for change in self._detailed_changes
+        }
+    
+    def get_viewer_pages(self, context_lines=3, max_rows=VIEWER_PAGE_ROWS, categories=None):
+        """The diff split into viewer pages: lists of opcodes with at most ``max_rows`` rows per panel.
+
+        Changes are grouped into hunks with ``context_lines`` unchanged lines
+        around them and packed onto pages in order; a hunk longer than a page
+        starts on the current page and continues on the next ones. Unchanged
+        lines between hunks become a single ``('collapsed', i1, i2, j1, j2)``
+        entry at the start of the page that follows them. An unchanged
+        document has no pages.
+
+        With ``categories``, hunks without a change in one of those categories
+        are left out and collapsed like unchanged lines. Pages are remembered
+        for the last ``VIEWER_PAGINATIONS`` sets of arguments.
+        """
+        max_rows = max(1, int(max_rows))
+        key = (context_lines, max_rows, None if categories is None else frozenset(categories))
+        with self._pages_lock:
+            pages = self._pages.get(key)
+            if pages is not None:
+                self._pages.move_to_end(key)
+                return pages
+        pages = self._build_pages(context_lines, max_rows, key[2])
+        with self._pages_lock:
+            self._pages[key] = pages
+            while len(self._pages) > VIEWER_PAGINATIONS:
+                self._pages.popitem(last=False)
+        return pages
+    
+    def _build_pages(self, context_lines, max_rows, categories):
+        pages = []
+        page, page_rows = [], 0
+        position = (0, 0)
+        for hunk in group_opcodes(self.opcodes, context_lines):
+            if categories is not None and not any(
+                self._opcode_categories.get(opcode) in categories for opcode in hunk if opcode[0] != 'equal'
+            ):
+                continue
+            hunk_rows = sum(_row_count(opcode) for opcode in hunk) + 1
+            if page and page_rows + hunk_rows > max_rows and hunk_rows <= max_rows:
+                pages.append(page)
+                page, page_rows = [], 0
+            _, i1, _, j1, _ = hunk[0]
+            if (i1, j1) != position:
+                page.append(('collapsed', position[0], i1, position[1], j1))
+                page_rows += 1
+            for tag, i1, i2, j1, j2 in hunk:
+                rows = max(i2 - i1, j2 - j1)
+                offset = 0
+                while True:
+                    if page_rows >= max_rows:
+                        pages.append(page)
+                        page, page_rows = [], 0
+                    # As much of the opcode as fits on the page
+                    size = min(rows - offset, max_rows - page_rows)
+                    page.append((tag, min(i2, i1 + offset), min(i2, i1 + offset + size),
+                                 min(j2, j1 + offset), min(j2, j1 + offset + size)))
+                    page_rows += size
+                    offset += size
+                    if offset >= rows:
+                        break
+            position = (hunk[-1][2], hunk[-1][4])
+        if page:
+            if position != (len(self.original_lines), len(self.rendered_lines)):
+                page.append(('collapsed', position[0], len(self.original_lines), position[1], len(self.rendered_lines)))
+            pages.append(page)
+        return pages
+    
+    def search(self, query, regex=False, case_sensitive=False, changed_only=False):
+        """Lines matching a search query, as ``(original_matches, rendered_matches)`` of 0-based line numbers.
+
+        ``changed_only`` limits the search to removed, added and modified lines.
+        """
+        original_ranges = rendered_ranges = None
+        if changed_only:
+            original_ranges = [(i1, i2) for tag, i1, i2, _, _ in self.opcodes if tag != 'equal' and i2 > i1]
+            rendered_ranges = [(j1, j2) for tag, _, _, j1, j2 in self.opcodes if tag != 'equal' and j2 > j1]
+        return (
+            self.original_index.search(query, regex, case_sensitive, original_ranges),
+            self.rendered_index.search(query, regex, case_sensitive, rendered_ranges),
+        )
+    
+    def find_pages(self, pages, original_matches=(), rendered_matches=()):
+        """Sorted indexes of the viewer ``pages`` showing any of the given 0-based lines"""
+        found = set()
+        for side, matches in ((1, original_matches), (3, rendered_matches)):
+            # Shown line ranges of this side in document order, with their page
+            shown = [
+                (opcode[side], opcode[side + 1], index)
+                for index, page in enumerate(pages)
+                for opcode in page
+                if opcode[0] != 'collapsed' and opcode[side + 1] > opcode[side]
+            ]
+            range_starts = [start for start, _, _ in shown]
+            for line in matches:
+                position = bisect.bisect_right(range_starts, line) - 1
+                if position >= 0 and line < shown[position][1]:
+                    found.add(shown[position][2])
+        return sorted(found)
+    
+    def get_page_rows(self, opcodes):
+        """Side-by-side viewer rows of a page of opcodes: ``(original_rows, rendered_rows)``.
+
+        Each row is ``(kind, line_number, line)``, where ``kind`` is 'unchanged',
+        'removed', 'added' or 'modified' and line numbers start at 1. A
+        collapsed entry becomes one ``('collapsed', first_line_number, line_count)``
+        row per panel.
+        """
+        original_rows = []
+        rendered_rows = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            original_kind, rendered_kind = ROW_KINDS[tag]
+            if tag == 'collapsed':
+                original_rows.append((original_kind, i1 + 1, i2 - i1))
+                rendered_rows.append((rendered_kind, j1 + 1, j2 - j1))
+                continue
+            if original_kind:
+                original_rows.extend((original_kind, i + 1, self.original_lines[i]) for i in range(i1, i2))
+            if rendered_kind:
+                rendered_rows.extend((rendered_kind, j + 1, self.rendered_lines[j]) for j in range(j1, j2))
+        return original_rows, rendered_rows
+    
+    def _categorize_change(self, original_lines, rendered_lines):
+        """Categorize the type of change"""
+        all_lines = original_lines + rendered_lines
+        content = '\n'.join(all_lines).lower()
+        
+        if '<script' in content or 'javascript:' in content:
+            return 'javascript'
+        elif '<meta' in content or 'og:' in content or 'twitter:' in content:
+            return 'metadata'
+        elif '<link' in content and ('css' in content or 'stylesheet' in content):
+            return 'stylesheet'
+        elif any(tag in content for tag in ['<div', '<span', '<p', '<h1', '<h2', '<h3']):
+            return 'content'
+        elif 'data-' in content or 'id=' in content or 'class=' in content:
+            return 'attributes'
+        else:
+            return 'other'
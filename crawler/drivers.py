@@ -0,0 +1,194 @@
+"""Pooled headless Chrome instances for the render stage."""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .waits import install_activity_tracker
+
+logger = logging.getLogger(__name__)
+
+# Use a consistent, modern User-Agent for both requests and Selenium
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+
+# Browser viewport used for every render
+WINDOW_SIZE = (1920, 1080)
+
+
+class PooledDriver:
+    """A WebDriver instance checked out of a WebDriverPool."""
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+        self.wait_time = 0.0
+        self.healthy = True
+        self.blocked_patterns = []
+
+
+class WebDriverPool:
+    """Bounded pool of independent WebDriver instances with checkout/checkin.
+
+    Each concurrent render gets its own browser, drivers are health-checked on
+    checkout and recycled after ``max_pages_per_driver`` pages to keep Chrome's
+    memory growth in check.
+    """
+    def __init__(self, size=1, max_pages_per_driver=100):
+        self.size = max(1, int(size))
+        self.max_pages_per_driver = max(1, int(max_pages_per_driver))
+        self._idle = []
+        # Every driver the pool created and has not quit yet, idle or checked out
+        self._drivers = set()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._live = 0
+        # Everything about the browser that can change a rendered DOM, for render cache keys
+        self.device_profile = {'user_agent': USER_AGENT, 'window_size': list(WINDOW_SIZE), 'images': False}
+        self.metrics = {
+            'checkouts': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'waiting': 0,
+            'drivers_created': 0,
+            'drivers_recycled': 0,
+            'health_check_failures': 0,
+        }
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Check a driver out of the pool, blocking until one is free."""
+        start_time = time.time()
+        with self._lock:
+            self.metrics['waiting'] += 1
+        acquired = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        wait_time = time.time() - start_time
+        with self._lock:
+            self.metrics['waiting'] -= 1
+        if not acquired:
+            raise TimeoutException(f"No WebDriver became available within {timeout} seconds")
+
+        pooled = None
+        try:
+            pooled = self._acquire_driver()
+            pooled.wait_time = wait_time
+            with self._lock:
+                self.metrics['checkouts'] += 1
+                self.metrics['total_wait_time'] += wait_time
+                self.metrics['max_wait_time'] = max(self.metrics['max_wait_time'], wait_time)
+            yield pooled
+        except WebDriverException:
+            if pooled:
+                pooled.healthy = False
+            raise
+        finally:
+            if pooled:
+                self._release_driver(pooled)
+            self._slots.release()
+
+    def _acquire_driver(self):
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                pooled = PooledDriver(self._create_driver())
+                with self._lock:
+                    self._drivers.add(pooled)
+                    self._live += 1
+                    self.metrics['drivers_created'] += 1
+                return pooled
+            if self._is_healthy(pooled.driver):
+                return pooled
+            with self._lock:
+                self.metrics['health_check_failures'] += 1
+            self._quit(pooled)
+
+    def _release_driver(self, pooled):
+        pooled.pages += 1
+        if not pooled.healthy or self._closed:
+            self._quit(pooled)
+        elif pooled.pages >= self.max_pages_per_driver:
+            with self._lock:
+                self.metrics['drivers_recycled'] += 1
+            self._quit(pooled)
+        else:
+            with self._lock:
+                self._idle.append(pooled)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, pooled):
+        with self._lock:
+            if pooled not in self._drivers:
+                return
+            self._drivers.discard(pooled)
+            self._live -= 1
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning("Error while quitting WebDriver: %s", e)
+
+    def stats(self):
+        """Return a snapshot of pool usage and queue-wait metrics."""
+        with self._lock:
+            stats = dict(self.metrics)
+            stats['size'] = self.size
+            stats['live_drivers'] = self._live
+            stats['idle_drivers'] = len(self._idle)
+        stats['avg_wait_time'] = stats['total_wait_time'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+    def _create_driver(self):
+        try:
+            logger.info("Initializing WebDriver... This may take a moment.")
+            options = Options()
+            options.add_argument("--headless=new")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--disable-renderer-backgrounding")
+            options.add_argument("--disable-backgrounding-occluded-windows")
+            options.add_argument(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+            options.add_argument(f"user-agent={USER_AGENT}")
+            
+            # Performance settings
+            prefs = {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_settings.popups": 0,
+                "profile.default_content_setting_values.notifications": 2
+            }
+            options.add_experimental_option("prefs", prefs)
+            # Network events feed the per-page request and blocking counters
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+            # Use webdriver-manager to handle driver installation
+            service = ChromeService(ChromeDriverManager().install())
+            driver = webdriver.Chrome(service=service, options=options)
+            # Track network and DOM activity from the first script on every page for adaptive waits
+            install_activity_tracker(driver)
+            logger.info("WebDriver initialized successfully.")
+            return driver
+        except Exception as e:
+            logger.error("Failed to create WebDriver: %s", e)
+            raise WebDriverException(f"Failed to create WebDriver: {e}") from e
+
+    def cleanup(self):
+        """Quit every driver the pool created, including ones still checked out."""
+        with self._lock:
+            self._closed = True
+            self._idle = []
+            drivers = list(self._drivers)
+        for pooled in drivers:
+            self._quit(pooled)
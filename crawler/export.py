@@ -0,0 +1,244 @@
+"""Streaming result exporters: rows are written to disk in chunks as results arrive."""
+import csv
+import json
+import os
+
+from .blobs import HTML_REFS
+from .crawl import new_crawl_result
+from .scanner import empty_seo_data
+
+# Columns holding inline page HTML
+HTML_COLUMNS = tuple(HTML_REFS)
+
+# Timing and ratio columns that default to integer 0 but are floats once measured
+FLOAT_COLUMNS = (
+    'response_time', 'fetch_time', 'render_time', 'analysis_time', 'technology_time', 'driver_wait_time',
+    'settle_time', 'js_percentage', 'retry_after',
+)
+
+# Fields only some results carry, with the default that gives each its type
+OPTIONAL_COLUMNS = {**{ref: '' for ref in HTML_REFS.values()}, 'crawl_depth': 0}
+
+# Excel rejects control characters and caps cells at 32767 characters
+EXCEL_MAX_CELL = 32767
+
+
+def flatten_result(result, keep_html=False):
+    """Flatten a crawl result into a single-level row suitable for tabular export.
+
+    HTML bodies are dropped unless ``keep_html`` is set; offloaded results keep
+    their ``*_html_ref`` blob references either way.
+    """
+    row = {}
+    for key, value in result.items():
+        if key in HTML_COLUMNS and not keep_html:
+            continue
+        if key == 'seo_data':
+            # Failed pages have no SEO data; emit the default columns so every row has the same shape
+            for seo_key, seo_value in {**empty_seo_data(), **(value or {})}.items():
+                row[f'seo_{seo_key}'] = seo_value
+        elif isinstance(value, (list, tuple)):
+            row[key] = '; '.join(str(item) for item in value)
+        elif isinstance(value, dict):
+            row[key] = json.dumps(value)
+        else:
+            row[key] = value
+    return row
+
+
+def result_columns(keep_html=False):
+    """Declared export columns, in order, mapped to a default value of the column's type"""
+    columns = flatten_result(new_crawl_result(''), keep_html=keep_html)
+    columns.update(OPTIONAL_COLUMNS)
+    return columns
+
+
+class ResultExporter:
+    """Base class for streaming exporters.
+
+    Results are flattened and buffered; every ``chunk_size`` rows the buffer
+    is written out, so memory stays bounded however many rows are exported.
+    Every declared result column is written, followed by any other keys of the
+    first chunk; keys first seen in later chunks are ignored and missing values
+    are left empty.
+    """
+    def __init__(self, path, keep_html=False, chunk_size=1000):
+        self.path = path
+        self.keep_html = keep_html
+        self.chunk_size = max(1, int(chunk_size))
+        self.declared = result_columns(keep_html)
+        self.columns = None
+        self.rows_written = 0
+        self._buffer = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, result):
+        """Add a crawl result to the export"""
+        self.write_row(flatten_result(result, keep_html=self.keep_html))
+
+    def write_row(self, row):
+        """Add an already flattened row to the export"""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.columns is None:
+            self.columns = list(dict.fromkeys([*self.declared, *(key for row in self._buffer for key in row)]))
+            self._open()
+        self._write_chunk(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self.columns is None:
+            # Nothing was written: still produce a valid file with only the header
+            self.columns = list(self.declared)
+            self._open()
+        self._close()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_chunk(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class CSVExporter(ResultExporter):
+    def _open(self):
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write_chunk(self, rows):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLinesExporter(ResultExporter):
+    def _open(self):
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, rows):
+        self._file.writelines(json.dumps(row, default=str) + '\n' for row in rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONExporter(JSONLinesExporter):
+    """A single JSON array, written element by element"""
+    def _open(self):
+        super()._open()
+        self._file.write('[')
+
+    def _write_chunk(self, rows):
+        for index, row in enumerate(rows, start=self.rows_written):
+            self._file.write(',\n' if index else '\n')
+            self._file.write(json.dumps(row, default=str))
+
+    def _close(self):
+        self._file.write('\n]\n')
+        super()._close()
+
+
+class ParquetExporter(ResultExporter):
+    """Parquet with one row group per chunk and zstd column compression"""
+    def _open(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = []
+        for name in self.columns:
+            default = self.declared.get(name, '')
+            if name in FLOAT_COLUMNS:
+                column_type = pa.float64()
+            elif isinstance(default, bool):
+                column_type = pa.bool_()
+            elif isinstance(default, int):
+                column_type = pa.int64()
+            else:
+                column_type = pa.string()
+            fields.append(pa.field(name, column_type))
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+
+    def _write_chunk(self, rows):
+        import pyarrow as pa
+
+        columns = {name: [row.get(name) for row in rows] for name in self._schema.names}
+        for field in self._schema:
+            if pa.types.is_string(field.type):
+                # Columns outside the declared list are strings whatever their values
+                columns[field.name] = [value if value is None or isinstance(value, str) else str(value)
+                                       for value in columns[field.name]]
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self._schema))
+
+    def _close(self):
+        self._writer.close()
+
+
+class ExcelExporter(ResultExporter):
+    """openpyxl write-only workbook: rows are serialized as they are appended"""
+    def _open(self):
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet('Crawl Results')
+        self._sheet.append(self.columns)
+
+    def _cell(self, value):
+        if isinstance(value, str):
+            return self._illegal.sub('', value)[:EXCEL_MAX_CELL]
+        return value
+
+    def _write_chunk(self, rows):
+        for row in rows:
+            self._sheet.append([self._cell(row.get(name)) for name in self.columns])
+
+    def _close(self):
+        self._workbook.save(self.path)
+
+
+# Exporter per output file extension
+EXPORTERS = {
+    '.csv': CSVExporter,
+    '.jsonl': JSONLinesExporter,
+    '.json': JSONExporter,
+    '.parquet': ParquetExporter,
+    '.xlsx': ExcelExporter,
+}
+
+
+def open_exporter(path, keep_html=False, chunk_size=1000):
+    """Streaming exporter for ``path``; the format is chosen from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Unsupported output format: {path}")
+    return EXPORTERS[extension](path, keep_html=keep_html, chunk_size=chunk_size)
+
+
+def export_results(results, path, keep_html=False, chunk_size=1000):
+    """Stream an iterable of crawl results to ``path``. Returns the number of rows written"""
+    with open_exporter(path, keep_html=keep_html, chunk_size=chunk_size) as exporter:
+        for result in results:
+            exporter.write(result)
+    return exporter.rows_written
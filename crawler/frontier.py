@@ -0,0 +1,202 @@
+"""Breadth-first link frontier for site crawls: URL normalization, exclusion and a compact seen-set."""
+import hashlib
+import re
+import threading
+from array import array
+from collections import deque
+from urllib.parse import urljoin, urlsplit
+
+from .urls import normalize_url
+
+# Link schemes the crawler can fetch
+CRAWLABLE_SCHEMES = ('http', 'https')
+
+# Fingerprints are spread over this many buckets by their top bits
+SEEN_BUCKET_BITS = 16
+
+
+def compile_exclude_patterns(patterns):
+    """One regex matching any of the exclude patterns, or None.
+
+    Patterns match anywhere in the URL (``admin/``, ``.pdf``); ``*`` matches
+    any run of characters.
+    """
+    patterns = [pattern.strip() for pattern in patterns if pattern and pattern.strip()]
+    if not patterns:
+        return None
+    return re.compile('|'.join(re.escape(pattern).replace(r'\*', '.*') for pattern in patterns))
+
+
+def site_of(url):
+    """Host of a URL without a leading ``www.``, so both forms count as the same site"""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class URLSeenSet:
+    """Set of URLs stored as 64-bit BLAKE2b fingerprints.
+
+    Fingerprints live in ``array('Q')`` buckets chosen by their top bits, about
+    8 bytes per URL instead of a string plus a hash-table slot, so millions of
+    URLs fit in tens of megabytes. A URL is wrongly taken as seen only if it
+    shares a fingerprint with another (odds of about 3 in a million at 10
+    million URLs).
+    """
+    def __init__(self):
+        self._buckets = [None] * (1 << SEEN_BUCKET_BITS)
+        self._shift = 64 - SEEN_BUCKET_BITS
+        self._count = 0
+
+    @staticmethod
+    def fingerprint(url):
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, url):
+        fingerprint = self.fingerprint(url)
+        bucket = self._buckets[fingerprint >> self._shift]
+        return bucket is not None and fingerprint in bucket
+
+    def add(self, url):
+        """Add a URL. Returns False if it was already in the set"""
+        fingerprint = self.fingerprint(url)
+        index = fingerprint >> self._shift
+        bucket = self._buckets[index]
+        if bucket is None:
+            bucket = self._buckets[index] = array('Q')
+        elif fingerprint in bucket:
+            return False
+        bucket.append(fingerprint)
+        self._count += 1
+        return True
+
+
+class LinkFrontier:
+    """Breadth-first queue of URLs to crawl, fed by the links of crawled pages.
+
+    Iterating yields the seed URLs, then discovered URLs in depth order; it
+    ends once the queue is empty and every handed-out URL has been reported
+    back through ``add_result``, which the pipeline calls as its ``on_result``
+    hook. Discovered links are resolved against their page's URL after
+    redirects, normalized (fragment dropped, query sorted or removed with
+    ``ignore_query``), kept to the seeds' sites and filtered by
+    ``exclude_patterns``. ``max_depth`` limits link hops from a seed and
+    ``max_pages`` the number of URLs crawled; once it is reached no more URLs
+    are queued, which also bounds the queue.
+    """
+    def __init__(self, seeds, max_depth=3, max_pages=None, ignore_query=False, exclude_patterns=(),
+                 same_site=True):
+        self.max_depth = max(0, int(max_depth))
+        self.max_pages = int(max_pages) if max_pages else None
+        self.ignore_query = ignore_query
+        self.exclude = compile_exclude_patterns(exclude_patterns)
+        self.same_site = same_site
+        self.seen = URLSeenSet()
+        self.sites = set()
+        self._seeds = iter(seeds)
+        # One FIFO queue per depth, so queued URLs are plain strings
+        self._levels = []
+        self._queued = 0
+        self._in_flight = {}
+        self._discovered = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def close(self):
+        """Stop handing out URLs"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _full(self):
+        return self.max_pages is not None and len(self.seen) >= self.max_pages
+
+    def _next_seed(self):
+        for url in self._seeds:
+            url = url.strip()
+            with self._cond:
+                if self._closed or self._full():
+                    return None
+                if url and self.seen.add(normalize_url(url, self.ignore_query)):
+                    self.sites.add(site_of(url))
+                    self._in_flight[url] = 0
+                    return url
+        return None
+
+    def _pop(self):
+        for depth, level in enumerate(self._levels):
+            if level:
+                self._queued -= 1
+                return level.popleft(), depth
+        return None, None
+
+    def __iter__(self):
+        seed = self._next_seed()
+        while seed is not None:
+            yield seed
+            seed = self._next_seed()
+        while True:
+            with self._cond:
+                while not self._queued and self._in_flight and not self._closed:
+                    self._cond.wait(0.1)
+                if self._closed or not self._queued:
+                    return
+                url, depth = self._pop()
+                self._in_flight[url] = depth
+            yield url
+
+    def _candidates(self, page_url, links):
+        for href in links:
+            href = href.strip()
+            if not href or href.startswith('#'):
+                continue
+            try:
+                link = urljoin(page_url, href)
+                if urlsplit(link).scheme.lower() not in CRAWLABLE_SCHEMES:
+                    continue
+                link = normalize_url(link, self.ignore_query)
+            except ValueError:
+                # Malformed href, e.g. an invalid port or IPv6 host
+                continue
+            if self.exclude is not None and self.exclude.search(link):
+                continue
+            yield link
+
+    def add_result(self, result):
+        """Queue the links of a finished page and mark its URL as done"""
+        links = result.pop('links', None) or ()
+        with self._cond:
+            depth = self._in_flight.get(result['url'])
+        if depth is None:
+            return
+        result['crawl_depth'] = depth
+        # Relative links resolve against the page's URL after redirects
+        page_url = result.get('final_url') or result['url']
+        candidates = list(self._candidates(page_url, links)) if depth < self.max_depth else []
+        with self._cond:
+            self._discovered += len(candidates)
+            for link in candidates:
+                if self._full():
+                    break
+                if self.same_site and site_of(link) not in self.sites:
+                    continue
+                if self.seen.add(link):
+                    while len(self._levels) <= depth + 1:
+                        self._levels.append(deque())
+                    self._levels[depth + 1].append(link)
+                    self._queued += 1
+            del self._in_flight[result['url']]
+            self._cond.notify_all()
+
+    def stats(self):
+        """URLs queued, in flight and seen, and links discovered so far"""
+        with self._cond:
+            return {
+                'queued': self._queued,
+                'in_flight': len(self._in_flight),
+                'seen': len(self.seen),
+                'discovered_links': self._discovered,
+                'depth': max((depth for depth, level in enumerate(self._levels) if level), default=0),
+            }
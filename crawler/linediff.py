@@ -0,0 +1,329 @@
+"""Pluggable line diff engines producing difflib-style opcodes.
+
+Opcodes are ``(tag, i1, i2, j1, j2)`` tuples exactly as returned by
+``difflib.SequenceMatcher.get_opcodes()``, so callers can switch engines
+freely.
+"""
+import bisect
+import difflib
+
+# Lines occurring more often than this in a region only anchor it when no rarer line is left
+MAX_CHAIN = 64
+
+
+def intern_lines(a, b):
+    """Map both line lists to integer ids, equal lines getting the same id"""
+    ids = {}
+    return [ids.setdefault(line, len(ids)) for line in a], [ids.setdefault(line, len(ids)) for line in b]
+
+
+def _trim(a, b, a_lo, a_hi, b_lo, b_hi, blocks):
+    # Common prefix and suffix are matched directly, without building a histogram
+    start = a_lo
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        a_lo += 1
+        b_lo += 1
+    if a_lo > start:
+        blocks.append((start, b_lo - (a_lo - start), a_lo - start))
+    end = a_hi
+    while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi -= 1
+        b_hi -= 1
+    if a_hi < end:
+        blocks.append((a_hi, b_hi, end - a_hi))
+    return a_lo, a_hi, b_lo, b_hi
+
+
+def _extend(a, b, a_lo, a_hi, b_lo, b_hi, i, j):
+    # The common run through a[i] == b[j], as (start_i, start_j, end_i, end_j)
+    start_i, start_j = i, j
+    while start_i > a_lo and start_j > b_lo and a[start_i - 1] == b[start_j - 1]:
+        start_i -= 1
+        start_j -= 1
+    end_i, end_j = i + 1, j + 1
+    while end_i < a_hi and end_j < b_hi and a[end_i] == b[end_j]:
+        end_i += 1
+        end_j += 1
+    return start_i, start_j, end_i, end_j
+
+
+def _best_anchor(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Common run around the line that is rarest in ``a``, as ``(i, j, size)``, or None.
+
+    Among runs of equally rare lines the one nearest the middle of the
+    region wins, then the longest: always taking the first would split off
+    a few lines per pass on periodic input and go quadratic.
+    """
+    positions = {}
+    for i in range(a_lo, a_hi):
+        positions.setdefault(a[i], []).append(i)
+
+    middle_i, middle_j = (a_lo + a_hi) // 2, (b_lo + b_hi) // 2
+    best = None
+    best_key = None
+    j = b_lo
+    while j < b_hi:
+        occurrences = positions.get(b[j])
+        count = len(occurrences) if occurrences else 0
+        if not count or count > MAX_CHAIN or (best_key and count > best_key[0]):
+            j += 1
+            continue
+        next_j = j + 1
+        for i in occurrences:
+            start_i, start_j, end_i, end_j = _extend(a, b, a_lo, a_hi, b_lo, b_hi, i, j)
+            distance = max(start_i - middle_i, middle_i - end_i, 0) + max(start_j - middle_j, middle_j - end_j, 0)
+            key = (count, distance, start_i - end_i)
+            if best_key is None or key < best_key:
+                best = (start_i, start_j, end_i - start_i)
+                best_key = key
+            next_j = max(next_j, end_j)
+        # Lines inside the run just found cannot anchor a better one
+        j = next_j
+    if best is None:
+        best = _middle_anchor(a, b, a_lo, a_hi, b_lo, b_hi, positions)
+    return best
+
+
+def _middle_anchor(a, b, a_lo, a_hi, b_lo, b_hi, positions):
+    """Longest run through a very common line ('</div>') taken from the middle of the region, or None.
+
+    Splitting in the middle keeps the recursion balanced; anchoring at the
+    first common line would peel off a few lines per pass and go quadratic.
+    """
+    middle_j = (b_lo + b_hi) // 2
+    for j in list(range(middle_j, b_hi)) + list(range(b_lo, middle_j)):
+        occurrences = positions.get(b[j])
+        if occurrences:
+            break
+    else:
+        return None
+    # Only the occurrences nearest the diagonal are tried
+    diagonal = a_lo + (j - b_lo) * (a_hi - a_lo) // (b_hi - b_lo)
+    middle = bisect.bisect_left(occurrences, diagonal)
+    best = None
+    for i in occurrences[max(0, middle - MAX_CHAIN // 2):middle + MAX_CHAIN // 2]:
+        start_i, start_j, end_i, _ = _extend(a, b, a_lo, a_hi, b_lo, b_hi, i, j)
+        if best is None or end_i - start_i > best[2]:
+            best = (start_i, start_j, end_i - start_i)
+    return best
+
+
+def _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Lines occurring exactly once on both sides, as ``(i, j)`` pairs forming the longest common subsequence"""
+    counts = {}
+    for i in range(a_lo, a_hi):
+        line = a[i]
+        counts[line] = -1 if line in counts else i
+    in_b = {}
+    for j in range(b_lo, b_hi):
+        line = b[j]
+        if counts.get(line, -1) >= 0:
+            in_b[line] = -1 if line in in_b else j
+    pairs = [(counts[line], j) for line, j in in_b.items() if j >= 0]
+    pairs.sort()
+    return _increasing_pairs(pairs)
+
+
+def _ranked_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Anchors for a region without unique lines, as ``(i, j)`` pairs.
+
+    Lines occurring equally often on both sides pair their k-th occurrences,
+    so a grid of cards whose text all changed still lines up its repeated
+    ``<div>`` and ``</p>`` lines instead of falling back to histogram splits.
+    """
+    a_positions = {}
+    for i in range(a_lo, a_hi):
+        a_positions.setdefault(a[i], []).append(i)
+    b_positions = {}
+    for j in range(b_lo, b_hi):
+        b_positions.setdefault(b[j], []).append(j)
+    pairs = []
+    for line, occurrences in a_positions.items():
+        others = b_positions.get(line)
+        if others is not None and len(others) == len(occurrences):
+            # Pairs whose neighbors differ on both sides are likely coincidences
+            pairs.extend(
+                (i, j) for i, j in zip(occurrences, others)
+                if (i + 1 < a_hi and j + 1 < b_hi and a[i + 1] == b[j + 1])
+                or (i > a_lo and j > b_lo and a[i - 1] == b[j - 1])
+            )
+    pairs.sort()
+    return _increasing_pairs(pairs)
+
+
+def _increasing_pairs(pairs):
+    """Longest run of ``(i, j)`` pairs, sorted by i, whose j positions increase too"""
+    if not pairs:
+        return []
+    # Patience sorting: longest increasing run of b positions, in order of a positions
+    tails = []
+    tail_index = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, j)
+        if pile:
+            previous[index] = tail_index[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def patience_matching_blocks(a, b):
+    """Matching blocks ``(i, j, size)`` of two sequences of hashable items, sorted, without the sentinel.
+
+    Patience diff: lines that are unique on both sides anchor the match, the
+    gaps between anchors are diffed the same way. In gaps without unique
+    lines, lines occurring equally often on both sides are paired up in
+    order; failing that the gap is split at the longest run around its
+    least frequent shared line, as histogram diff does. Every pass over a
+    region is linear or close to it, so even 200k-line documents full of
+    repeated ``</div>`` lines diff in seconds.
+    """
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = _trim(a, b, *stack.pop(), blocks)
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        anchors = _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi) or _ranked_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if anchors:
+            for i, j in anchors:
+                blocks.append((i, j, 1))
+                stack.append((a_lo, i, b_lo, j))
+                a_lo, b_lo = i + 1, j + 1
+            stack.append((a_lo, a_hi, b_lo, b_hi))
+            continue
+        anchor = _best_anchor(a, b, a_lo, a_hi, b_lo, b_hi)
+        if anchor is None:
+            continue
+        i, j, size = anchor
+        blocks.append(anchor)
+        stack.append((a_lo, i, b_lo, j))
+        stack.append((i + size, a_hi, j + size, b_hi))
+    blocks.sort()
+
+    # Join blocks that touch, as difflib does
+    merged = []
+    for i, j, size in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    return merged
+
+
+def opcodes_from_blocks(blocks, len_a, len_b):
+    """difflib-style opcodes from sorted matching blocks"""
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in list(blocks) + [(len_a, len_b, 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(('replace', i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(('delete', i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(('insert', i, block_i, j, block_j))
+        i, j = block_i + size, block_j + size
+        if size:
+            opcodes.append(('equal', block_i, i, block_j, j))
+    return opcodes
+
+
+def patience_opcodes(a, b):
+    """Opcodes from patience diff over interned lines"""
+    a_ids, b_ids = intern_lines(a, b)
+    return opcodes_from_blocks(patience_matching_blocks(a_ids, b_ids), len(a), len(b))
+
+
+def difflib_opcodes(a, b):
+    """Opcodes from difflib.SequenceMatcher (quadratic on large documents with many repeated lines)"""
+    return difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+
+# Diff engine per name, each taking two line lists and returning opcodes
+DIFF_ENGINES = {
+    'patience': patience_opcodes,
+    'difflib': difflib_opcodes,
+}
+
+
+def diff_opcodes(a, b, engine='patience'):
+    """Opcodes turning line list ``a`` into ``b`` with the named engine"""
+    if engine not in DIFF_ENGINES:
+        raise ValueError(f"Unknown diff engine: {engine}")
+    return DIFF_ENGINES[engine](a, b)
+
+
+def similarity_ratio(opcodes, len_a, len_b):
+    """``SequenceMatcher.ratio()`` computed from opcodes: 2 * matched lines / total lines"""
+    if not len_a + len_b:
+        return 1.0
+    matched = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+    return 2.0 * matched / (len_a + len_b)
+
+
+def group_opcodes(opcodes, n=3):
+    """Hunks of opcodes with up to ``n`` lines of context, like ``SequenceMatcher.get_grouped_opcodes``"""
+    codes = list(opcodes) or [('equal', 0, 1, 0, 1)]
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # A long unchanged stretch ends the hunk and starts the next one
+        if tag == 'equal' and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def unified_diff(a, b, opcodes, fromfile='', tofile='', n=3, lineterm='\n'):
+    """Unified diff lines built from precomputed opcodes, formatted like ``difflib.unified_diff``"""
+    started = False
+    for group in group_opcodes(opcodes, n):
+        if not started:
+            started = True
+            yield f'--- {fromfile}{lineterm}'
+            yield f'+++ {tofile}{lineterm}'
+        first, last = group[0], group[-1]
+        yield f'@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@{lineterm}'
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+
+def _format_range(start, stop):
+    # Same range notation as difflib's unified diff headers
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f'{beginning}'
+    if not length:
+        beginning -= 1
+    return f'{beginning},{length}'
@@ -0,0 +1,267 @@
+"""Staged crawl pipeline with independent fetch, render and analysis concurrency."""
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .analysis import analysis_args, analyze_html, analyze_page, apply_analysis, init_analysis_worker
+from .crawl import (
+    new_crawl_result, fetch_raw_html, plan_render, remember_analysis, render_page, reuse_cached_analysis, skip_render,
+)
+from .politeness import HostScheduler, RobotsCache
+from .render_policy import rendering_changed_page
+
+
+class URLSourceError(Exception):
+    """The URL iterable given to CrawlPipeline.run failed part-way; the original error is the cause"""
+
+
+class CrawlPipeline:
+    """Three-stage fetch -> render -> analyze crawl pipeline.
+
+    Raw HTTP fetches run on a large thread pool and feed a bounded render queue
+    drained by one worker per pooled browser; analysis runs on its own workers,
+    optionally backed by a process pool so HTML parsing is not bound by the GIL.
+    Each stage has independent concurrency, and the bounded queues apply
+    backpressure so the fetch stage never runs unboundedly ahead of rendering.
+    """
+    STAGES = ('fetch', 'render', 'analysis')
+
+    def __init__(self, driver_pool, http_sessions, config, fetch_workers=16, analysis_workers=2,
+                 render_queue_size=32, analysis_processes=0, raw_cache=None,
+                 render_cache=None, on_result=None):
+        self.driver_pool = driver_pool
+        self.http_sessions = http_sessions
+        self.raw_cache = raw_cache
+        self.render_cache = render_cache
+        # Called with each finished result before it is counted as completed (e.g. LinkFrontier.add_result)
+        self.on_result = on_result
+        self.config = config
+        self.fetch_workers = max(1, int(fetch_workers))
+        self.render_workers = driver_pool.size if driver_pool else 1
+        self.analysis_processes = max(0, int(analysis_processes))
+        # Keep every analysis process busy: one feeding thread per process
+        self.analysis_workers = max(1, int(analysis_workers), self.analysis_processes)
+        self._process_pool = None
+        # URLs wait in per-host queues so no single host gets every fetch worker
+        self.scheduler = HostScheduler(
+            max_per_host=config.get('max_per_host', 4),
+            min_delay=config.get('host_delay', 0.0),
+            robots=RobotsCache(http_sessions, timeout=config.get('timeout', 10)) if config.get('respect_robots', True) else None
+        )
+        self._queues = {
+            'fetch': self.scheduler,
+            'render': queue.Queue(maxsize=max(1, int(render_queue_size))),
+            'analysis': queue.Queue(maxsize=max(1, int(render_queue_size))),
+        }
+        self._output = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._processed = dict.fromkeys(self.STAGES, 0)
+        # Adaptive ('auto') render mode accounting; sampled pages measure mispredictions
+        self._auto = dict.fromkeys(('rendered', 'skipped', 'sampled', 'mispredicted', 'unneeded_renders'), 0)
+        self._submitted = 0
+        self._completed = 0
+        self._feeding_done = False
+        self._feed_error = None
+
+    def stop(self):
+        """Ask all stages to stop after the items they are currently processing"""
+        self._stop.set()
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return self._submitted - self._completed
+
+    def stats(self):
+        """Return per-stage queue depth and throughput counters"""
+        with self._lock:
+            return {
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'queue_depth': {stage: q.qsize() for stage, q in self._queues.items()},
+                'processed': dict(self._processed),
+                'hosts': self.scheduler.stats(),
+                'auto_render': dict(self._auto, misprediction_rate=(
+                    self._auto['mispredicted'] / self._auto['sampled'] if self._auto['sampled'] else 0.0
+                )),
+            }
+
+    def run(self, urls):
+        """Crawl ``urls`` (any iterable, consumed lazily) and yield results as they complete.
+
+        An exception raised while iterating ``urls`` is raised as a
+        URLSourceError after the pages submitted before it have been yielded.
+        """
+        if self.analysis_processes:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.analysis_processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_analysis_worker
+            )
+        threads = [threading.Thread(target=self._feed, args=(urls,), daemon=True)]
+        threads += [threading.Thread(target=self._stage_worker, args=('fetch', self._fetch), daemon=True)
+                    for _ in range(self.fetch_workers)]
+        threads += [threading.Thread(target=self._stage_worker, args=('render', self._render), daemon=True)
+                    for _ in range(self.render_workers)]
+        threads += [threading.Thread(target=self._stage_worker, args=('analysis', self._analyze), daemon=True)
+                    for _ in range(self.analysis_workers)]
+        for thread in threads:
+            thread.start()
+
+        yielded = 0
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    finished = self._feeding_done and yielded >= self._submitted
+                if finished:
+                    break
+                try:
+                    result = self._output.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                yielded += 1
+                yield result
+        finally:
+            self._stop.set()
+            if self._process_pool:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+        if self._feed_error is not None:
+            raise URLSourceError(str(self._feed_error)) from self._feed_error
+
+    def _put(self, stage, item):
+        # Block for backpressure, but keep checking whether the crawl was stopped
+        while not self._stop.is_set():
+            try:
+                self._queues[stage].put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, urls):
+        try:
+            for url in urls:
+                if self._stop.is_set():
+                    break
+                with self._lock:
+                    self._submitted += 1
+                if not self._put('fetch', url):
+                    break
+        except Exception as e:
+            # A lazy URL source (e.g. a streamed sitemap) failed; surfaced by run() once in-flight pages finish
+            self._feed_error = e
+        finally:
+            with self._lock:
+                self._feeding_done = True
+
+    def _stage_worker(self, stage, handler):
+        while not self._stop.is_set():
+            try:
+                item = self._queues[stage].get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                handler(item)
+            except Exception as e:
+                result = item[0] if isinstance(item, tuple) else new_crawl_result(item)
+                result['errors'].append(f"{stage.title()} stage error: {str(e)}")
+                self._finish(result)
+            finally:
+                with self._lock:
+                    self._processed[stage] += 1
+
+    def _fetch(self, url):
+        result = new_crawl_result(url)
+        response_headers = None
+        try:
+            if self.scheduler.admit(url):
+                response_headers = fetch_raw_html(result, self.http_sessions, self.config, self.raw_cache)
+            else:
+                result['errors'].append("Disallowed by robots.txt")
+        finally:
+            requeued = self.scheduler.release(url, result['status_code'], result['retry_after'])
+        if requeued:
+            # Throttled by the host: the URL was queued again behind the host's backoff
+            return
+        if response_headers is None:
+            self._finish(result)
+            return
+        if reuse_cached_analysis(result, self.raw_cache, self.config):
+            # Unchanged since the last crawl with this configuration: skip render and analysis
+            self._finish(result)
+            return
+
+        should_render, prediction = plan_render(result, response_headers, self.config)
+        if prediction is not None:
+            should_render = self._count_auto_decision(result, should_render)
+        if should_render:
+            self._put('render', (result, response_headers, prediction))
+        else:
+            skip_render(result)
+            self._put('analysis', (result, response_headers, prediction))
+
+    def _count_auto_decision(self, result, should_render):
+        # Render a periodic sample of skipped pages to measure how often skipping was wrong
+        sample_rate = self.config.get('auto_sample_rate', 0.05)
+        with self._lock:
+            if should_render:
+                self._auto['rendered'] += 1
+                return True
+            self._auto['skipped'] += 1
+            sample_every = round(1 / sample_rate) if sample_rate > 0 else 0
+            if sample_every and self._auto['skipped'] % sample_every == 0:
+                self._auto['sampled'] += 1
+                result['render_decision'] = 'sampled'
+                return True
+        return False
+
+    def _check_auto_prediction(self, result, prediction):
+        changed = rendering_changed_page(result, prediction)
+        with self._lock:
+            if result['render_decision'] == 'sampled' and changed:
+                self._auto['mispredicted'] += 1
+                result['render_mispredicted'] = True
+            elif result['render_decision'] == 'rendered' and not changed:
+                self._auto['unneeded_renders'] += 1
+
+    def _render(self, item):
+        result = item[0]
+        render_page(result, self.driver_pool, self.config, self.render_cache)
+        self._put('analysis', item)
+
+    def _analyze(self, item):
+        result, response_headers, prediction = item
+        parser = self.config.get('parser', 'lxml')
+        if self._process_pool:
+            start_time = time.time()
+            fields = self._process_pool.submit(
+                analyze_html, *analysis_args(result, response_headers, parser, self._collect_links)
+            ).result()
+            apply_analysis(result, fields)
+            result['analysis_time'] = time.time() - start_time
+        else:
+            analyze_page(result, response_headers, parser, self._collect_links)
+        if prediction is not None and result['render_decision'] != 'skipped' and result['rendered_html_size']:
+            self._check_auto_prediction(result, prediction)
+        remember_analysis(result, self.raw_cache, self.config)
+        # Report time spent working on the page, not time spent waiting in stage queues
+        result['response_time'] = result['fetch_time'] + result['render_time'] + result['analysis_time']
+        self._finish(result)
+
+    @property
+    def _collect_links(self):
+        return self.config.get('follow_links', False)
+
+    def _finish(self, result):
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                result['errors'].append(f"Result hook error: {str(e)}")
+        self._output.put(result)
+        with self._lock:
+            self._completed += 1
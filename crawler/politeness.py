@@ -0,0 +1,298 @@
+"""Per-host fetch scheduling: robots.txt, crawl delays, per-host concurrency and 429 backoff."""
+import queue
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from .drivers import USER_AGENT
+from .sessions import HTTP_ERRORS
+
+# Responses that mean the host wants us to slow down
+BACKOFF_STATUS_CODES = (429, 503)
+
+# Longest a host is paused after repeated 429/503 responses
+MAX_BACKOFF = 120.0
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date); 0 if absent or invalid"""
+    if not value:
+        return 0.0
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_crawl_delays(lines):
+    """Crawl-delay per user-agent token from robots.txt lines.
+
+    The standard library parser drops fractional delays such as ``0.5``, so
+    the groups are read here; a delay applies to every agent of its group.
+    """
+    delays = {}
+    agents = []
+    in_agents = False
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        key, value = (part.strip() for part in line.split(':', 1))
+        key = key.lower()
+        if key == 'user-agent':
+            if not in_agents:
+                agents = []
+            agents.append(value.lower())
+            in_agents = True
+            continue
+        in_agents = False
+        if key == 'crawl-delay':
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            for agent in agents:
+                delays.setdefault(agent, delay)
+    return delays
+
+
+class RobotsCache:
+    """Parsed robots.txt per origin, fetched once through the shared HTTP sessions.
+
+    Follows the standard library's semantics: 401/403 disallow the whole site,
+    any other missing or unreachable robots.txt allows everything.
+    """
+    def __init__(self, http_sessions, user_agent=USER_AGENT, timeout=10):
+        self.http_sessions = http_sessions
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._rules = {}
+        self._delays = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _origin_lock(self, origin):
+        with self._lock:
+            return self._locks.setdefault(origin, threading.Lock())
+
+    @staticmethod
+    def _origin(url):
+        parts = urlparse(url)
+        return f'{parts.scheme}://{parts.netloc}'.lower()
+
+    def rules(self, url):
+        """The RobotFileParser for the URL's origin, fetching it on first use"""
+        origin = self._origin(url)
+        with self._origin_lock(origin):
+            if origin not in self._rules:
+                self._rules[origin] = self._fetch(origin)
+            return self._rules[origin]
+
+    def _fetch(self, origin):
+        rules = RobotFileParser(f'{origin}/robots.txt')
+        self._delays[origin] = {}
+        try:
+            response, _ = self.http_sessions.get(rules.url, headers={'User-Agent': self.user_agent},
+                                                 timeout=self.timeout)
+        except HTTP_ERRORS:
+            rules.allow_all = True
+            return rules
+        if response.status_code in (401, 403):
+            rules.disallow_all = True
+        elif response.status_code >= 400:
+            rules.allow_all = True
+        else:
+            lines = response.text.splitlines()
+            rules.parse(lines)
+            self._delays[origin] = parse_crawl_delays(lines)
+        return rules
+
+    def can_fetch(self, url):
+        return self.rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Seconds between requests asked for by Crawl-delay or Request-rate, or None"""
+        rules = self.rules(url)
+        delays = self._delays[self._origin(url)]
+        # Same agent matching as RobotFileParser: a group's token contained in our product name
+        product = self.user_agent.split('/')[0].lower()
+        for agent, delay in delays.items():
+            if agent != '*' and agent in product:
+                return delay
+        if '*' in delays:
+            return delays['*']
+        rate = rules.request_rate(self.user_agent)
+        if rate is not None and rate.requests:
+            return rate.seconds / rate.requests
+        return None
+
+
+class HostState:
+    """Queue and pacing state of one host"""
+    def __init__(self, delay, robots_known=True):
+        self.urls = deque()
+        self.active = 0
+        self.delay = delay
+        # Until the host's robots.txt is read, only its first URL is handed out
+        self.robots_known = robots_known
+        self.backoff = 0.0
+        self.next_time = 0.0
+        self.max_active = None
+        self.fetched = 0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """Fetch queue that hands out URLs round-robin across hosts.
+
+    Each host has its own FIFO queue, at most ``max_per_host`` requests in
+    flight and at least ``min_delay`` seconds between request starts (raised to
+    the host's robots.txt Crawl-delay, which also limits it to one request at a
+    time). A host's first URL is held alone until ``admit`` has read its
+    robots.txt, so the Crawl-delay applies from the first request. 429/503 responses pause the host with exponential
+    backoff, honoring Retry-After, and requeue the URL up to ``max_retries``
+    times. It implements the ``put``/``get``/``qsize`` subset of
+    ``queue.Queue`` used by the pipeline stages.
+    """
+    def __init__(self, max_per_host=4, min_delay=0.0, robots=None, max_retries=2, maxsize=10000):
+        self.max_per_host = max(1, int(max_per_host))
+        self.min_delay = max(0.0, float(min_delay))
+        self.robots = robots
+        self.max_retries = max(0, int(max_retries))
+        self.maxsize = max(1, int(maxsize))
+        self._hosts = {}
+        self._ring = deque()
+        self._retries = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc.lower()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.min_delay, robots_known=self.robots is None)
+        return state
+
+    def _enqueue(self, url, front=False):
+        host = self.host_of(url)
+        state = self._state(host)
+        if not state.urls and host not in self._ring:
+            self._ring.append(host)
+        if front:
+            state.urls.appendleft(url)
+        else:
+            state.urls.append(url)
+        self._pending += 1
+        self._cond.notify_all()
+
+    def put(self, url, timeout=None):
+        """Queue a URL on its host; blocks while ``maxsize`` URLs are pending"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending >= self.maxsize:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Full
+                self._cond.wait(remaining)
+            self._enqueue(url)
+
+    def qsize(self):
+        with self._cond:
+            return self._pending
+
+    def _ready(self, state, now):
+        limit = state.max_active or self.max_per_host
+        if state.backoff or not state.robots_known:
+            limit = 1
+        return state.urls and state.active < limit and state.next_time <= now
+
+    def get(self, timeout=None):
+        """Next URL from the first ready host in round-robin order; raises queue.Empty on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wake_at = deadline
+                for _ in range(len(self._ring)):
+                    host = self._ring[0]
+                    self._ring.rotate(-1)
+                    state = self._hosts[host]
+                    if self._ready(state, now):
+                        url = state.urls.popleft()
+                        if not state.urls:
+                            self._ring.remove(host)
+                        state.active += 1
+                        state.next_time = now + state.delay + state.backoff
+                        self._pending -= 1
+                        self._cond.notify_all()
+                        return url
+                    if state.active < (state.max_active or self.max_per_host) and state.next_time > now:
+                        wake_at = state.next_time if wake_at is None else min(wake_at, state.next_time)
+                if deadline is not None and now >= deadline:
+                    raise queue.Empty
+                self._cond.wait(None if wake_at is None else max(0.0, wake_at - now))
+
+    def admit(self, url):
+        """Check robots.txt for a URL just taken from the queue and apply the host's Crawl-delay"""
+        if self.robots is None:
+            return True
+        delay = None
+        try:
+            delay = self.robots.crawl_delay(url)
+        finally:
+            with self._cond:
+                state = self._state(self.host_of(url))
+                if delay is not None:
+                    state.delay = max(self.min_delay, delay)
+                    state.max_active = 1
+                    # The request about to start counts from now, not from when its URL was taken
+                    state.next_time = max(state.next_time, time.monotonic() + state.delay + state.backoff)
+                state.robots_known = True
+                self._cond.notify_all()
+        return self.robots.can_fetch(url)
+
+    def release(self, url, status_code=0, retry_after=0.0):
+        """Mark a fetch as done. Returns True if the URL was requeued after a 429/503"""
+        with self._cond:
+            state = self._state(self.host_of(url))
+            state.active = max(0, state.active - 1)
+            state.fetched += 1
+            requeued = False
+            if status_code in BACKOFF_STATUS_CODES:
+                state.throttled += 1
+                state.backoff = min(MAX_BACKOFF, max(retry_after, state.backoff * 2, state.delay, 1.0))
+                state.next_time = max(state.next_time, time.monotonic() + state.backoff)
+                retries = self._retries.pop(url, 0)
+                if retries < self.max_retries:
+                    self._retries[url] = retries + 1
+                    self._enqueue(url, front=True)
+                    requeued = True
+            else:
+                self._retries.pop(url, None)
+                # Ease off the backoff again while the host keeps answering normally
+                state.backoff = state.backoff / 2 if state.backoff >= 0.2 else 0.0
+            self._cond.notify_all()
+            return requeued
+
+    def stats(self):
+        """Per-host queue length, requests in flight, effective delay and throttled responses"""
+        with self._cond:
+            return {
+                host: {
+                    'queued': len(state.urls),
+                    'active': state.active,
+                    'fetched': state.fetched,
+                    'delay': state.delay + state.backoff,
+                    'throttled': state.throttled,
+                }
+                for host, state in self._hosts.items()
+            }
@@ -0,0 +1,65 @@
+"""Decide from the raw HTML whether a page needs a headless render."""
+from .analysis import match_technologies
+from .scanner import scan_html
+from .technologies import SPA_FRAMEWORKS
+
+# Render modes accepted in config['render_mode']
+RENDER_MODES = ('always', 'auto', 'never')
+
+
+def render_mode(config):
+    """Effective render mode, honoring the older enable_js switch"""
+    if not config.get('enable_js', True):
+        return 'never'
+    return config.get('render_mode', 'always')
+
+
+def predict_render_need(raw_html, response_headers):
+    """Score how likely rendering is to change the page, from the raw HTML alone.
+
+    Returns a dict with the score (0-100), the signals that fired and the raw
+    page's text and link counts, which are kept to check the prediction later.
+    """
+    scan = scan_html(raw_html)
+    technologies = match_technologies(scan.script_srcs, raw_html, response_headers or {}, scan.meta)
+    seo_data = scan.seo_data
+    word_count = seo_data['word_count']
+    reasons = []
+    score = 0
+
+    if any(tech in SPA_FRAMEWORKS for tech in technologies):
+        score += 40
+        reasons.append('framework bundle')
+    if scan.has_app_root:
+        score += 30
+        reasons.append('#root/#app mount point')
+    if scan.script_srcs and word_count < 150:
+        score += 30
+        reasons.append('script-heavy page with little text')
+    if len(scan.script_srcs) >= 10:
+        score += 10
+        reasons.append('many external scripts')
+    if not seo_data['title']:
+        score += 10
+        reasons.append('no title in raw HTML')
+
+    return {
+        'score': min(score, 100),
+        'reasons': reasons,
+        'raw_word_count': word_count,
+        'raw_title': seo_data['title'],
+        'raw_links': seo_data['internal_links'] + seo_data['external_links'],
+    }
+
+
+def rendering_changed_page(result, prediction):
+    """Whether the rendered page differs meaningfully from what the raw HTML already showed"""
+    seo_data = result.get('seo_data') or {}
+    if result.get('js_percentage', 0) > 30:
+        return True
+    if seo_data.get('title', '') != prediction['raw_title']:
+        return True
+    if seo_data.get('word_count', 0) > prediction['raw_word_count'] * 1.2 + 20:
+        return True
+    links = seo_data.get('internal_links', 0) + seo_data.get('external_links', 0)
+    return links > prediction['raw_links'] * 1.2 + 5
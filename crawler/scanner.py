@@ -0,0 +1,145 @@
+"""Single-pass SEO extraction using lxml's streaming target parser."""
+from lxml import etree
+
+# Elements whose id marks a client-side application mount point
+APP_ROOT_IDS = ('root', 'app')
+
+# Elements whose text BeautifulSoup's get_text() leaves out of the page text
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+
+def empty_seo_data():
+    """Default SEO fields for a page"""
+    return {
+        'title': '',
+        'meta_description': '',
+        'h1_count': 0,
+        'h2_count': 0,
+        'images_without_alt': 0,
+        'internal_links': 0,
+        'external_links': 0,
+        'word_count': 0,
+        'canonical_url': '',
+        'meta_robots': '',
+        'og_title': '',
+        'og_description': '',
+        'schema_markup': False
+    }
+
+
+class SEOScanTarget:
+    """lxml parser target that collects every SEO field while the HTML streams past.
+
+    No tree is built: each start tag and text chunk is inspected exactly once,
+    replacing the dozen ``find``/``find_all``/``get_text`` traversals of
+    ``extract_seo_data``. Field semantics match the BeautifulSoup version.
+    """
+    def __init__(self):
+        self.seo_data = empty_seo_data()
+        self.script_srcs = []
+        self.links = []
+        self.meta = {}
+        self.has_app_root = False
+        self._seen = set()
+        self._title_depth = 0
+        self._title_parts = []
+        self._non_text_depth = 0
+        self._prev_chunk_ended_in_word = False
+
+    def _first(self, field, value):
+        # Mirror soup.find(): only the first matching element counts
+        if field not in self._seen:
+            self._seen.add(field)
+            self.seo_data[field] = value
+
+    def start(self, tag, attrib):
+        if tag in NON_TEXT_TAGS:
+            self._non_text_depth += 1
+
+        if tag == 'title':
+            if 'title' not in self._seen:
+                self._title_depth += 1
+        elif tag == 'meta':
+            name = attrib.get('name')
+            key = (name or attrib.get('property') or '').lower()
+            if key and key not in self.meta:
+                self.meta[key] = attrib.get('content', '')
+            if name == 'description':
+                self._first('meta_description', attrib.get('content', ''))
+            elif name == 'robots':
+                self._first('meta_robots', attrib.get('content', ''))
+            prop = attrib.get('property')
+            if prop == 'og:title':
+                self._first('og_title', attrib.get('content', ''))
+            elif prop == 'og:description':
+                self._first('og_description', attrib.get('content', ''))
+        elif tag == 'h1':
+            self.seo_data['h1_count'] += 1
+        elif tag == 'h2':
+            self.seo_data['h2_count'] += 1
+        elif tag == 'img':
+            if not attrib.get('alt'):
+                self.seo_data['images_without_alt'] += 1
+        elif tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.links.append(href)
+                if href.startswith('http'):
+                    self.seo_data['external_links'] += 1
+                else:
+                    self.seo_data['internal_links'] += 1
+        elif tag == 'link':
+            if 'canonical' in attrib.get('rel', '').split():
+                self._first('canonical_url', attrib.get('href', ''))
+        elif tag == 'script':
+            src = attrib.get('src')
+            if src is not None:
+                self.script_srcs.append(src)
+            if attrib.get('type') == 'application/ld+json':
+                self.seo_data['schema_markup'] = True
+        elif tag == 'div':
+            if attrib.get('id') in APP_ROOT_IDS:
+                self.has_app_root = True
+
+    def end(self, tag):
+        if tag in NON_TEXT_TAGS and self._non_text_depth:
+            self._non_text_depth -= 1
+        elif tag == 'title' and self._title_depth:
+            self._title_depth -= 1
+            if not self._title_depth:
+                self._first('title', ''.join(self._title_parts).strip())
+
+    def data(self, text):
+        if self._title_depth:
+            self._title_parts.append(text)
+        if self._non_text_depth:
+            return
+
+        # Words may be split across adjacent text chunks ("<b>foo</b>bar" is one word)
+        words = text.split()
+        if words:
+            self.seo_data['word_count'] += len(words)
+            if self._prev_chunk_ended_in_word and not text[0].isspace():
+                self.seo_data['word_count'] -= 1
+            self._prev_chunk_ended_in_word = not text[-1].isspace()
+        elif text:
+            self._prev_chunk_ended_in_word = False
+
+    def comment(self, text):
+        # Comments are not part of the page text
+        pass
+
+    def close(self):
+        if self._title_depth:
+            self._first('title', ''.join(self._title_parts).strip())
+        return self
+
+
+def scan_html(html_content):
+    """Parse HTML once and return the populated SEOScanTarget"""
+    target = SEOScanTarget()
+    if not html_content:
+        return target
+    parser = etree.HTMLParser(target=target)
+    parser.feed(html_content)
+    return parser.close()
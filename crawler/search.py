@@ -0,0 +1,81 @@
+"""Line search over large documents: plain or regex, case-insensitive by default, optionally within line ranges."""
+import bisect
+import re
+from functools import cached_property
+from itertools import accumulate
+
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Compiled pattern for a search query; raises re.error for an invalid regex"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def _line_starts(lines):
+    # Offset of every line start in the joined text, plus one past its end
+    return list(accumulate((len(line) + 1 for line in lines), initial=0))
+
+
+class LineSearchIndex:
+    """The lines of a document joined into one string, with the offset of each line.
+
+    A query is one C-level ``str.find`` or regex scan over the joined text,
+    jumping to the next line after every hit, and hits are mapped back to
+    line numbers by bisecting the offsets, rather than lowering and testing
+    every line in Python on each search. Each matching line is reported
+    once. A regex must match within one line, as in a line-by-line search.
+    """
+    def __init__(self, lines):
+        self.lines = lines
+        self.text = '\n'.join(lines)
+        self.starts = _line_starts(lines)
+
+    @cached_property
+    def _lowered(self):
+        lowered = self.text.lower()
+        if len(lowered) == len(self.text):
+            return lowered, self.starts
+        # A few characters change length when lowered ('İ'), so offsets are recomputed
+        lines = [line.lower() for line in self.lines]
+        return '\n'.join(lines), _line_starts(lines)
+
+    def search(self, query, regex=False, case_sensitive=False, ranges=None):
+        """Sorted 0-based numbers of the lines matching ``query``, only within ``(start, end)`` line ranges if given"""
+        if not query:
+            return []
+        if ranges is None:
+            ranges = [(0, len(self.lines))]
+        if regex:
+            return self._search_regex(compile_query(query, True, case_sensitive), ranges)
+        if '\n' in query:
+            return []
+        if case_sensitive:
+            text, starts = self.text, self.starts
+        else:
+            (text, starts), query = self._lowered, query.lower()
+        matches = []
+        for start, end in ranges:
+            position, end = starts[start], starts[end] - 1
+            while position <= end:
+                found = text.find(query, position, end)
+                if found < 0:
+                    break
+                line = bisect.bisect_right(starts, found) - 1
+                matches.append(line)
+                position = starts[line + 1]
+        return matches
+
+    def _search_regex(self, pattern, ranges):
+        matches = []
+        for start, end in ranges:
+            position, end = self.starts[start], self.starts[end] - 1
+            while position <= end:
+                match = pattern.search(self.text, position, end)
+                if match is None:
+                    break
+                line = bisect.bisect_right(self.starts, match.start()) - 1
+                # A match spanning a newline only counts if the line matches on its own
+                if pattern.search(self.lines[line]):
+                    matches.append(line)
+                position = self.starts[line + 1]
+        return matches
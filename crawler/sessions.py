@@ -0,0 +1,119 @@
+"""Keep-alive HTTP sessions with per-host connection pools for the fetch stage."""
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import httpx  # Optional: enables HTTP/2 for raw fetches
+except ImportError:
+    httpx = None
+
+# Exceptions raised by the raw fetch layer for network and HTTP status errors
+HTTP_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+# urllib3 pools kept per host session, so redirects to another origin (http -> https,
+# www -> apex, a CDN host) do not evict the host's own keep-alive pool
+POOLS_PER_SESSION = 4
+
+# Tracks new TCP connections opened by the current thread so each fetch can report reuse
+_connection_events = threading.local()
+
+def _count_new_connection():
+    _connection_events.count = getattr(_connection_events, 'count', 0) + 1
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count_new_connection()
+        return super()._new_conn()
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count_new_connection()
+        return super()._new_conn()
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count the connections they open."""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+class HTTPSessionPool:
+    """Thread-safe keep-alive HTTP sessions with one connection pool per host.
+
+    Every host gets its own session so connections are reused across all
+    pages of a site; ``http2=True`` switches to httpx clients when the
+    optional ``httpx[http2]`` dependency is installed.
+    """
+    def __init__(self, pool_maxsize=10, http2=False):
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.http2 = bool(http2) and httpx is not None
+        self._sessions = {}
+        self._host_stats = defaultdict(lambda: {'requests': 0, 'new_connections': 0})
+        self._lock = threading.Lock()
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                if self.http2:
+                    limits = httpx.Limits(max_connections=self.pool_maxsize,
+                                          max_keepalive_connections=self.pool_maxsize)
+                    session = httpx.Client(http2=True, limits=limits, follow_redirects=True)
+                else:
+                    session = requests.Session()
+                    adapter = CountingHTTPAdapter(pool_connections=POOLS_PER_SESSION, pool_maxsize=self.pool_maxsize)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, headers=None, timeout=None):
+        """GET ``url`` on the host's shared session and return ``(response, connection_info)``"""
+        host = urlparse(url).netloc.lower()
+        session = self._session_for(host)
+        _connection_events.count = 0
+        if self.http2:
+            def trace(event_name, info):
+                if event_name == 'connection.connect_tcp.complete':
+                    _count_new_connection()
+            response = session.request('GET', url, headers=headers, timeout=timeout,
+                                       extensions={'trace': trace})
+            http_version = response.http_version
+        else:
+            response = session.get(url, headers=headers, timeout=timeout)
+            http_version = 'HTTP/2' if getattr(response.raw, 'version', 11) == 20 else 'HTTP/1.1'
+        new_connections = _connection_events.count
+        with self._lock:
+            self._host_stats[host]['requests'] += 1
+            self._host_stats[host]['new_connections'] += new_connections
+        return response, {
+            'connection_reused': new_connections == 0,
+            'new_connections': new_connections,
+            'http_version': http_version,
+        }
+
+    def stats(self):
+        """Return per-host request and connection counts"""
+        with self._lock:
+            stats = {host: dict(host_stats) for host, host_stats in self._host_stats.items()}
+        for host_stats in stats.values():
+            requests_made = host_stats['requests']
+            # Redirect hops open connections too, so there can be more connections than requests
+            host_stats['reuse_ratio'] = max(0.0, 1 - host_stats['new_connections'] / requests_made) if requests_made else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
@@ -0,0 +1,100 @@
+"""In-browser extraction of SEO, SPA and framework signals with a single script call."""
+
+# Most start tags of the rendered page shell (the top three levels) returned for technology markup patterns
+MAX_SHELL_TAGS = 300
+
+# Reads the framework globals, and with collectPage every field analysis needs, in one round trip.
+# The SEO fields follow scanner.SEOScanTarget: the first matching element wins and the
+# page text leaves out script, style and template contents.
+PAGE_SIGNALS_JS = """
+const [globalPaths, collectPage, maxShellTags] = arguments;
+const signals = {node_count: document.getElementsByTagName('*').length, js_globals: {}};
+for (const path of globalPaths) {
+  let value = window;
+  try {
+    for (const name of path.split('.')) { value = value == null ? undefined : value[name]; }
+  } catch (e) { value = undefined; }
+  if (value === undefined || value === null || value === false) { continue; }
+  // Objects and functions only report that they exist
+  signals.js_globals[path] = (typeof value === 'string' || typeof value === 'number') ? String(value) : true;
+}
+if (!collectPage) { return signals; }
+
+const first = (selector, attribute) => {
+  const element = document.querySelector(selector);
+  return element ? (element.getAttribute(attribute) || '') : '';
+};
+const title = document.querySelector('title');
+const hrefs = Array.from(document.querySelectorAll('a[href]'), link => link.getAttribute('href'));
+const externalLinks = hrefs.filter(href => href.startsWith('http')).length;
+let imagesWithoutAlt = 0;
+for (const image of document.getElementsByTagName('img')) {
+  if (!image.getAttribute('alt')) { imagesWithoutAlt++; }
+}
+
+const texts = [];
+const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_TEXT, {
+  acceptNode: node => node.parentElement && node.parentElement.closest('script, style, template')
+    ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT
+});
+while (walker.nextNode()) { texts.push(walker.currentNode.data); }
+
+const meta = {};
+for (const tag of document.getElementsByTagName('meta')) {
+  const key = (tag.getAttribute('name') || tag.getAttribute('property') || '').toLowerCase();
+  if (key && !(key in meta)) { meta[key] = tag.getAttribute('content') || ''; }
+}
+
+const shell = [];
+const addShell = (element, depth) => {
+  if (shell.length >= maxShellTags) { return; }
+  shell.push(element.cloneNode(false).outerHTML);
+  if (depth) {
+    for (const child of element.children) { addShell(child, depth - 1); }
+  }
+};
+addShell(document.documentElement, 2);
+
+// Serialized the way the driver's page_source is, but only measured, never sent back
+const html = new XMLSerializer().serializeToString(document);
+Object.assign(signals, {
+  seo_data: {
+    title: title ? title.textContent.trim() : '',
+    meta_description: first('meta[name="description"]', 'content'),
+    h1_count: document.getElementsByTagName('h1').length,
+    h2_count: document.getElementsByTagName('h2').length,
+    images_without_alt: imagesWithoutAlt,
+    internal_links: hrefs.length - externalLinks,
+    external_links: externalLinks,
+    word_count: texts.join('').split(/\\s+/).filter(Boolean).length,
+    canonical_url: first('link[rel~="canonical"]', 'href'),
+    meta_robots: first('meta[name="robots"]', 'content'),
+    og_title: first('meta[property="og:title"]', 'content'),
+    og_description: first('meta[property="og:description"]', 'content'),
+    schema_markup: document.querySelector('script[type="application/ld+json"]') !== null
+  },
+  meta: meta,
+  script_srcs: Array.from(document.querySelectorAll('script[src]'), script => script.getAttribute('src')),
+  has_app_root: document.querySelector('div#root, div#app') !== null,
+  shell: shell.join('\\n'),
+  line_count: html.split('\\n').length - 1,
+  html_bytes: new TextEncoder().encode(html).length,
+  links: hrefs
+});
+return signals;
+"""
+
+
+def collect_page_signals(driver, js_globals=(), page=False):
+    """Run PAGE_SIGNALS_JS in the rendered page. Returns the signals, or None if the script failed.
+
+    Without ``page`` only the DOM node count and the values of the
+    ``js_globals`` paths are collected. With it the result also holds the
+    page's ``seo_data``, meta tags, script URLs, links, #root/#app marker,
+    shell start tags and the line count and size of its serialized DOM, so
+    the rendered HTML need not be transferred.
+    """
+    try:
+        return driver.execute_script(PAGE_SIGNALS_JS, list(js_globals), page, MAX_SHELL_TAGS)
+    except Exception:
+        return None
@@ -0,0 +1,162 @@
+"""Streaming sitemap parsing with sitemap-index recursion and gzip support."""
+import gzip
+import io
+import logging
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from lxml import etree
+
+from .drivers import USER_AGENT
+from .urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# A page listed in a sitemap; lastmod is the raw W3C datetime string or None
+SitemapEntry = namedtuple('SitemapEntry', ['url', 'lastmod'])
+
+# Nested sitemap indexes deeper than this are ignored
+MAX_SITEMAP_DEPTH = 5
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_DONE = object()
+
+
+def parse_lastmod(value):
+    """Unix timestamp of a sitemap <lastmod> (W3C datetime, date-only allowed), or None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _open_stream(session, sitemap_url, timeout):
+    """Response body as a file object, gunzipped when the sitemap is a .gz file"""
+    response = session.get(sitemap_url, timeout=timeout, stream=True, headers={'User-Agent': USER_AGENT})
+    response.raise_for_status()
+    # Content-Encoding: gzip is undone by urllib3; a .xml.gz file served as-is is not
+    response.raw.decode_content = True
+    # Keep the raw stream readable at EOF, io.BufferedReader refuses to read a closed file
+    response.raw.auto_close = False
+    stream = io.BufferedReader(response.raw)
+    if stream.peek(2)[:2] == _GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+    return response, stream
+
+
+def _child_text(element, name):
+    for child in element:
+        if isinstance(child.tag, str) and etree.QName(child).localname == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def stream_sitemap(sitemap_url, session=None, timeout=10):
+    """Yield ``('url', SitemapEntry)`` and ``('sitemap', loc)`` items while one sitemap document streams in"""
+    session = session or requests.Session()
+    response, stream = _open_stream(session, sitemap_url, timeout)
+    try:
+        for _, element in etree.iterparse(stream, events=('end',), tag=('{*}url', '{*}sitemap'),
+                                          resolve_entities=False, no_network=True, huge_tree=True):
+            loc = _child_text(element, 'loc')
+            if loc:
+                if etree.QName(element).localname == 'sitemap':
+                    yield 'sitemap', loc
+                else:
+                    yield 'url', SitemapEntry(loc, _child_text(element, 'lastmod') or None)
+            # Drop processed elements so memory stays flat on 50k-URL files
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    finally:
+        response.close()
+
+
+def iter_sitemap(sitemap_url, timeout=10, workers=4, max_depth=MAX_SITEMAP_DEPTH):
+    """Yield unique SitemapEntry records from a sitemap or sitemap index as they are parsed.
+
+    Child sitemaps of an index are fetched in parallel on ``workers`` threads.
+    A failure to read ``sitemap_url`` itself is raised; failing child
+    sitemaps are logged and skipped.
+    """
+    session = requests.Session()
+    items = queue.Queue(maxsize=1000)
+    stop = threading.Event()
+    lock = threading.Lock()
+    seen_sitemaps = {normalize_url(sitemap_url)}
+    submitted = [0]
+    executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='sitemap')
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(url, depth):
+        try:
+            for kind, value in stream_sitemap(url, session, timeout):
+                if stop.is_set():
+                    break
+                if kind == 'url':
+                    put(value)
+                elif depth < max_depth:
+                    submit(value, depth + 1)
+        except Exception as e:
+            if depth == 0:
+                put(e)
+            else:
+                logger.warning("Skipping sitemap %s: %s", url, e)
+        finally:
+            put(_DONE)
+
+    def submit(url, depth):
+        key = normalize_url(url)
+        with lock:
+            if stop.is_set() or key in seen_sitemaps:
+                return
+            seen_sitemaps.add(key)
+            submitted[0] += 1
+        executor.submit(read, url, depth)
+
+    with lock:
+        submitted[0] += 1
+    executor.submit(read, sitemap_url, 0)
+
+    seen_urls = set()
+    finished = 0
+    try:
+        while True:
+            with lock:
+                if finished >= submitted[0]:
+                    break
+            item = items.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                key = normalize_url(item.url)
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
+
+
+def parse_sitemap(sitemap_url):
+    """Fetches and parses a sitemap URL to extract all contained URLs."""
+    return [entry.url for entry in iter_sitemap(sitemap_url)]
@@ -0,0 +1,158 @@
+"""SQLite crawl store: per-URL results that persist across runs, for incremental recrawls."""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .blobs import HTML_REFS, HTMLBlobStore
+from .sitemap import parse_lastmod
+
+# Result fields kept in their own columns so the summary can be computed in SQL
+SUMMARY_COLUMNS = (
+    'status_code', 'response_time', 'settle_time', 'size_bytes', 'js_percentage', 'speed_score',
+    'seo_score', 'is_spa', 'blocked_requests', 'content_hash',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    url TEXT PRIMARY KEY,
+    crawled_at REAL NOT NULL,
+    status_code INTEGER,
+    response_time REAL,
+    settle_time REAL,
+    size_bytes INTEGER,
+    js_percentage REAL,
+    speed_score INTEGER,
+    seo_score INTEGER,
+    is_spa INTEGER,
+    blocked_requests INTEGER,
+    content_hash TEXT,
+    has_errors INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_crawled_at ON results (crawled_at);
+CREATE INDEX IF NOT EXISTS results_status_code ON results (status_code);
+CREATE INDEX IF NOT EXISTS results_js_percentage ON results (js_percentage);
+CREATE INDEX IF NOT EXISTS results_is_spa ON results (is_spa);
+CREATE TABLE IF NOT EXISTS technologies (
+    url TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (url, name)
+);
+CREATE INDEX IF NOT EXISTS technologies_name ON technologies (name);
+"""
+
+
+class CrawlStore:
+    """Crawl results in a local SQLite database, one row per URL.
+
+    Re-crawling a URL replaces its row. ``is_due`` tells whether a URL is new,
+    failed last time, older than a TTL or, per its sitemap ``lastmod``, changed
+    since the stored crawl, so scheduled crawls only redo the delta; pages
+    that changed within the TTL without a newer ``lastmod`` are caught by the
+    raw cache's conditional requests on the next due crawl. Page HTML lives in
+    an HTMLBlobStore (by default an ``html`` directory next to the database)
+    and rows only hold references to it.
+    """
+    def __init__(self, path, blobs=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.blobs = blobs or HTMLBlobStore(os.path.join(directory, 'html'))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, result, crawled_at=None):
+        """Insert or replace the stored result for a URL"""
+        data = self.blobs.offload(dict(result))
+        row = [result['url'], crawled_at or time.time()]
+        row.extend(result.get(column) for column in SUMMARY_COLUMNS)
+        row.append(1 if result.get('errors') else 0)
+        row.append(json.dumps(data, default=str))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO results (url, crawled_at, {', '.join(SUMMARY_COLUMNS)}, has_errors, data) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                row,
+            )
+            self._conn.execute('DELETE FROM technologies WHERE url = ?', (result['url'],))
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO technologies (url, name) VALUES (?, ?)',
+                [(result['url'], name) for name in result.get('technologies', [])],
+            )
+
+    def is_due(self, url, ttl, lastmod=None):
+        """Whether one URL needs crawling: unknown, failed, older than ``ttl``, or changed since per its sitemap lastmod"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT crawled_at, has_errors FROM results WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or row['has_errors'] or row['crawled_at'] < time.time() - ttl:
+            return True
+        modified = parse_lastmod(lastmod)
+        return modified is not None and modified > row['crawled_at']
+
+    def load(self, urls=None, with_html=False, limit=None, offset=0):
+        """Stored results, for the given URLs or all of them, most recently crawled first.
+
+        ``limit`` and ``offset`` select one page of rows. Results reference
+        their HTML in ``self.blobs`` unless ``with_html`` is set.
+        """
+        query = 'SELECT url, data FROM results'
+        params = ()
+        if urls is not None:
+            urls = list(urls)
+            query = 'SELECT url, data FROM results WHERE url IN (SELECT value FROM json_each(?))'
+            params = (json.dumps(urls),)
+        query += ' ORDER BY crawled_at DESC'
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params += (limit, offset)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        results = [json.loads(row['data']) for row in rows]
+        if with_html:
+            for result in results:
+                result.update(zip(HTML_REFS, self.blobs.load_html(result)))
+        return results
+
+    def summary(self, ttl=None):
+        """Aggregate metrics over every stored URL, computed in SQL"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*) AS urls,
+                       COALESCE(AVG(status_code = 200), 0) * 100 AS success_rate,
+                       COALESCE(AVG(response_time), 0) AS avg_response_time,
+                       COALESCE(AVG(size_bytes), 0) AS avg_size_bytes,
+                       COALESCE(AVG(js_percentage), 0) AS avg_js_percentage,
+                       COALESCE(SUM(js_percentage > 50), 0) AS high_js_pages,
+                       COALESCE(SUM(is_spa), 0) AS spa_pages,
+                       MAX(crawled_at) AS last_crawled_at
+                FROM results
+                """
+            ).fetchone()
+            stats = dict(row)
+            if ttl is not None:
+                stats['due'] = self._conn.execute(
+                    'SELECT COUNT(*) FROM results WHERE crawled_at < ? OR has_errors = 1', (time.time() - ttl,)
+                ).fetchone()[0]
+        return stats
+
+    def technology_counts(self):
+        """Number of stored pages per detected technology, most common first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT name, COUNT(*) AS pages FROM technologies GROUP BY name ORDER BY pages DESC'
+            ).fetchall()
+        return {row['name']: row['pages'] for row in rows}
@@ -0,0 +1,850 @@
+"""Technology detection from a data-driven signature database, compiled once and matched per page."""
+import re
+import string
+
+# Signatures per technology. Patterns are lowercase regexes matched against
+# lowercased text, and a ``version`` group captures the version. Sources:
+#   html     patterns over the page markup; starting them with a literal lets the regex
+#            engine skip ahead to it instead of trying every position of a large page
+#   scripts  patterns over the script src URLs, one per line
+#   meta     {meta name or property: pattern over its content}
+#   headers  {response header: pattern over its value, '' for presence}
+#   cookies  patterns over the names of the cookies the response sets, one per line
+#   js       {global variable path: pattern over its value, '' for presence}, case-sensitive;
+#            only matched when the rendered page's globals are supplied
+#   implies  technologies a match implies
+TECHNOLOGY_SIGNATURES = {
+    # JavaScript frameworks
+    'React': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/react(?:-dom)?@(?P<version>\d+(?:\.\d+)+)', r'\breact(?:-dom)?\b'],
+        'html': [r' data-reactroot=', r' data-reactid='],
+        'js': {'React.version': r'(?P<version>.+)', '__REACT_DEVTOOLS_GLOBAL_HOOK__': ''},
+    },
+    'Vue.js': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/vue@(?P<version>\d+(?:\.\d+)+)', r'/vue/(?P<version>\d+(?:\.\d+)+)/', r'\bvue\b'],
+        'html': [r' data-v-[0-9a-f]{8}\b', r' data-server-rendered="true"'],
+        'js': {'Vue.version': r'(?P<version>.+)', '__VUE__': ''},
+    },
+    'Angular': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'@angular/'],
+        'html': [r' ng-version="(?P<version>[\d.]+)"'],
+        'js': {'ng': '', 'getAllAngularRootElements': ''},
+    },
+    'AngularJS': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/angular(?:js)?/(?P<version>\d+(?:\.\d+)+)/angular', r'/angular@(?P<version>1\.[\d.]+)',
+                    r'\bangular(?:\.min)?\.js'],
+        'html': [r' ng-app[=\s>]', r' data-ng-app='],
+        'js': {'angular.version.full': r'(?P<version>.+)'},
+    },
+    'Svelte': {
+        'category': 'JavaScript frameworks',
+        'html': [r'svelte-[a-z0-9]{5,}\b'],
+    },
+    'SvelteKit': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/_app/immutable/'],
+        'html': [r' data-sveltekit-'],
+        'js': {'__sveltekit_dev': ''},
+        'implies': ['Svelte'],
+    },
+    'Ember.js': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'\bember(?:\.min|\.prod)?\.js'],
+        'html': [r'ember-application\b'],
+        'js': {'Ember.VERSION': r'(?P<version>.+)'},
+    },
+    'Preact': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/preact@(?P<version>[\d.]+)', r'\bpreact(?:\.min)?\.js'],
+        'js': {'preact': ''},
+    },
+    'Backbone.js': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'\bbackbone(?:-min|\.min)?\.js'],
+        'js': {'Backbone.VERSION': r'(?P<version>.+)'},
+    },
+    'Alpine.js': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/alpinejs@(?P<version>[\d.]+)', r'\balpine(?:js)?(?:\.min)?\.js'],
+        'html': [r' x-data='],
+        'js': {'Alpine.version': r'(?P<version>.+)'},
+    },
+    'htmx': {
+        'category': 'JavaScript frameworks',
+        'scripts': [r'/htmx\.org@(?P<version>[\d.]+)', r'\bhtmx(?:\.min)?\.js'],
+        'html': [r' hx-(?:get|post|put|patch|delete)='],
+        'js': {'htmx.version': r'(?P<version>.+)'},
+    },
+    'Next.js': {
+        'category': 'Web frameworks',
+        'scripts': [r'/_next/static/'],
+        'html': [r' id="__next_data__"', r' id="__next"'],
+        'headers': {'x-powered-by': r'^next\.js ?(?P<version>[\d.]+)?'},
+        'js': {'next.version': r'(?P<version>.+)', '__NEXT_DATA__': ''},
+        'implies': ['React', 'Node.js'],
+    },
+    'Nuxt.js': {
+        'category': 'Web frameworks',
+        'scripts': [r'/_nuxt/'],
+        'html': [r'window\.__nuxt__\b', r' id="__nuxt"', r' data-n-head='],
+        'js': {'__NUXT__': '', '$nuxt': ''},
+        'implies': ['Vue.js', 'Node.js'],
+    },
+    'Gatsby': {
+        'category': 'Static site generators',
+        'meta': {'generator': r'^gatsby (?P<version>[\d.]+)'},
+        'html': [r' id="___gatsby"'],
+        'js': {'___gatsby': ''},
+        'implies': ['React'],
+    },
+    'Remix': {
+        'category': 'Web frameworks',
+        'html': [r'window\.__remixcontext\b'],
+        'js': {'__remixContext': ''},
+        'implies': ['React'],
+    },
+    'Astro': {
+        'category': 'Static site generators',
+        'meta': {'generator': r'^astro v?(?P<version>[\d.]+)'},
+        'html': [r'<astro-island\b'],
+    },
+    'Hugo': {
+        'category': 'Static site generators',
+        'meta': {'generator': r'^hugo (?P<version>[\d.]+)'},
+    },
+    'Jekyll': {
+        'category': 'Static site generators',
+        'meta': {'generator': r'^jekyll v?(?P<version>[\d.]+)'},
+    },
+    'Express': {
+        'category': 'Web frameworks',
+        'headers': {'x-powered-by': r'^express'},
+        'implies': ['Node.js'],
+    },
+    'Ruby on Rails': {
+        'category': 'Web frameworks',
+        'meta': {'csrf-param': r'^authenticity_token$'},
+        'headers': {'x-powered-by': r'phusion passenger'},
+        'implies': ['Ruby'],
+    },
+    'Django': {
+        'category': 'Web frameworks',
+        'html': [r' name="csrfmiddlewaretoken"'],
+        'cookies': [r'^django_language$'],
+        'implies': ['Python'],
+    },
+    'Laravel': {
+        'category': 'Web frameworks',
+        'cookies': [r'^laravel_session$'],
+        'implies': ['PHP'],
+    },
+    'ASP.NET': {
+        'category': 'Web frameworks',
+        'html': [r' name="__viewstate"'],
+        'headers': {'x-aspnet-version': r'(?P<version>[\d.]+)', 'x-powered-by': r'asp\.net'},
+        'cookies': [r'^asp\.net_sessionid$', r'^\.aspxauth$'],
+    },
+
+    # JavaScript libraries
+    'jQuery': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bjquery[.-](?P<version>\d+(?:\.\d+)+)(?:\.min|\.slim)*\.js', r'/jquery@(?P<version>[\d.]+)',
+                    r'/jquery/(?P<version>\d+(?:\.\d+)+)/', r'/jquery(?:\.min)?\.js\?ver=(?P<version>[\d.]+)',
+                    r'jquery'],
+        'js': {'jQuery.fn.jquery': r'(?P<version>.+)'},
+    },
+    'jQuery UI': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/jqueryui/(?P<version>\d+(?:\.\d+)+)/', r'\bjquery-ui(?:\.min)?\.js'],
+        'js': {'jQuery.ui.version': r'(?P<version>.+)'},
+        'implies': ['jQuery'],
+    },
+    'Lodash': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/lodash@(?P<version>[\d.]+)', r'\blodash(?:\.min)?\.js'],
+    },
+    'Underscore.js': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bunderscore(?:-min|\.min)?\.js'],
+    },
+    'Moment.js': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bmoment(?:-with-locales)?(?:\.min)?\.js'],
+        'js': {'moment.version': r'(?P<version>.+)'},
+    },
+    'GSAP': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/gsap/(?P<version>\d+(?:\.\d+)+)/', r'\bgsap(?:\.min)?\.js'],
+        'js': {'gsap.version': r'(?P<version>.+)'},
+    },
+    'Three.js': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bthree(?:\.module)?(?:\.min)?\.js'],
+        'js': {'THREE.REVISION': r'(?P<version>.+)'},
+    },
+    'D3': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/d3@(?P<version>[\d.]+)', r'\bd3(?:\.v\d)?(?:\.min)?\.js'],
+        'js': {'d3.version': r'(?P<version>.+)'},
+    },
+    'Chart.js': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/chart\.js@(?P<version>[\d.]+)', r'\bchart(?:\.umd)?(?:\.min)?\.js'],
+        'js': {'Chart.version': r'(?P<version>.+)'},
+    },
+    'Swiper': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'/swiper@(?P<version>[\d.]+)', r'\bswiper(?:-bundle)?(?:\.min)?\.js'],
+        'html': [r'swiper-wrapper\b'],
+    },
+    'Slick': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bslick(?:\.min)?\.js'],
+        'implies': ['jQuery'],
+    },
+    'Modernizr': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bmodernizr(?:[.-][\d.]+)?(?:\.custom)?(?:\.min)?\.js'],
+        'js': {'Modernizr._version': r'(?P<version>.+)'},
+    },
+    'RequireJS': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\brequire(?:\.min)?\.js'],
+        'js': {'requirejs.version': r'(?P<version>.+)'},
+    },
+    'Socket.IO': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bsocket\.io(?:\.min)?\.js'],
+    },
+    'MooTools': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bmootools'],
+        'js': {'MooTools.version': r'(?P<version>.+)'},
+    },
+    'Prototype': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bprototype(?:\.min)?\.js'],
+        'js': {'Prototype.Version': r'(?P<version>.+)'},
+    },
+    'webpack': {
+        'category': 'Build tools',
+        'html': [r'webpackjsonp\b', r'self\.webpackchunk'],
+        'js': {'webpackJsonp': ''},
+    },
+    'Vite': {
+        'category': 'Build tools',
+        'scripts': [r'/@vite/client\b'],
+        'html': [r'/@vite/client\b'],
+    },
+    'Polyfill.io': {
+        'category': 'JavaScript libraries',
+        'scripts': [r'\bpolyfill\.io/'],
+    },
+
+    # UI frameworks and fonts
+    'Bootstrap': {
+        'category': 'UI frameworks',
+        'scripts': [r'/bootstrap@(?P<version>[\d.]+)/', r'/bootstrap/(?P<version>\d+(?:\.\d+)+)/',
+                    r'\bbootstrap(?:\.bundle)?(?:\.min)?\.js'],
+        'html': [r'/bootstrap@(?P<version>[\d.]+)/', r'bootstrap\.min\.css', r'bootstrap\.css'],
+        'js': {'bootstrap.Tooltip.VERSION': r'(?P<version>.+)'},
+    },
+    'Tailwind CSS': {
+        'category': 'UI frameworks',
+        'scripts': [r'\bcdn\.tailwindcss\.com'],
+        'html': [r'tailwindcss v(?P<version>[\d.]+)', r'tailwindcss\b'],
+    },
+    'Bulma': {
+        'category': 'UI frameworks',
+        'html': [r'/bulma@(?P<version>[\d.]+)/', r'bulma(?:\.min)?\.css'],
+    },
+    'Foundation': {
+        'category': 'UI frameworks',
+        'scripts': [r'\bfoundation(?:\.min)?\.js'],
+        'js': {'Foundation.version': r'(?P<version>.+)'},
+    },
+    'Font Awesome': {
+        'category': 'Font scripts',
+        'html': [r'font-awesome/(?P<version>\d+(?:\.\d+)+)/', r'/fontawesome-free@(?P<version>[\d.]+)/',
+                 r'font-awesome\b', r'fontawesome\b'],
+        'scripts': [r'\bkit\.fontawesome\.com\b'],
+    },
+    'Google Font API': {
+        'category': 'Font scripts',
+        'html': [r'fonts\.googleapis\.com\b'],
+    },
+    'Adobe Fonts': {
+        'category': 'Font scripts',
+        'html': [r'use\.typekit\.net\b'],
+        'scripts': [r'\buse\.typekit\.net\b'],
+    },
+
+    # CMS and ecommerce
+    'WordPress': {
+        'category': 'CMS',
+        'meta': {'generator': r'^wordpress ?(?P<version>[\d.]+)?'},
+        'html': [r'/wp-content/', r'/wp-includes/'],
+        'scripts': [r'/wp-(?:content|includes)/'],
+        'headers': {'link': r'rel="https://api\.w\.org/"'},
+        'implies': ['PHP', 'MySQL'],
+    },
+    'WooCommerce': {
+        'category': 'Ecommerce',
+        'meta': {'generator': r'^woocommerce (?P<version>[\d.]+)'},
+        'html': [r'/wp-content/plugins/woocommerce/'],
+        'implies': ['WordPress'],
+    },
+    'Elementor': {
+        'category': 'Page builders',
+        'meta': {'generator': r'^elementor (?P<version>[\d.]+)'},
+        'html': [r'/wp-content/plugins/elementor/'],
+        'implies': ['WordPress'],
+    },
+    'Yoast SEO': {
+        'category': 'SEO',
+        'html': [r'optimized with the yoast seo(?: premium)? plugin v(?P<version>[\d.]+)', r' class="yoast-schema-graph'],
+        'implies': ['WordPress'],
+    },
+    'Drupal': {
+        'category': 'CMS',
+        'meta': {'generator': r'^drupal(?: (?P<version>\d+))?'},
+        'html': [r'/sites/(?:default|all)/(?:files|modules|themes)/', r' data-drupal-selector=', r'drupal\.settings\b'],
+        'headers': {'x-generator': r'^drupal(?: (?P<version>\d+))?', 'x-drupal-cache': ''},
+        'js': {'Drupal': ''},
+        'implies': ['PHP'],
+    },
+    'Joomla': {
+        'category': 'CMS',
+        'meta': {'generator': r'^joomla!?(?: (?P<version>[\d.]+))?'},
+        'html': [r'/media/(?:jui|system)/js/', r'/components/com_'],
+        'js': {'Joomla': ''},
+        'implies': ['PHP'],
+    },
+    'TYPO3': {
+        'category': 'CMS',
+        'meta': {'generator': r'^typo3 ?(?P<version>[\d.]+)?'},
+        'html': [r'/typo3conf/', r'/typo3temp/'],
+        'implies': ['PHP'],
+    },
+    'Ghost': {
+        'category': 'CMS',
+        'meta': {'generator': r'^ghost ?(?P<version>[\d.]+)?'},
+        'headers': {'x-ghost-cache-status': ''},
+        'implies': ['Node.js'],
+    },
+    'Blogger': {
+        'category': 'Blogs',
+        'meta': {'generator': r'^blogger'},
+        'html': [r'blogger\.com/static/'],
+    },
+    'Wix': {
+        'category': 'Website builders',
+        'meta': {'generator': r'^wix\.com'},
+        'html': [r'static\.wixstatic\.com\b', r'static\.parastorage\.com\b'],
+        'headers': {'x-wix-request-id': ''},
+    },
+    'Squarespace': {
+        'category': 'Website builders',
+        'html': [r'\.squarespace\.com\b'],
+        'headers': {'server': r'squarespace'},
+        'js': {'Squarespace': ''},
+    },
+    'Webflow': {
+        'category': 'Website builders',
+        'meta': {'generator': r'^webflow'},
+        'html': [r' data-wf-page=', r'assets\.website-files\.com\b'],
+    },
+    'HubSpot CMS': {
+        'category': 'CMS',
+        'meta': {'generator': r'^hubspot'},
+        'headers': {'x-hs-hub-id': ''},
+    },
+    'Shopify': {
+        'category': 'Ecommerce',
+        'html': [r'cdn\.shopify\.com\b', r'shopify\.theme\b'],
+        'scripts': [r'\bcdn\.shopify\.com\b'],
+        'headers': {'x-shopid': '', 'x-shopify-stage': ''},
+        'cookies': [r'^_shopify_'],
+        'js': {'Shopify': ''},
+    },
+    'Magento': {
+        'category': 'Ecommerce',
+        'html': [r'/static/version\d+/frontend/', r'mage/cookies\b'],
+        'js': {'Mage': ''},
+        'implies': ['PHP'],
+    },
+    'PrestaShop': {
+        'category': 'Ecommerce',
+        'meta': {'generator': r'^prestashop'},
+        'cookies': [r'^prestashop-'],
+        'js': {'prestashop': ''},
+        'implies': ['PHP'],
+    },
+    'BigCommerce': {
+        'category': 'Ecommerce',
+        'html': [r'cdn\d+\.bigcommerce\.com\b'],
+        'scripts': [r'\bcdn\d+\.bigcommerce\.com\b'],
+    },
+
+    # Analytics, marketing and widgets
+    'Google Analytics': {
+        'category': 'Analytics',
+        'scripts': [r'\bgoogle-analytics\.com/(?:ga|analytics)\.js', r'\bgoogletagmanager\.com/gtag/js'],
+        'html': [r'google-analytics\.com/(?:ga|analytics)\.js', r'gtag\(\s*[\'"]config[\'"]'],
+        'js': {'GoogleAnalyticsObject': '', 'gtag': ''},
+    },
+    'Google Tag Manager': {
+        'category': 'Tag managers',
+        'scripts': [r'\bgoogletagmanager\.com/gtm\.js'],
+        'html': [r'googletagmanager\.com/gtm\.js', r'googletagmanager\.com/ns\.html'],
+        'js': {'google_tag_manager': ''},
+    },
+    'Google AdSense': {
+        'category': 'Advertising',
+        'scripts': [r'\bpagead2\.googlesyndication\.com\b'],
+        'html': [r'adsbygoogle\b'],
+    },
+    'Facebook Pixel': {
+        'category': 'Analytics',
+        'scripts': [r'\bconnect\.facebook\.net/[a-z_]+/fbevents\.js'],
+        'html': [r'connect\.facebook\.net/[a-z_]+/fbevents\.js'],
+        'js': {'fbq': ''},
+    },
+    'Hotjar': {
+        'category': 'Analytics',
+        'scripts': [r'\bstatic\.hotjar\.com\b'],
+        'html': [r'static\.hotjar\.com\b'],
+        'js': {'hj': ''},
+    },
+    'Microsoft Clarity': {
+        'category': 'Analytics',
+        'scripts': [r'\bclarity\.ms/tag/'],
+        'html': [r'clarity\.ms/tag/'],
+    },
+    'Segment': {
+        'category': 'Analytics',
+        'scripts': [r'\bcdn\.segment\.com/analytics\.js'],
+        'html': [r'cdn\.segment\.com/analytics\.js'],
+    },
+    'Mixpanel': {
+        'category': 'Analytics',
+        'scripts': [r'\bcdn\.mxpnl\.com\b'],
+        'html': [r'cdn\.mxpnl\.com\b'],
+        'js': {'mixpanel': ''},
+    },
+    'Matomo': {
+        'category': 'Analytics',
+        'scripts': [r'\b(?:matomo|piwik)\.js\b'],
+        'html': [r'matomo\.js\b', r'piwik\.js\b'],
+        'js': {'Matomo': '', 'Piwik': ''},
+    },
+    'Plausible': {
+        'category': 'Analytics',
+        'scripts': [r'\bplausible\.io/js/'],
+    },
+    'HubSpot': {
+        'category': 'Marketing automation',
+        'scripts': [r'\bjs\.hs-scripts\.com\b', r'\bjs\.hs-analytics\.net\b', r'\bjs\.hsforms\.net\b'],
+        'html': [r'js\.hs-scripts\.com\b'],
+        'js': {'_hsq': ''},
+    },
+    'Optimizely': {
+        'category': 'A/B testing',
+        'scripts': [r'\bcdn\.optimizely\.com\b'],
+        'js': {'optimizely': ''},
+    },
+    'New Relic': {
+        'category': 'Monitoring',
+        'scripts': [r'\bjs-agent\.newrelic\.com\b'],
+        'html': [r'nreum\b'],
+        'js': {'NREUM': ''},
+    },
+    'Sentry': {
+        'category': 'Monitoring',
+        'scripts': [r'\bbrowser\.sentry-cdn\.com/(?P<version>\d+(?:\.\d+)+)/', r'\bjs\.sentry-cdn\.com\b'],
+        'js': {'Sentry.SDK_VERSION': r'(?P<version>.+)'},
+    },
+    'Intercom': {
+        'category': 'Live chat',
+        'scripts': [r'\bwidget\.intercom\.io\b', r'\bjs\.intercomcdn\.com\b'],
+        'js': {'Intercom': ''},
+    },
+    'Drift': {
+        'category': 'Live chat',
+        'scripts': [r'\bjs\.driftt\.com\b'],
+        'js': {'drift': ''},
+    },
+    'Zendesk': {
+        'category': 'Live chat',
+        'scripts': [r'\bstatic\.zdassets\.com\b'],
+        'js': {'zE': ''},
+    },
+    'Crisp': {
+        'category': 'Live chat',
+        'scripts': [r'\bclient\.crisp\.chat\b'],
+        'js': {'$crisp': ''},
+    },
+    'Tawk.to': {
+        'category': 'Live chat',
+        'scripts': [r'\bembed\.tawk\.to\b'],
+        'js': {'Tawk_API': ''},
+    },
+    'Cookiebot': {
+        'category': 'Cookie compliance',
+        'scripts': [r'\bconsent\.cookiebot\.com\b'],
+        'js': {'Cookiebot': ''},
+    },
+    'OneTrust': {
+        'category': 'Cookie compliance',
+        'scripts': [r'\bcdn\.cookielaw\.org\b', r'\boptanon'],
+        'cookies': [r'^optanonconsent$'],
+        'js': {'OneTrust': ''},
+    },
+    'reCAPTCHA': {
+        'category': 'Security',
+        'scripts': [r'/recaptcha/(?:api|enterprise)\.js'],
+        'html': [r' class="g-recaptcha\b'],
+        'js': {'grecaptcha': ''},
+    },
+    'hCaptcha': {
+        'category': 'Security',
+        'scripts': [r'\bhcaptcha\.com/1/api\.js'],
+        'js': {'hcaptcha': ''},
+    },
+    'Stripe': {
+        'category': 'Payment processors',
+        'scripts': [r'\bjs\.stripe\.com\b'],
+        'js': {'Stripe.version': r'(?P<version>.+)'},
+    },
+    'PayPal': {
+        'category': 'Payment processors',
+        'scripts': [r'\bpaypal\.com/sdk/js\b', r'\bpaypalobjects\.com\b'],
+        'js': {'paypal': ''},
+    },
+    'YouTube': {
+        'category': 'Video players',
+        'html': [r'youtube\.com/embed/', r'youtube-nocookie\.com/embed/'],
+    },
+    'Vimeo': {
+        'category': 'Video players',
+        'html': [r'player\.vimeo\.com\b'],
+    },
+
+    # Web servers, CDNs and hosting
+    'Nginx': {
+        'category': 'Web servers',
+        'headers': {'server': r'nginx(?:/(?P<version>[\d.]+))?'},
+    },
+    'OpenResty': {
+        'category': 'Web servers',
+        'headers': {'server': r'openresty(?:/(?P<version>[\d.]+))?'},
+        'implies': ['Nginx'],
+    },
+    'Apache': {
+        'category': 'Web servers',
+        'headers': {'server': r'apache(?:/(?P<version>[\d.]+))?'},
+    },
+    'Microsoft IIS': {
+        'category': 'Web servers',
+        'headers': {'server': r'microsoft-iis(?:/(?P<version>[\d.]+))?'},
+    },
+    'LiteSpeed': {
+        'category': 'Web servers',
+        'headers': {'server': r'litespeed'},
+    },
+    'Caddy': {
+        'category': 'Web servers',
+        'headers': {'server': r'^caddy'},
+    },
+    'Envoy': {
+        'category': 'Web servers',
+        'headers': {'server': r'^envoy', 'x-envoy-upstream-service-time': ''},
+    },
+    'Gunicorn': {
+        'category': 'Web servers',
+        'headers': {'server': r'gunicorn(?:/(?P<version>[\d.]+))?'},
+        'implies': ['Python'],
+    },
+    'Varnish': {
+        'category': 'Caching',
+        'headers': {'via': r'varnish', 'x-varnish': ''},
+    },
+    'Cloudflare': {
+        'category': 'CDN',
+        'headers': {'server': r'^cloudflare', 'cf-ray': ''},
+        'cookies': [r'^__cf_bm$', r'^__cfduid$'],
+    },
+    'Amazon CloudFront': {
+        'category': 'CDN',
+        'headers': {'via': r'cloudfront', 'x-amz-cf-id': ''},
+    },
+    'Amazon S3': {
+        'category': 'Hosting',
+        'headers': {'server': r'^amazons3'},
+    },
+    'Fastly': {
+        'category': 'CDN',
+        'headers': {'x-fastly-request-id': '', 'x-served-by': r'^cache-'},
+    },
+    'Akamai': {
+        'category': 'CDN',
+        'headers': {'server': r'akamaighost', 'x-akamai-transformed': ''},
+    },
+    'Vercel': {
+        'category': 'Hosting',
+        'headers': {'server': r'^vercel', 'x-vercel-id': ''},
+    },
+    'Netlify': {
+        'category': 'Hosting',
+        'headers': {'server': r'^netlify', 'x-nf-request-id': ''},
+    },
+    'GitHub Pages': {
+        'category': 'Hosting',
+        'headers': {'server': r'^github\.com'},
+    },
+    'Heroku': {
+        'category': 'Hosting',
+        'headers': {'via': r'\bvegur\b'},
+    },
+    'jsDelivr': {
+        'category': 'CDN',
+        'scripts': [r'\bcdn\.jsdelivr\.net\b'],
+    },
+    'unpkg': {
+        'category': 'CDN',
+        'scripts': [r'\bunpkg\.com\b'],
+    },
+    'cdnjs': {
+        'category': 'CDN',
+        'scripts': [r'\bcdnjs\.cloudflare\.com\b'],
+    },
+
+    # Languages and databases, mostly found through implies
+    'PHP': {
+        'category': 'Programming languages',
+        'headers': {'x-powered-by': r'\bphp(?:/(?P<version>[\d.]+))?'},
+        'cookies': [r'^phpsessid$'],
+    },
+    'Java': {
+        'category': 'Programming languages',
+        'cookies': [r'^jsessionid$'],
+    },
+    'Python': {'category': 'Programming languages'},
+    'Ruby': {'category': 'Programming languages'},
+    'Node.js': {'category': 'Programming languages'},
+    'MySQL': {'category': 'Databases'},
+}
+
+# Client-side frameworks whose presence suggests the page is rendered in the browser
+SPA_FRAMEWORKS = ('React', 'Vue.js', 'Angular', 'AngularJS', 'Svelte', 'Ember.js', 'Preact')
+
+# ASCII punctuation and whitespace split page text into tokens
+_SEPARATORS = str.maketrans(dict.fromkeys(string.punctuation + string.whitespace, ' '))
+
+# Placeholders in the required text of a pattern: unknown text, and a token boundary (\b, \s, ^, $)
+_GAP = '\0'
+_BOUNDARY = '\1'
+
+# Cookie names in a Set-Cookie header; requests joins repeated headers with ', '
+_COOKIE_NAME_RE = re.compile(r'(?:^|,)\s*([^=;,\s]+)=')
+
+# Shortest prefilter keyword or literal worth testing before running a pattern
+MIN_PREFILTER_CHARS = 3
+
+
+def _required_text(pattern):
+    """The top-level literal text every match of ``pattern`` contains.
+
+    Optional, repeated and grouped parts become gaps, and ``\\b``, ``\\s``,
+    ``^`` and ``$`` become boundary marks. None when the pattern has a
+    top-level alternation, which has no single required text.
+    """
+    items = []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+        if char == '\\':
+            escaped = pattern[i]
+            i += 1
+            if not depth:
+                if escaped in 'bs':
+                    items.append(_BOUNDARY)
+                else:
+                    items.append(_GAP if escaped.isalnum() else escaped)
+        elif char == '[':
+            # A leading ']' is part of the class
+            i += pattern[i] == '^'
+            i += pattern[i] == ']'
+            while pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+            if not depth:
+                items.append(_GAP)
+        elif char == '(':
+            if not depth:
+                items.append(_GAP)
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth:
+            continue
+        elif char == '|':
+            return None
+        elif char in '?*+{':
+            if char == '{':
+                i = pattern.index('}', i) + 1
+            # Lazy and possessive modifiers
+            if i < len(pattern) and pattern[i] in '?+':
+                i += 1
+            previous = items.pop() if items else _GAP
+            if char == '+' and previous != _GAP:
+                # One occurrence is required, but more may follow
+                items.extend((previous, _GAP, previous))
+            else:
+                items.append(_GAP)
+        elif char in '^$':
+            items.append(_BOUNDARY)
+        elif char == '.':
+            items.append(_GAP)
+        else:
+            items.append(char)
+    return ''.join(items)
+
+
+def _prefilter(pattern):
+    """``(keyword, literal)`` to check before running ``pattern`` over a page.
+
+    The keyword is the longest word the pattern always matches as a whole
+    token of the page, separators included on both sides, so it can be looked
+    up in the page's token set; None if it has no such word. The literal is
+    its longest required text, tested as a substring before the regex runs,
+    or '' when the pattern has to run on every page.
+    """
+    text = _required_text(pattern)
+    if text is None:
+        return None, ''
+    keyword = ''
+    for segment in text.split(_GAP):
+        # The first and last word touch unknown text, so only inner words are whole tokens
+        words = segment.replace(_BOUNDARY, ' ').translate(_SEPARATORS).split(' ')
+        for word in words[1:-1]:
+            if len(word) > len(keyword):
+                keyword = word
+    literal = max(text.replace(_BOUNDARY, _GAP).split(_GAP), key=len)
+    return (keyword if len(keyword) >= MIN_PREFILTER_CHARS else None,
+            literal if len(literal) >= MIN_PREFILTER_CHARS else '')
+
+
+def cookie_names(set_cookie):
+    """Lowercased names of the cookies in a Set-Cookie header value"""
+    return [name.lower() for name in _COOKIE_NAME_RE.findall(set_cookie or '')]
+
+
+class TechnologyDetector:
+    """Technology signatures compiled for matching many pages.
+
+    Markup patterns are not run over every page: each is indexed under a
+    keyword it cannot match without, and a page is lowered and split into
+    its set of tokens once, so only patterns whose keyword occurs in the
+    page are considered, and of those only the ones whose required literal
+    is in the page run. Script URLs, meta tags, headers and cookies are short
+    and matched directly. ``detect`` returns ``{technology: version}``
+    in signature order, with '' where no version was found.
+    """
+    def __init__(self, signatures=None):
+        self.signatures = TECHNOLOGY_SIGNATURES if signatures is None else signatures
+        self._order = {name: index for index, name in enumerate(self.signatures)}
+        self._html_by_keyword = {}
+        self._html_by_literal = []
+        self._scripts = []
+        self._cookies = []
+        self._meta = []
+        self._headers = []
+        self._js = []
+        for name, signature in self.signatures.items():
+            for pattern in signature.get('html', ()):
+                regex = re.compile(pattern, re.MULTILINE)
+                keyword, literal = _prefilter(pattern)
+                if keyword:
+                    self._html_by_keyword.setdefault(keyword, []).append((literal, name, regex))
+                else:
+                    self._html_by_literal.append((literal, name, regex))
+            self._scripts.extend((name, re.compile(pattern, re.MULTILINE)) for pattern in signature.get('scripts', ()))
+            self._cookies.extend((name, re.compile(pattern, re.MULTILINE)) for pattern in signature.get('cookies', ()))
+            for source, entries in (('meta', self._meta), ('headers', self._headers), ('js', self._js)):
+                entries.extend((key, name, re.compile(pattern))
+                               for key, pattern in signature.get(source, {}).items())
+
+    @property
+    def js_globals(self):
+        """Global variable paths the ``js`` signatures look at, to read from a rendered page"""
+        return list(dict.fromkeys(path for path, _, _ in self._js))
+
+    def category(self, name):
+        """Category of a technology, '' when it has no signature"""
+        return self.signatures.get(name, {}).get('category', '')
+
+    @staticmethod
+    def _match(found, candidates, text):
+        for name, regex in candidates:
+            # A technology already found with a version needs no more patterns
+            if found.get(name) or (name in found and 'version' not in regex.groupindex):
+                continue
+            match = regex.search(text)
+            if match:
+                found[name] = match.groupdict().get('version') or found.get(name, '')
+
+    def detect(self, html_text='', script_srcs=(), response_headers=None, meta=None, js_globals=None):
+        """``{technology: version}`` for a page.
+
+        ``meta`` maps lowercased meta names and properties to their content
+        and ``js_globals`` maps global variable paths to their values in the
+        rendered page; both are optional.
+        """
+        found = {}
+        if html_text:
+            text = html_text.lower()
+            tokens = set(text.translate(_SEPARATORS).split())
+            entries = [
+                entry
+                for keyword, keyword_entries in self._html_by_keyword.items() if keyword in tokens
+                for entry in keyword_entries
+            ]
+            entries.extend(self._html_by_literal)
+            candidates = [(name, regex) for literal, name, regex in entries if literal in text]
+            self._match(found, candidates, text)
+        if script_srcs:
+            self._match(found, self._scripts, '\n'.join(script_srcs).lower())
+
+        headers = {key.lower(): value for key, value in (response_headers or {}).items()}
+        if 'set-cookie' in headers:
+            self._match(found, self._cookies, '\n'.join(cookie_names(headers['set-cookie'])))
+        for values, entries, lower in ((meta, self._meta, True), (headers, self._headers, True),
+                                       (js_globals, self._js, False)):
+            if not values:
+                continue
+            for key, name, regex in entries:
+                value = values.get(key)
+                if value is None or value is False:
+                    continue
+                # Objects and functions are reported as present without a value
+                value = '' if value is True else str(value)
+                self._match(found, [(name, regex)], value.lower() if lower else value)
+
+        pending = list(found)
+        while pending:
+            for implied in self.signatures.get(pending.pop(), {}).get('implies', ()):
+                if implied not in found:
+                    found[implied] = ''
+                    pending.append(implied)
+        return {name: found[name] for name in sorted(found, key=lambda name: self._order.get(name, len(self._order)))}
+
+
+# Detector for the built-in signatures, compiled at import
+DEFAULT_DETECTOR = TechnologyDetector()
@@ -0,0 +1,241 @@
+"""Structural diff of two HTML documents over Merkle-hashed DOM trees."""
+from functools import cached_property
+
+from lxml import etree
+
+from .linediff import patience_opcodes
+
+# Tags whose changes are JavaScript, metadata or stylesheet changes rather than page content
+SCRIPT_TAGS = ('script', 'noscript')
+METADATA_TAGS = ('meta', 'title', 'base')
+
+# Longest serialized start tag or text kept in a change record
+SNIPPET_CHARS = 300
+
+
+def _text(value):
+    # Collapse whitespace so re-indented markup hashes the same
+    return ' '.join(value.split()) if value else ''
+
+
+def _children(element):
+    # Comments and processing instructions are not part of the structure
+    return [child for child in element if isinstance(child.tag, str)]
+
+
+def _own_text(element):
+    """Text directly inside an element: its text plus the tails of its children"""
+    parts = [_text(element.text)]
+    parts.extend(_text(child.tail) for child in element)
+    return ' '.join(part for part in parts if part)
+
+
+def _parse(html_content):
+    if not html_content or not html_content.strip():
+        return None
+    return etree.HTML(html_content)
+
+
+def _start_tag(element):
+    attributes = ''.join(f' {name}="{value}"' for name, value in sorted(element.attrib.items()))
+    return f'<{element.tag}{attributes}>'[:SNIPPET_CHARS]
+
+
+def _segments(children):
+    """CSS selector segment of each child: tag, #id or first .class, and :nth-of-type when needed"""
+    totals = {}
+    for child in children:
+        totals[child.tag] = totals.get(child.tag, 0) + 1
+    seen = {}
+    segments = []
+    for child in children:
+        seen[child.tag] = seen.get(child.tag, 0) + 1
+        segment = child.tag
+        element_id = child.get('id')
+        classes = (child.get('class') or '').split()
+        if element_id:
+            segment += f'#{element_id}'
+        else:
+            if classes:
+                segment += f'.{classes[0]}'
+            if totals[child.tag] > 1:
+                segment += f':nth-of-type({seen[child.tag]})'
+        segments.append(segment)
+    return segments
+
+
+def categorize_node(element, change_type):
+    """Category of a node-level change, using the same names as the line diff"""
+    tag = element.tag
+    if tag in SCRIPT_TAGS:
+        return 'javascript'
+    if tag == 'style' or (tag == 'link' and 'stylesheet' in (element.get('rel') or '').lower()):
+        return 'stylesheet'
+    if tag in METADATA_TAGS or tag == 'link':
+        return 'metadata'
+    if change_type == 'attributes':
+        return 'attributes'
+    if change_type == 'text' or any(ancestor.tag == 'body' for ancestor in element.iterancestors()):
+        return 'content'
+    return 'other'
+
+
+class HTMLTreeDiff:
+    """Node-level diff of original vs rendered HTML.
+
+    Every element gets a Merkle hash computed bottom-up from its tag, sorted
+    attributes, whitespace-normalized text and its children's hashes, so
+    attribute reordering and re-indentation are not changes. The trees are
+    walked top-down and any pair of subtrees with equal hashes is skipped
+    without looking inside; children are aligned by running the patience
+    engine over their hashes. Changes are reported as inserted or removed
+    subtrees, attribute changes and text changes, each with a CSS path.
+    """
+    def __init__(self, original_html, rendered_html):
+        self.original_html = original_html
+        self.rendered_html = rendered_html
+
+    @staticmethod
+    def _summarize(root):
+        """``{element: (hash, node count)}`` for every element of a tree"""
+        summary = {}
+        if root is None:
+            return summary
+        for _, element in etree.iterwalk(root, events=('end',)):
+            if not isinstance(element.tag, str):
+                continue
+            children = _children(element)
+            size = 1
+            child_hashes = []
+            for child in children:
+                child_hash, child_size = summary[child]
+                child_hashes.append(child_hash)
+                size += child_size
+            node_hash = hash((element.tag, tuple(sorted(element.attrib.items())), _own_text(element),
+                              tuple(child_hashes)))
+            summary[element] = (node_hash, size)
+        return summary
+
+    @cached_property
+    def _trees(self):
+        original, rendered = _parse(self.original_html), _parse(self.rendered_html)
+        return original, rendered, self._summarize(original), self._summarize(rendered)
+
+    def _change(self, change_type, element, path, **details):
+        change = {
+            'type': change_type,
+            'path': path,
+            'tag': element.tag,
+            'category': categorize_node(element, change_type),
+        }
+        change.update(details)
+        return change
+
+    @cached_property
+    def _diff(self):
+        original, rendered, original_summary, rendered_summary = self._trees
+        changes = []
+        stats = {
+            'nodes_original': original_summary[original][1] if original is not None else 0,
+            'nodes_rendered': rendered_summary[rendered][1] if rendered is not None else 0,
+            'nodes_added': 0,
+            'nodes_removed': 0,
+            'nodes_matched': 0,
+            'attribute_changes': 0,
+            'text_changes': 0,
+            'js_injections': 0,
+            'meta_changes': 0,
+            'skipped_subtrees': 0,
+        }
+
+        def inserted(element, path):
+            size = rendered_summary[element][1]
+            stats['nodes_added'] += size
+            stats['js_injections'] += sum(1 for _ in element.iter('script'))
+            if element.tag in METADATA_TAGS or element.tag == 'link':
+                stats['meta_changes'] += 1
+            changes.append(self._change('insert', element, path, nodes=size, rendered=_start_tag(element)))
+
+        def removed(element, path):
+            size = original_summary[element][1]
+            stats['nodes_removed'] += size
+            changes.append(self._change('remove', element, path, nodes=size, original=_start_tag(element)))
+
+        if original is None or rendered is None:
+            if rendered is not None:
+                inserted(rendered, rendered.tag)
+            if original is not None:
+                removed(original, original.tag)
+        else:
+            stack = [(original, rendered, original.tag, rendered.tag)]
+            while stack:
+                old, new, old_path, new_path = stack.pop()
+                old_hash, old_size = original_summary[old]
+                if old_hash == rendered_summary[new][0]:
+                    # Identical subtree: nothing inside can differ
+                    stats['nodes_matched'] += old_size
+                    stats['skipped_subtrees'] += 1
+                    continue
+                if old.tag != new.tag:
+                    removed(old, old_path)
+                    inserted(new, new_path)
+                    continue
+                stats['nodes_matched'] += 1
+
+                if old.attrib != new.attrib:
+                    attributes = {
+                        name: [old.get(name), new.get(name)]
+                        for name in sorted(set(old.attrib) | set(new.attrib))
+                        if old.get(name) != new.get(name)
+                    }
+                    if attributes:
+                        stats['attribute_changes'] += 1
+                        if new.tag in METADATA_TAGS or new.tag == 'link':
+                            stats['meta_changes'] += 1
+                        changes.append(self._change('attributes', new, new_path, attributes=attributes))
+                old_text, new_text = _own_text(old), _own_text(new)
+                if old_text != new_text:
+                    stats['text_changes'] += 1
+                    changes.append(self._change('text', new, new_path, original=old_text[:SNIPPET_CHARS],
+                                                rendered=new_text[:SNIPPET_CHARS]))
+
+                old_children, new_children = _children(old), _children(new)
+                old_segments, new_segments = _segments(old_children), _segments(new_children)
+                old_hashes = [original_summary[child][0] for child in old_children]
+                new_hashes = [rendered_summary[child][0] for child in new_children]
+                pending = []
+                for tag, i1, i2, j1, j2 in patience_opcodes(old_hashes, new_hashes):
+                    if tag == 'equal':
+                        stats['skipped_subtrees'] += i2 - i1
+                        stats['nodes_matched'] += sum(original_summary[child][1] for child in old_children[i1:i2])
+                        continue
+                    # Changed children are paired up by tag and id, then diffed recursively
+                    old_keys = [(child.tag, child.get('id')) for child in old_children[i1:i2]]
+                    new_keys = [(child.tag, child.get('id')) for child in new_children[j1:j2]]
+                    for key_tag, k1, k2, l1, l2 in patience_opcodes(old_keys, new_keys):
+                        if key_tag == 'equal':
+                            for offset in range(k2 - k1):
+                                i, j = i1 + k1 + offset, j1 + l1 + offset
+                                pending.append((old_children[i], new_children[j],
+                                                f'{old_path} > {old_segments[i]}', f'{new_path} > {new_segments[j]}'))
+                            continue
+                        for i in range(i1 + k1, i1 + k2):
+                            removed(old_children[i], f'{old_path} > {old_segments[i]}')
+                        for j in range(j1 + l1, j1 + l2):
+                            inserted(new_children[j], f'{new_path} > {new_segments[j]}')
+                # Depth-first, first child first
+                stack.extend(reversed(pending))
+
+        total = stats['nodes_original'] + stats['nodes_rendered']
+        stats['similarity_ratio'] = 2.0 * stats['nodes_matched'] / total if total else 1.0
+        return changes, stats
+
+    def get_change_statistics(self):
+        """Node counts, added/removed nodes, attribute and text changes and tree similarity"""
+        return dict(self._diff[1])
+
+    def get_detailed_changes(self, categories=None):
+        """Node-level changes, each with type, CSS path, tag and category, optionally only those in ``categories``"""
+        if categories is None:
+            return self._diff[0]
+        return [change for change in self._diff[0] if change['category'] in categories]
@@ -0,0 +1,16 @@
+"""URL normalization shared by the caches, the crawl store and the link frontier."""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url, ignore_query=False):
+    """Canonical form of a URL: lowercase scheme and host, no default port or fragment, sorted query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path or '/'
+    query = '' if ignore_query else urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
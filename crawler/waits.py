@@ -0,0 +1,74 @@
+"""Wait strategies for deciding when a rendered page has finished changing."""
+import time
+
+# Wait strategies accepted in config['wait_strategy']
+WAIT_STRATEGIES = ('adaptive', 'fixed')
+
+# Installed on every new document (via CDP) to track in-flight requests and DOM mutations
+ACTIVITY_TRACKER_JS = """
+(() => {
+  if (window.__crawlerActivity) { return; }
+  const state = window.__crawlerActivity = {inflight: 0, lastActivity: performance.now()};
+  const touch = () => { state.lastActivity = performance.now(); };
+  const done = () => { state.inflight = Math.max(0, state.inflight - 1); touch(); };
+
+  if (window.fetch) {
+    const originalFetch = window.fetch;
+    window.fetch = function() {
+      state.inflight++; touch();
+      return originalFetch.apply(this, arguments).finally(done);
+    };
+  }
+  if (window.XMLHttpRequest) {
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+      state.inflight++; touch();
+      this.addEventListener('loadend', done, {once: true});
+      return originalSend.apply(this, arguments);
+    };
+  }
+  try {
+    new PerformanceObserver(touch).observe({type: 'resource', buffered: true});
+  } catch (e) {}
+  new MutationObserver(touch).observe(document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+  });
+})();
+"""
+
+ACTIVITY_POLL_JS = """
+const state = window.__crawlerActivity;
+if (!state) { return null; }
+return [state.inflight, performance.now() - state.lastActivity, document.readyState];
+"""
+
+
+def install_activity_tracker(driver):
+    """Register the activity tracker so it runs before any page script. Returns False if CDP is unavailable"""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': ACTIVITY_TRACKER_JS})
+        return True
+    except Exception:
+        return False
+
+
+def wait_for_quiescence(driver, quiet_window=0.5, max_wait=10, poll_interval=0.1):
+    """Wait until the page has no in-flight requests and no DOM mutations for ``quiet_window`` seconds.
+
+    Returns ``(settle_time, settled)``; ``settled`` is False when ``max_wait``
+    was reached first (long-polling pages, endless animations).
+    """
+    start_time = time.time()
+    deadline = start_time + max_wait
+    while True:
+        state = driver.execute_script(ACTIVITY_POLL_JS)
+        if state is None:
+            # Tracker missing (no CDP): install it now, this still observes later mutations
+            driver.execute_script(ACTIVITY_TRACKER_JS)
+        else:
+            inflight, idle_ms, ready_state = state
+            if ready_state == 'complete' and inflight <= 0 and idle_ms >= quiet_window * 1000:
+                return time.time() - start_time, True
+        if time.time() >= deadline:
+            return time.time() - start_time, False
+        time.sleep(poll_interval)
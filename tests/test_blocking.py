@@ -0,0 +1,22 @@
+import re
+
+from crawler.blocking import build_blocked_patterns
+
+
+def is_blocked(url, patterns):
+    """Match a URL the way Network.setBlockedURLs does: the whole URL, '*' matching any run of characters"""
+    return any(re.fullmatch('.*'.join(map(re.escape, pattern.split('*'))), url) for pattern in patterns)
+
+
+def test_resource_type_patterns_match_extensions_only():
+    patterns = build_blocked_patterns({'block_resource_types': ['font', 'media', 'image', 'stylesheet']},
+                                      'https://www.webmd.com/', '')
+
+    for url in ('https://www.webmd.com/app.js', 'https://www.webmd.com/', 'https://movieweb.com/movies/',
+                'https://www.oggi.it/index.html', 'https://waves.com/api?file=a.css.map',
+                'https://example.com/icons/page.html'):
+        assert not is_blocked(url, patterns), url
+
+    for url in ('https://cdn.example.com/fonts/inter.woff2', 'https://example.com/clip.webm?t=10',
+                'https://example.com/favicon.ico', 'https://example.com/site.css?ver=6.4'):
+        assert is_blocked(url, patterns), url
@@ -0,0 +1,74 @@
+import gzip
+import os
+
+import httpx
+import pytest
+
+from crawler.cache import RawHTMLCache
+from crawler.crawl import fetch_raw_html, new_crawl_result
+from crawler.sessions import HTTPSessionPool
+
+URL = 'https://example.com/page'
+BODY = '<html><head><title>Cached</title></head><body></body></html>'
+CONFIG = {'timeout': 5}
+
+
+@pytest.fixture
+def revalidating_host():
+    """HTTP/2 session pool for a host answering 304 to If-None-Match, and the requests it saw"""
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        if request.headers.get('if-none-match') == '"v1"':
+            return httpx.Response(304, headers={'ETag': '"v1"'})
+        return httpx.Response(200, headers={'ETag': '"v1"', 'Content-Type': 'text/html'}, text=BODY)
+
+    http_sessions = HTTPSessionPool(http2=True)
+    http_sessions._sessions['example.com'] = httpx.Client(transport=httpx.MockTransport(handler))
+    return http_sessions, requests_seen
+
+
+def test_http2_revalidation_serves_304_from_cache(tmp_path, revalidating_host):
+    http_sessions, requests_seen = revalidating_host
+    raw_cache = RawHTMLCache(str(tmp_path))
+
+    first = new_crawl_result(URL)
+    assert fetch_raw_html(first, http_sessions, CONFIG, raw_cache) is not None
+    assert first['cache_status'] == 'miss'
+
+    second = new_crawl_result(URL)
+    assert fetch_raw_html(second, http_sessions, CONFIG, raw_cache) is not None
+    assert second['errors'] == []
+    assert second['status_code'] == 200
+    assert second['cache_status'] == 'revalidated'
+    assert second['raw_html'] == BODY
+    assert second['content_hash'] == first['content_hash']
+    assert len(requests_seen) == 2
+
+
+@pytest.mark.parametrize('damage', ['missing', 'empty', 'truncated'])
+def test_damaged_cached_body_is_fetched_again(tmp_path, revalidating_host, damage):
+    http_sessions, requests_seen = revalidating_host
+    raw_cache = RawHTMLCache(str(tmp_path))
+    fetch_raw_html(new_crawl_result(URL), http_sessions, CONFIG, raw_cache)
+    body_path = raw_cache._path(URL, '.html.gz')
+    if damage == 'missing':
+        os.unlink(body_path)
+    elif damage == 'empty':
+        with open(body_path, 'wb') as f:
+            f.write(gzip.compress(b''))
+    else:
+        with open(body_path, 'rb') as f:
+            data = f.read()
+        with open(body_path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+
+    for _ in range(2):
+        result = new_crawl_result(URL)
+        assert fetch_raw_html(result, http_sessions, CONFIG, raw_cache) is not None
+        assert result['errors'] == []
+        assert result['raw_html'] == BODY
+    # Refetched without validators once, then revalidated against the restored body
+    assert 'if-none-match' not in requests_seen[2].headers
+    assert result['cache_status'] == 'revalidated'
@@ -0,0 +1,35 @@
+import pyarrow.parquet as pq
+
+from crawler.crawl import new_crawl_result
+from crawler.export import export_results
+
+
+def make_result(index, **fields):
+    result = new_crawl_result(f'https://example.com/{index}')
+    result.update(fields)
+    return result
+
+
+def test_parquet_schema_comes_from_declared_columns(tmp_path):
+    path = str(tmp_path / 'results.parquet')
+    results = [make_result(0), make_result(1),
+               make_result(2, retry_after=1.5, response_time=0.25, crawl_depth=2, extra_field=7)]
+
+    assert export_results(results, path, chunk_size=2) == 3
+
+    table = pq.read_table(path)
+    assert str(table.schema.field('retry_after').type) == 'double'
+    assert str(table.schema.field('status_code').type) == 'int64'
+    assert str(table.schema.field('is_spa').type) == 'bool'
+    rows = table.to_pylist()
+    assert [row['retry_after'] for row in rows] == [0.0, 0.0, 1.5]
+    assert rows[2]['response_time'] == 0.25
+    assert [row['crawl_depth'] for row in rows] == [None, None, 2]
+
+
+def test_empty_export_has_declared_columns(tmp_path):
+    path = str(tmp_path / 'results.parquet')
+
+    assert export_results([], path) == 0
+
+    assert 'retry_after' in pq.read_table(path).schema.names
@@ -0,0 +1,20 @@
+from crawler.crawl import new_crawl_result
+from crawler.frontier import LinkFrontier
+
+
+def test_links_resolve_against_the_final_url():
+    frontier = LinkFrontier(['http://example.com/a'], max_depth=1)
+    urls = iter(frontier)
+    assert next(urls) == 'http://example.com/a'
+
+    result = new_crawl_result('http://example.com/a')
+    result['final_url'] = 'https://example.com/a/'
+    result['links'] = ['b', '/c']
+    frontier.add_result(result)
+    assert result['crawl_depth'] == 0
+
+    discovered = [next(urls), next(urls)]
+    assert sorted(discovered) == ['https://example.com/a/b', 'https://example.com/c']
+    for url in discovered:
+        frontier.add_result(new_crawl_result(url))
+    assert next(urls, None) is None
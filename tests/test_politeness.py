@@ -0,0 +1,61 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from crawler.politeness import HostScheduler
+
+
+class FakeRobots:
+    """robots.txt with a Crawl-delay, read slowly as over the network"""
+    def __init__(self, delay):
+        self.delay = delay
+
+    def crawl_delay(self, url):
+        time.sleep(0.05)
+        return self.delay
+
+    def can_fetch(self, url):
+        return True
+
+
+def test_crawl_delay_applies_from_the_first_request():
+    scheduler = HostScheduler(max_per_host=4, robots=FakeRobots(0.2))
+    for index in range(4):
+        scheduler.put(f'https://example.com/{index}')
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                url = scheduler.get(timeout=0.5)
+            except queue.Empty:
+                return
+            assert scheduler.admit(url)
+            with lock:
+                starts.append(time.monotonic())
+            scheduler.release(url, 200)
+
+    workers = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert len(starts) == 4
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.2 - 0.01
+
+
+def test_first_url_is_held_alone_until_robots_is_read():
+    scheduler = HostScheduler(max_per_host=4, robots=FakeRobots(None))
+    scheduler.put('https://example.com/a')
+    scheduler.put('https://example.com/b')
+
+    first = scheduler.get(timeout=0.1)
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.1)
+    assert scheduler.admit(first)
+    assert scheduler.get(timeout=0.1) == 'https://example.com/b'
@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler.sessions import HTTPSessionPool
+
+
+def serve(handle_get):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def do_GET(self):
+            handle_get(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def redirecting_host():
+    def page(handler):
+        handler.send_response(200)
+        handler.send_header('Content-Length', '2')
+        handler.end_headers()
+        handler.wfile.write(b'ok')
+
+    target = serve(page)
+
+    def redirect(handler):
+        handler.send_response(301)
+        handler.send_header('Location', f'http://localhost:{target.server_address[1]}{handler.path}')
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+
+    origin = serve(redirect)
+    yield f'http://127.0.0.1:{origin.server_address[1]}'
+    origin.shutdown()
+    target.shutdown()
+
+
+def test_redirects_to_another_origin_keep_connections_alive(redirecting_host):
+    http_sessions = HTTPSessionPool()
+    for index in range(10):
+        response, _ = http_sessions.get(f'{redirecting_host}/{index}', timeout=5)
+        assert response.status_code == 200
+    http_sessions.close()
+
+    host_stats = next(iter(http_sessions.stats().values()))
+    assert host_stats['requests'] == 10
+    assert host_stats['new_connections'] == 2
+    assert host_stats['reuse_ratio'] == 0.8